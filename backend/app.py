@@ -2196,20 +2196,51 @@
 
 
 
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, current_app, request, jsonify
 from flask_cors import CORS
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 import os
 from dotenv import load_dotenv
 import json
-from datetime import datetime
+from json.encoder import encode_basestring_ascii
+import gzip
+import hashlib
+import random
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+from itertools import islice
+from datetime import datetime, timedelta, timezone
+
+from cache import DerivedView, SheetCache, SingleFlight
+from scheduler import (
+    SheetsScheduler, SheetsUnavailableError, background_sheets_calls, current_sheets_priority, sheets_priority
+)
+from storage import (
+    MemoryStorage, SheetGrid, SheetMirror, SheetsClient, SheetsStorage, SQLiteStorage,
+    column_letters, quote_sheet_name, trim_row
+)
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Load environment variables
 load_dotenv()
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for all routes
+# Every endpoint; create_app registers them on the app it builds
+api = Blueprint('api', __name__)
 
 # Configuration from environment variables
 GOOGLE_SHEET_ID_MAPPING = os.getenv('GOOGLE_SHEET_ID_MAPPING')
@@ -2220,178 +2251,2431 @@ MAPPING_SHEET_NAME = os.getenv('MAPPING_SHEET_NAME', 'Sheet1')
 QUESTIONS_SHEET_NAME = os.getenv('QUESTIONS_SHEET_NAME', 'Sheet1')
 RESPONSES_SHEET_NAME = os.getenv('RESPONSES_SHEET_NAME', 'Sheet1')
 
+# Read cache TTLs in seconds. Questions and mapping change rarely, responses
+# change on every submission.
+QUESTIONS_CACHE_TTL = float(os.getenv('QUESTIONS_CACHE_TTL', '300'))
+MAPPING_CACHE_TTL = float(os.getenv('MAPPING_CACHE_TTL', '300'))
+RESPONSES_CACHE_TTL = float(os.getenv('RESPONSES_CACHE_TTL', '10'))
+DEFAULT_CACHE_TTL = float(os.getenv('DEFAULT_CACHE_TTL', '30'))
+# How long past its TTL an entry may still be served while it is refreshed
+CACHE_MAX_STALE = float(os.getenv('CACHE_MAX_STALE', '3600'))
+
+# The responses sheet is append-only, so refreshes fetch only new rows. Every
+# Nth refresh also re-reads a sampled block of earlier rows to detect edits.
+RESPONSES_SAMPLE_EVERY = int(os.getenv('RESPONSES_SAMPLE_EVERY', '10'))
+RESPONSES_SAMPLE_ROWS = int(os.getenv('RESPONSES_SAMPLE_ROWS', '50'))
+
+# Write-behind for submissions: accepted feedback is fsync'd to a local
+# journal and written to the responses sheet in batches by a background thread
+FEEDBACK_WRITE_BEHIND = os.getenv('FEEDBACK_WRITE_BEHIND', 'true').lower() == 'true'
+FEEDBACK_JOURNAL_PATH = os.getenv('FEEDBACK_JOURNAL_PATH', 'feedback_journal.jsonl')
+FEEDBACK_FLUSH_INTERVAL = float(os.getenv('FEEDBACK_FLUSH_INTERVAL', '2'))
+FEEDBACK_FLUSH_BATCH_SIZE = int(os.getenv('FEEDBACK_FLUSH_BATCH_SIZE', '200'))
+FEEDBACK_FLUSH_MAX_BACKOFF = float(os.getenv('FEEDBACK_FLUSH_MAX_BACKOFF', '300'))
+# Limits for bulk submissions and for the size of one append request body
+FEEDBACK_BATCH_MAX_RECORDS = int(os.getenv('FEEDBACK_BATCH_MAX_RECORDS', '1000'))
+SHEETS_APPEND_MAX_BYTES = int(os.getenv('SHEETS_APPEND_MAX_BYTES', '2000000'))
+
+# Idempotency-Key results remembered for replayed submissions
+IDEMPOTENCY_STORE_PATH = os.getenv('IDEMPOTENCY_STORE_PATH', 'idempotency_keys.jsonl')
+IDEMPOTENCY_MAX_KEYS = int(os.getenv('IDEMPOTENCY_MAX_KEYS', '10000'))
+IDEMPOTENCY_TTL_HOURS = float(os.getenv('IDEMPOTENCY_TTL_HOURS', '24'))
+
+# Read responses at least this large are compressed, and encoded bodies are
+# kept per sheet version up to this many bytes in total
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', '1024'))
+ENCODED_BODY_CACHE_BYTES = int(os.getenv('ENCODED_BODY_CACHE_BYTES', str(32 * 1024 * 1024)))
+
+# Largest page /api/responses returns when a limit is given
+RESPONSES_MAX_PAGE_SIZE = int(os.getenv('RESPONSES_MAX_PAGE_SIZE', '1000'))
+
+# Optional long-format copy of the responses (one row per submission and
+# question, Likert answers as codes 1-5) that /api/responses is served from
+ANSWER_STORE = os.getenv('ANSWER_STORE', 'false').lower() == 'true'
+ANSWER_STORE_PATH = os.getenv('ANSWER_STORE_PATH', 'answers.db')
+
+# Days a submitter must wait before reviewing the same leader again
+FEEDBACK_COOLDOWN_DAYS = int(os.getenv('FEEDBACK_COOLDOWN_DAYS', '180'))
+
 # Path to your service account credentials JSON file
 SERVICE_ACCOUNT_FILE = 'credentials.json'  # Make sure this file exists
 
-def get_google_sheets_service():
-    """Authenticate and return Google Sheets service."""
+SHEETS_SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+
+# Upstream HTTP settings for the shared Sheets client
+SHEETS_HTTP_TIMEOUT = float(os.getenv('SHEETS_HTTP_TIMEOUT', '30'))
+SHEETS_HTTP_POOL_SIZE = int(os.getenv('SHEETS_HTTP_POOL_SIZE', '8'))
+# Spreadsheets read in parallel by one batched read
+SHEETS_FANOUT_WORKERS = int(os.getenv('SHEETS_FANOUT_WORKERS', '4'))
+# Sheets API quota (requests per minute for this service account) and burst size
+SHEETS_READS_PER_MINUTE = float(os.getenv('SHEETS_READS_PER_MINUTE', '60'))
+SHEETS_WRITES_PER_MINUTE = float(os.getenv('SHEETS_WRITES_PER_MINUTE', '60'))
+SHEETS_QUOTA_BURST = int(os.getenv('SHEETS_QUOTA_BURST', '10'))
+# Retries of rate-limited or failed upstream calls
+SHEETS_MAX_RETRIES = int(os.getenv('SHEETS_MAX_RETRIES', '5'))
+SHEETS_RETRY_BASE_DELAY = float(os.getenv('SHEETS_RETRY_BASE_DELAY', '1'))
+SHEETS_RETRY_MAX_DELAY = float(os.getenv('SHEETS_RETRY_MAX_DELAY', '32'))
+# Consecutive upstream failures that open a spreadsheet's circuit breaker,
+# and how long it stays open before one probe call is let through
+SHEETS_BREAKER_FAILURES = int(os.getenv('SHEETS_BREAKER_FAILURES', '5'))
+SHEETS_BREAKER_RESET_SECONDS = float(os.getenv('SHEETS_BREAKER_RESET_SECONDS', '30'))
+
+# Where spreadsheets are read from and written to: 'sheets' (Google Sheets),
+# 'sqlite' (a local database file) or 'memory' (process-local, for tests)
+STORAGE_BACKENDS = ('sheets', 'sqlite', 'memory')
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'sheets').lower()
+STORAGE_SQLITE_PATH = os.getenv('STORAGE_SQLITE_PATH', 'feedback_hub.db')
+# Local SQLite mirror of the three sheets that serves all reads once synced
+# (only used with the sheets backend), how often it syncs, and how many
+# syncs of the append-only responses sheet pass between full comparisons
+SHEET_MIRROR = os.getenv('SHEET_MIRROR', 'true').lower() == 'true'
+SHEET_MIRROR_PATH = os.getenv('SHEET_MIRROR_PATH', 'sheet_mirror.db')
+SHEET_MIRROR_SYNC_INTERVAL = float(os.getenv('SHEET_MIRROR_SYNC_INTERVAL', '15'))
+SHEET_MIRROR_FULL_SYNC_EVERY = int(os.getenv('SHEET_MIRROR_FULL_SYNC_EVERY', '20'))
+# Reads fall back to Sheets when a sheet's last successful sync is older than this
+SHEET_MIRROR_MAX_LAG = float(os.getenv('SHEET_MIRROR_MAX_LAG', '300'))
+# How long the grid size of each sheet, read from spreadsheet metadata, is cached
+SHEET_GRID_TTL = float(os.getenv('SHEET_GRID_TTL', '300'))
+
+# Components shared by the endpoints. Nothing is built at import time;
+# create_app builds them, so the module imports without touching Sheets.
+sheets_client = None
+sheets_scheduler = None
+storage = None
+sheet_grid = None
+sheet_mirror = None
+sheet_reads = None
+sheets_fanout = None
+sheet_cache = None
+responses_loader = None
+encoded_bodies = None
+mapping_index = None
+latest_submissions = None
+response_records = None
+answer_store = None
+response_schema = None
+feedback_flusher = None
+submission_index = None
+idempotency_store = None
+idempotent_requests = None
+
+def storage_for(spreadsheet_id, ranges):
+    """The mirror when it has synced the sheets of every range, otherwise the storage backend."""
+    if sheet_mirror is not None and all(sheet_mirror.covers(spreadsheet_id, r) for r in ranges):
+        return sheet_mirror
+    return storage
+
+def _request_sheet_values(spreadsheet_id, range_name):
+    return storage_for(spreadsheet_id, [range_name]).read_range(spreadsheet_id, range_name)
+
+def fetch_sheet_values(spreadsheet_id, range_name):
+    """Read a range from Google Sheets, raising on upstream errors.
+
+    Concurrent reads of the same range share one upstream call.
+    """
+    return sheet_reads.do(
+        (spreadsheet_id, range_name),
+        lambda: _request_sheet_values(spreadsheet_id, range_name)
+    )
+
+def _request_sheet_values_batch(spreadsheet_id, ranges):
+    return storage_for(spreadsheet_id, ranges).read_ranges(spreadsheet_id, ranges)
+
+def _fetch_spreadsheet_ranges(spreadsheet_id, ranges, priority=None):
+    if priority is not None:
+        # Running on a fan-out thread on behalf of a caller with this priority
+        with sheets_priority(priority):
+            return _fetch_spreadsheet_ranges(spreadsheet_id, ranges)
+    # A single range needs no batchGet and can share flights with plain reads
+    if len(ranges) == 1:
+        return [fetch_sheet_values(spreadsheet_id, ranges[0])]
+    return sheet_reads.do(
+        (spreadsheet_id, tuple(ranges)),
+        lambda: _request_sheet_values_batch(spreadsheet_id, ranges)
+    )
+
+def fetch_sheet_values_batch(pairs):
+    """Read several (spreadsheet_id, range) pairs in as few upstream calls as possible.
+
+    Pairs are grouped by spreadsheet, each spreadsheet is read with one
+    batchGet, and the spreadsheets are read in parallel. Returns a dict
+    mapping each pair to its values. Raises on upstream errors.
+    """
+    ranges_by_spreadsheet = {}
+    for spreadsheet_id, range_name in pairs:
+        ranges = ranges_by_spreadsheet.setdefault(spreadsheet_id, [])
+        if range_name not in ranges:
+            ranges.append(range_name)
+    
+    if len(ranges_by_spreadsheet) == 1:
+        (spreadsheet_id, ranges), = ranges_by_spreadsheet.items()
+        values_lists = {spreadsheet_id: _fetch_spreadsheet_ranges(spreadsheet_id, ranges)}
+    else:
+        futures = {
+            spreadsheet_id: sheets_fanout.submit(
+                _fetch_spreadsheet_ranges, spreadsheet_id, ranges, current_sheets_priority()
+            )
+            for spreadsheet_id, ranges in ranges_by_spreadsheet.items()
+        }
+        values_lists = {spreadsheet_id: future.result() for spreadsheet_id, future in futures.items()}
+    
+    results = {}
+    for spreadsheet_id, ranges in ranges_by_spreadsheet.items():
+        for range_name, values in zip(ranges, values_lists[spreadsheet_id]):
+            results[(spreadsheet_id, range_name)] = values
+    return results
+
+def mirror_status(spreadsheet_id, range_name):
+    """(synced_at, last sync error) of the mirror copy a range is read from, or None."""
+    if sheet_mirror is not None and sheet_mirror.covers(spreadsheet_id, range_name):
+        return sheet_mirror.status(spreadsheet_id, range_name)
+    return None
+
+# Sheets addressable by name from the admin endpoints
+NAMED_SHEETS = {
+    'questions': (GOOGLE_SHEET_ID_QUESTIONS, QUESTIONS_SHEET_NAME),
+    'mapping': (GOOGLE_SHEET_ID_MAPPING, MAPPING_SHEET_NAME),
+    'responses': (GOOGLE_SHEET_ID_RESPONSES, RESPONSES_SHEET_NAME)
+}
+
+# Whole sheets are read by bare name, so no column limit applies
+QUESTIONS_RANGE = quote_sheet_name(QUESTIONS_SHEET_NAME)
+MAPPING_RANGE = quote_sheet_name(MAPPING_SHEET_NAME)
+RESPONSES_RANGE = quote_sheet_name(RESPONSES_SHEET_NAME)
+
+# Ranges kept warm in the cache, and how often to reload them (0 disables)
+WARM_RANGES = [
+    (GOOGLE_SHEET_ID_QUESTIONS, QUESTIONS_RANGE),
+    (GOOGLE_SHEET_ID_MAPPING, MAPPING_RANGE),
+    (GOOGLE_SHEET_ID_RESPONSES, RESPONSES_RANGE)
+]
+CACHE_WARM_INTERVAL = float(os.getenv('CACHE_WARM_INTERVAL', '0'))
+
+# Ranges /api/bootstrap reads; cooldowns come from submission_index
+BOOTSTRAP_RANGES = [
+    (GOOGLE_SHEET_ID_QUESTIONS, QUESTIONS_RANGE),
+    (GOOGLE_SHEET_ID_MAPPING, MAPPING_RANGE)
+]
+
+def warm_sheet_cache():
+    """Load every warm range into the cache with one batched read."""
+    started = time.time()
+    try:
+        with background_sheets_calls():
+            sheet_cache.refresh_many(WARM_RANGES)
+        print(f"Warmed {len(WARM_RANGES)} cached ranges in {time.time() - started:.2f}s")
+    except Exception as e:
+        print(f"Error warming sheet cache: {e}")
+
+def _cache_warm_loop():
+    while True:
+        warm_sheet_cache()
+        time.sleep(CACHE_WARM_INTERVAL)
+
+class AppendOnlySheetLoader:
+    """Keeps a local copy of an append-only sheet and fetches only new rows.
+
+    Each refresh reads, in one batchGet, the header row, the last row already
+    held and everything after it. A changed header or last row means earlier
+    rows were edited or removed, and every `sample_every` refreshes a block of
+    older rows is compared too; any mismatch triggers a full reload.
+    `generation` changes on every full reload.
+    """
+
+    def __init__(self, spreadsheet_id, sheet_name, sample_every, sample_rows):
+        self._spreadsheet_id = spreadsheet_id
+        self._sheet_name = sheet_name
+        self._sample_every = sample_every
+        self._sample_rows = sample_rows
+        self._lock = threading.Lock()
+        self._sample_start = 2
+        self.values = None
+        self.generation = 0
+        self.refreshes = 0
+        self.full_reloads = 0
+        self.rows_fetched = 0
+
+    def _range(self, first_row, last_row):
+        return f"{quote_sheet_name(self._sheet_name)}!{first_row}:{last_row}"
+
+    def _full_reload(self, reason):
+        print(f"Full reload of {self._sheet_name} ({reason})")
+        values = fetch_sheet_values(self._spreadsheet_id, quote_sheet_name(self._sheet_name))
+        self.values = values
+        self.generation += 1
+        self.full_reloads += 1
+        self.rows_fetched += len(values)
+        return values
+
+    def _next_sample(self, held_rows):
+        """Rotate a block of older data rows to compare, as (first, last) sheet rows."""
+        first = self._sample_start
+        if first >= held_rows:
+            first = 2
+        last = min(first + self._sample_rows - 1, held_rows - 1)
+        self._sample_start = last + 1
+        return first, last
+
+    def load(self):
+        with self._lock:
+            self.refreshes += 1
+            if self.values is None:
+                return self._full_reload('reset' if self.generation else 'initial load')
+            if not self.values:
+                return self._full_reload('sheet was empty')
+            
+            held = len(self.values)
+            header_range = self._range(1, 1)
+            last_range = self._range(held, held)
+            tail_range = sheet_grid.rows_range(self._spreadsheet_id, self._sheet_name, held + 1, len(self.values[0]))
+            ranges = [header_range, last_range, tail_range]
+            
+            sample = None
+            if self._sample_every and self.refreshes % self._sample_every == 0 and held > 2:
+                sample = self._next_sample(held)
+                ranges.append(self._range(*sample))
+            
+            try:
+                results = fetch_sheet_values_batch([(self._spreadsheet_id, r) for r in ranges])
+            except HttpError as e:
+                # e.g. the tail range starts past the end of the grid
+                if e.resp.status != 400:
+                    raise
+                return self._full_reload(f"tail read rejected: {e}")
+            
+            def fetched(range_name):
+                return results[(self._spreadsheet_id, range_name)]
+            
+            if fetched(header_range)[:1] != self.values[:1]:
+                return self._full_reload('header changed')
+            if fetched(last_range)[:1] != self.values[held - 1:held]:
+                return self._full_reload('row count mismatch')
+            if sample is not None and fetched(self._range(*sample)) != self.values[sample[0] - 1:sample[1]]:
+                return self._full_reload(f"rows {sample[0]}-{sample[1]} changed")
+            
+            tail = fetched(tail_range)
+            if tail:
+                self.values = self.values + tail
+                self.rows_fetched += len(tail)
+            return self.values
+
+    def reset(self):
+        """Drop the held rows so the next load re-reads the whole sheet.
+
+        The incremental refresh only notices edits to the header, the last
+        row and the sampled rows; after an edit anywhere else this makes it
+        start over with a new generation.
+        """
+        with self._lock:
+            self.values = None
+
+    def snapshot(self):
+        """Return the held values and their generation as one consistent pair."""
+        with self._lock:
+            return self.values or [], self.generation
+
+    def stats(self):
+        with self._lock:
+            return {
+                'rows_held': len(self.values or []),
+                'generation': self.generation,
+                'refreshes': self.refreshes,
+                'full_reloads': self.full_reloads,
+                'rows_fetched': self.rows_fetched
+            }
+
+# Cursors handed out by /api/responses are only valid within this process
+RESPONSES_CURSOR_EPOCH = uuid.uuid4().hex[:8]
+
+def make_responses_cursor(generation, row_count):
+    return f"{RESPONSES_CURSOR_EPOCH}.{generation}.{row_count}"
+
+def responses_cursor_offset(cursor, generation, row_count):
+    """Return how many data rows the cursor's holder already has.
+
+    None means the cursor cannot be continued (another process, a full
+    reload since, or garbage) and the client must reload everything.
+    """
+    try:
+        epoch, cursor_generation, offset = cursor.split('.')
+        cursor_generation = int(cursor_generation)
+        offset = int(offset)
+    except ValueError:
+        return None
+    if epoch != RESPONSES_CURSOR_EPOCH or cursor_generation != generation:
+        return None
+    if offset < 0 or offset > row_count:
+        return None
+    return offset
+
+def invalidate_sheet(name, reload=False):
+    """Drop every cached range of a named sheet.
+
+    With `reload` the responses loader also forgets its rows, so edits to
+    existing rows are picked up by a full read; plain invalidation after an
+    append keeps the incremental refresh.
+    """
+    if reload and name == 'responses':
+        responses_loader.reset()
+    spreadsheet_id, sheet_name = NAMED_SHEETS[name]
+    return sheet_cache.invalidate(spreadsheet_id, sheet_name)
+
+def mirror_changed(spreadsheet_id, sheet_name, appended_only):
+    """Changed rows reach the endpoints on their next read; edits to the
+    responses sheet need the loader to re-read it in full."""
+    if not appended_only and (spreadsheet_id, sheet_name) == NAMED_SHEETS['responses']:
+        responses_loader.reset()
+    sheet_cache.invalidate(spreadsheet_id, sheet_name)
+
+def staleness_fields(*entries):
+    """Response fields saying whether any entry is a copy served after an upstream or mirror sync failure."""
+    degraded = [entry for entry in entries if entry.error]
+    if not degraded:
+        return {'stale': False}
+    oldest = min(entry.synced_at for entry in degraded)
+    return {
+        'stale': True,
+        'stale_age_seconds': round(time.time() - oldest),
+        'fetched_at': datetime.fromtimestamp(oldest, timezone.utc).isoformat(),
+        'upstream_error': degraded[0].error
+    }
+
+# Payload shapes of the large read endpoints
+class DecodedRow(tuple):
+    """Cells of one sheet row, padded to the width of its header.
+
+    RowDecoder makes one subclass per header that holds the header -> index
+    map, so a row stores nothing but its cells. Rows are read like dicts
+    with row.get(header) and only become dicts when serialized.
+    """
+
+    __slots__ = ()
+    headers = ()
+    index = {}
+
+    def get(self, header, default=None):
+        i = self.index.get(header)
+        return default if i is None else self[i]
+
+    def to_dict(self):
+        return dict(zip(self.headers, self))
+
+class RowDecoder:
+    """Row decoder compiled once per header.
+
+    Decoding a row is one slice and one concatenation with precomputed
+    padding, with no per-cell branching; cells past the header are dropped
+    and missing ones are ''.
+    """
+
+    def __init__(self, headers):
+        self.headers = tuple(headers)
+        self.index = {header: i for i, header in enumerate(self.headers)}
+        self.row_type = type('Row', (DecodedRow,), {
+            '__slots__': (),
+            'headers': self.headers,
+            'index': self.index
+        })
+        self._width = len(self.headers)
+        self._padding = ('',) * self._width
+        # Keys in the order jsonify sorts them, each already encoded
+        fields = sorted(self.index.items())
+        self._key_prefixes = [json.dumps(header) + ':' for header, _ in fields]
+        self._key_positions = [i for _, i in fields]
+
+    def decode_all(self, rows):
+        row_type, width, padding = self.row_type, self._width, self._padding
+        return [row_type(tuple(row[:width]) + padding[len(row):]) for row in rows]
+
+    def encode_json(self, rows):
+        """Decoded rows as JSON object text, byte for byte what jsonify writes for their dicts."""
+        prefixes, positions = self._key_prefixes, self._key_positions
+        encoded = []
+        for row in rows:
+            cells = [row[i] for i in positions]
+            try:
+                values = map(encode_basestring_ascii, cells)
+                encoded.append('{' + ','.join(map(str.__add__, prefixes, values)) + '}')
+            except TypeError:
+                # A cell that is not a string
+                encoded.append(json.dumps(dict(zip(self.headers, row)), sort_keys=True, separators=(',', ':')))
+        return encoded
+
+@lru_cache(maxsize=64)
+def _row_decoder(headers):
+    return RowDecoder(headers)
+
+def row_decoder(headers):
+    """The compiled decoder for a header row, shared by every reader of the sheet."""
+    return _row_decoder(tuple(headers))
+
+def row_dicts(rows):
+    """Decoded rows as header -> value dicts, for serialization."""
+    if not rows:
+        return []
+    headers = rows[0].headers
+    return [dict(zip(headers, row)) for row in rows]
+
+RESPONSE_FORMATS = ('records', 'rows', 'columnar')
+# Columnar columns with at most this share of distinct values are dictionary-encoded
+COLUMNAR_DICTIONARY_RATIO = 0.5
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+def encode_columnar(headers, rows):
+    """Per-column arrays for rows given as lists in header order.
+
+    A low-cardinality column is sent as its distinct values once plus one
+    index into them per row.
+    """
+    columns = []
+    for i, header in enumerate(headers):
+        values = [row[i] for row in rows]
+        dictionary = {}
+        codes = [dictionary.setdefault(value, len(dictionary)) for value in values]
+        if len(dictionary) <= len(values) * COLUMNAR_DICTIONARY_RATIO:
+            columns.append({'name': header, 'dictionary': list(dictionary), 'codes': codes})
+        else:
+            columns.append({'name': header, 'values': values})
+    return columns
+
+def shape_records(response_format, headers, rows):
+    """Payload fields for decoded rows, limited to `headers`, in the requested format.
+
+    'records' sends header -> value dicts, 'rows' sends each row as a list
+    in header order, and 'columnar' sends per-column arrays.
+    """
+    if rows and tuple(headers) != rows[0].headers:
+        positions = [rows[0].index[header] for header in headers]
+        rows = [[row[i] for i in positions] for row in rows]
+    if response_format == 'records':
+        return {'data': [dict(zip(headers, row)) for row in rows], 'format': 'records'}
+    if response_format == 'rows':
+        return {'data': rows, 'format': 'rows'}
+    return {'data': encode_columnar(headers, rows), 'format': 'columnar'}
+
+def requested_format():
+    """The ?format= of the request; raises ValueError for an unknown one."""
+    response_format = request.args.get('format', 'records')
+    if response_format not in RESPONSE_FORMATS:
+        raise ValueError(f"Unknown format '{response_format}'. Expected one of: {', '.join(RESPONSE_FORMATS)}")
+    return response_format
+
+def negotiated_mimetype():
+    """application/json, or a MessagePack type when Accept prefers it and msgpack is installed."""
+    if msgpack is not None:
+        best = request.accept_mimetypes.best_match(('application/json',) + MSGPACK_MIMETYPES)
+        if best in MSGPACK_MIMETYPES:
+            return best
+    return 'application/json'
+
+class JSONFragments(list):
+    """Items already encoded as JSON text, spliced into a JSON body as they are."""
+
+def encode_payload(payload, mimetype):
+    if mimetype in MSGPACK_MIMETYPES:
+        return msgpack.packb(payload, use_bin_type=True)
+    data = payload.get('data')
+    if isinstance(data, JSONFragments):
+        envelope = jsonify({key: value for key, value in payload.items() if key != 'data'}).get_data()
+        return b''.join((envelope.rstrip()[:-1], b',"data":[', ','.join(data).encode('utf-8'), b']}\n'))
+    return jsonify(payload).get_data()
+
+def negotiated_encoding():
+    """'br' or 'gzip' as the client's Accept-Encoding allows, else None."""
+    encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+    return request.accept_encodings.best_match(encodings)
+
+def compress_body(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+class EncodedBodyCache:
+    """LRU of encoded response bodies keyed by ETag, bounded by total bytes.
+
+    Repeated reads of an unchanged sheet are served from here without
+    building, serializing or compressing the payload again.
+    """
+
+    def __init__(self, max_bytes):
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bodies = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, etag):
+        with self._lock:
+            cached = self._bodies.get(etag)
+            if cached is None:
+                self.misses += 1
+                return None
+            self._bodies.move_to_end(etag)
+            self.hits += 1
+            return cached
+
+    def put(self, etag, body, mimetype, encoding):
+        if len(body) > self._max_bytes:
+            return
+        with self._lock:
+            previous = self._bodies.pop(etag, None)
+            if previous is not None:
+                self._size -= len(previous[0])
+            self._bodies[etag] = (body, mimetype, encoding)
+            self._size += len(body)
+            while self._size > self._max_bytes:
+                _, (evicted, _, _) = self._bodies.popitem(last=False)
+                self._size -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'bodies': len(self._bodies),
+                'bytes': self._size,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+# Sheet versions restart in every process, so ETags carry a process token too
+ETAG_EPOCH = uuid.uuid4().hex[:8]
+
+def cached_read(entries, build_payload, variant=''):
+    """Conditional, compressed response for a read endpoint over cached sheet entries.
+
+    The strong ETag covers the entries' versions, the request's path and
+    query, the negotiated media type and content coding, and `variant`
+    (anything else the body depends on). A matching If-None-Match gets 304.
+    `build_payload` runs only when no encoded body is cached for the ETag.
+    Entries served stale after an upstream failure get no ETag and no caching.
+    """
+    mimetype = negotiated_mimetype()
+    encoding = negotiated_encoding()
+    etag = None
+    if not any(entry.error for entry in entries):
+        representation = '|'.join((request.full_path, mimetype, encoding or 'identity', variant))
+        etag = '{}-{}-{}'.format(
+            ETAG_EPOCH,
+            '.'.join(str(entry.version) for entry in entries),
+            hashlib.sha1(representation.encode('utf-8')).hexdigest()[:16]
+        )
+    
+    if etag is not None and etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+    else:
+        cached = encoded_bodies.get(etag) if etag is not None else None
+        if cached is not None:
+            body, mimetype, body_encoding = cached
+        else:
+            body = encode_payload(build_payload(), mimetype)
+            body_encoding = None
+            if encoding and len(body) >= COMPRESS_MIN_BYTES:
+                body = compress_body(body, encoding)
+                body_encoding = encoding
+            if etag is not None:
+                encoded_bodies.put(etag, body, mimetype, body_encoding)
+        response = current_app.response_class(body, mimetype=mimetype)
+        if body_encoding:
+            response.headers['Content-Encoding'] = body_encoding
+    
+    if etag is not None:
+        response.set_etag(etag)
+    response.vary.update(('Accept', 'Accept-Encoding'))
+    return response
+
+def wants_ndjson():
+    """Whether the client asked for a stream, by ?stream=1 or an Accept header preferring NDJSON."""
+    if request.args.get('stream') in ('1', 'true'):
+        return True
+    return request.accept_mimetypes.best_match(('application/json', NDJSON_MIMETYPE)) == NDJSON_MIMETYPE
+
+def ndjson_response(meta, items):
+    """Stream a metadata line and then one JSON line per item.
+
+    Items are encoded one at a time as the client reads, so the body is
+    never built in memory and the first rows go out immediately.
+    """
+    def generate():
+        yield json.dumps(meta) + '\n'
+        for item in items:
+            yield json.dumps(item) + '\n'
+    
+    response = current_app.response_class(generate(), mimetype=NDJSON_MIMETYPE)
+    response.vary.add('Accept')
+    return response
+
+def unavailable_response(e):
+    """503 for a read that failed fast with nothing cached to fall back on."""
+    response = jsonify({
+        'success': False,
+        'error': str(e),
+        'data': []
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(int(e.retry_after) + 1)
+    return response
+
+def append_to_sheet(spreadsheet_id, range_name, values):
+    """Append data to the configured storage backend."""
+    try:
+        result = storage.append_rows(spreadsheet_id, range_name, values)
+        if sheet_mirror is not None:
+            sheet_mirror.write_through(spreadsheet_id, result, values)
+        return result
+    except Exception as e:
+        print(f"Error appending to sheet: {e}")
+        raise
+
+def update_sheet(spreadsheet_id, range_name, values):
+    """Overwrite a range in the configured storage backend."""
+    try:
+        result = storage.update_range(spreadsheet_id, range_name, values)
+        if sheet_mirror is not None:
+            sheet_mirror.write_through(spreadsheet_id, result, values)
+        return result
+    except Exception as e:
+        print(f"Error updating sheet: {e}")
+        raise
+
+# Mapping columns holding the email of a leader for the row's employee
+LEADER_ROLES = ('POC', 'Manager', 'Account manager')
+# Mapping columns employees can be grouped by
+GROUP_COLUMNS = ('Process', 'Client')
+
+class HierarchyIndex:
+    """Adjacency lists over the leader columns of the mapping sheet.
+
+    Every structure holds row positions into the mapping rows, so lookups
+    never rescan the sheet.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.reports = {role: {} for role in LEADER_ROLES}
+        self.by_leader = {}
+        self.groups = {column: {} for column in GROUP_COLUMNS}
+        self.employee_emails = []
+        
+        for position, item in enumerate(rows):
+            self.employee_emails.append((item.get('Email') or '').lower())
+            
+            leaders = set()
+            for role in LEADER_ROLES:
+                leader = (item.get(role) or '').lower()
+                if '@' in leader:
+                    self.reports[role].setdefault(leader, []).append(position)
+                    leaders.add(leader)
+            for leader in leaders:
+                self.by_leader.setdefault(leader, []).append(position)
+            
+            for column in GROUP_COLUMNS:
+                value = item.get(column) or ''
+                if value:
+                    self.groups[column].setdefault(value, []).append(position)
+
+    def _rows(self, positions):
+        return [self.rows[position] for position in positions]
+
+    def direct_reports(self, leader, role=None):
+        """Rows that list the leader in one role column, or in any of them."""
+        leader = leader.lower()
+        if role:
+            return self._rows(self.reports[role].get(leader, ()))
+        return self._rows(self.by_leader.get(leader, ()))
+
+    def account_manager_rows(self, account_manager):
+        return self.direct_reports(account_manager, 'Account manager')
+
+    def group(self, column, value=None):
+        """Rows for one Process/Client value, or row counts for every value."""
+        if value is not None:
+            return self._rows(self.groups[column].get(value, ()))
+        return {name: len(positions) for name, positions in self.groups[column].items()}
+
+    def subtree(self, leader):
+        """Rows of everyone reachable below a leader, breadth first."""
+        root = leader.lower()
+        seen_leaders = {root}
+        seen_positions = set()
+        result = []
+        queue = deque([root])
+        
+        while queue:
+            current = queue.popleft()
+            for position in self.by_leader.get(current, ()):
+                if position in seen_positions:
+                    continue
+                seen_positions.add(position)
+                result.append(position)
+                
+                employee = self.employee_emails[position]
+                if employee and employee not in seen_leaders:
+                    seen_leaders.add(employee)
+                    queue.append(employee)
+        
+        return self._rows(result)
+
+class MappingIndex:
+    """Mapping sheet rows with lowercased Email and Ldap lookup tables."""
+
+    def __init__(self, values):
+        self.headers = values[0] if values else []
+        self.rows = row_decoder(self.headers).decode_all(values[1:])
+        self.by_email = {}
+        self.by_ldap = {}
+        
+        for position, item in enumerate(self.rows):
+            email = (item.get('Email') or '').lower()
+            ldap = (item.get('Ldap') or '').lower()
+            if email:
+                self.by_email.setdefault(email, []).append(position)
+            if ldap:
+                self.by_ldap.setdefault(ldap, []).append(position)
+        
+        self.hierarchy = HierarchyIndex(self.rows)
+
+    def lookup(self, email):
+        """Return the rows whose Email or Ldap matches, in sheet order."""
+        key = email.lower()
+        positions = set(self.by_email.get(key, ()))
+        positions.update(self.by_ldap.get(key, ()))
+        return [self.rows[position] for position in sorted(positions)]
+
+def get_mapping_index():
+    """Return the index for the current mapping sheet and the cache entry it was built from."""
+    entry = sheet_cache.get_entry(GOOGLE_SHEET_ID_MAPPING, MAPPING_RANGE)
+    return mapping_index.get(entry), entry
+
+RATING_OPTIONS = ['Strongly Disagree', 'Disagree', 'Neutral', 'Agree', 'Strongly Agree']
+
+# Lowercased fragments marking non-question rows of the questions sheet
+QUESTION_SKIP_FRAGMENTS = (
+    'about you', 'your role', 'overall rating', 'gender', 'tenure',
+    'designation', 'level', 'age'
+)
+
+def parse_survey_questions(values):
+    """Turn the questions sheet into the question list shown on the feedback form.
+
+    Mirrors transformQuestionsData in FeedbackPage.tsx, so question ids and
+    texts (which become response sheet columns) stay identical.
+    """
+    if len(values) < 2 or not values[0]:
+        return []
+    
+    questions = []
+    category = 'General'
+    for row in values[1:]:
+        text = (row[0] if row else '').strip()
+        if not text:
+            continue
+        
+        lowered = text.lower()
+        if lowered.startswith('topic:'):
+            category = text.replace('Topic:', '').strip()
+            continue
+        
+        # Rating options listed under each topic
+        if text in ('Strongly disagree', 'disagree', 'neutral', 'agree', 'Strongly agree') \
+                or 'strongly disagree' in lowered or 'strongly agree' in lowered:
+            continue
+        
+        # Section headers and demographics
+        if any(fragment in lowered for fragment in QUESTION_SKIP_FRAGMENTS) or len(text) < 5:
+            continue
+        
+        if len(text) >= 10:
+            questions.append({
+                'question_id': f"q{len(questions) + 1}",
+                'question_text': text,
+                'question_type': 'rating',
+                'options': list(RATING_OPTIONS),
+                'category': category,
+                'required': True
+            })
+    
+    return questions
+
+def encrypt_submitter_id(email):
+    """SHA-256 of the normalized email, as stored in 'Encrypted Submitter ID'."""
+    return hashlib.sha256(email.strip().lower().encode('utf-8')).hexdigest()
+
+# Timestamp layouts seen in the responses sheet besides ISO 8601
+TIMESTAMP_FORMATS = ('%m/%d/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y %H:%M:%S', '%m/%d/%Y', '%Y-%m-%d')
+
+def parse_timestamp(value):
+    """Parse a response Timestamp cell into an aware UTC datetime, or None."""
+    value = (value or '').strip()
+    if not value:
+        return None
+    
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        parsed = None
+        for layout in TIMESTAMP_FORMATS:
+            try:
+                parsed = datetime.strptime(value, layout)
+                break
+            except ValueError:
+                continue
+        if parsed is None:
+            return None
+    
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+def build_latest_submissions(values):
+    """Map (Encrypted Submitter ID, lowercased Management Email ID) to the latest Timestamp."""
+    latest = {}
+    if not values:
+        return latest
+    
+    headers = values[0]
+    try:
+        submitter_col = headers.index('Encrypted Submitter ID')
+        target_col = headers.index('Management Email ID')
+        timestamp_col = headers.index('Timestamp')
+    except ValueError:
+        return latest
+    
+    width = max(submitter_col, target_col, timestamp_col) + 1
+    for row in values[1:]:
+        if len(row) < width:
+            row = row + [''] * (width - len(row))
+        submitted_at = parse_timestamp(row[timestamp_col])
+        if submitted_at is None:
+            continue
+        key = (row[submitter_col], row[target_col].lower())
+        if key not in latest or latest[key] < submitted_at:
+            latest[key] = submitted_at
+    return latest
+
+def get_display_name(email):
+    """Readable name from an email address, as getDisplayName does on the form."""
+    if '@' not in email:
+        return email
+    name = email.split('@')[0].replace('.', ' ').replace('_', ' ')
+    return ''.join(
+        char.upper() if i == 0 or not name[i - 1].isalnum() else char
+        for i, char in enumerate(name)
+    )
+
+def cooldown_status(latest, submitter_id, target_email, now):
+    """Return ('ALLOWED' | 'BLOCKED', cooldown end iso string or None)."""
+    submitted_at = latest.get((submitter_id, target_email.lower()))
+    if submitted_at is None:
+        return 'ALLOWED', None
+    cooldown_end = submitted_at + timedelta(days=FEEDBACK_COOLDOWN_DAYS)
+    if cooldown_end <= now:
+        return 'ALLOWED', None
+    return 'BLOCKED', cooldown_end.isoformat()
+
+# Target groups shown on the form, keyed by the mapping column they come from
+TARGET_GROUPS = (('POC', 'POC'), ('Manager', 'Manager'), ('Account Manager', 'Account manager'))
+
+def resolve_feedback_targets(user_rows, latest, submitter_id, unique=False):
+    """Build the POC / Manager / Account Manager targets offered to a user.
+
+    `user_rows` is the user's own mapping row, or every mapping row when the
+    user is unknown; `unique` then lists each leader email only once.
+    """
+    now = datetime.now(timezone.utc)
+    targets = {role: [] for role, _ in TARGET_GROUPS}
+    seen = set()
+    
+    for row in user_rows:
+        process = row.get('Process') or 'General'
+        for role, column in TARGET_GROUPS:
+            email = row.get(column) or ''
+            if '@' not in email or (unique and email.lower() in seen):
+                continue
+            seen.add(email.lower())
+            status, cooldown_ends = cooldown_status(latest, submitter_id, email, now)
+            targets[role].append({
+                'email': email,
+                'name': get_display_name(email),
+                'process': process,
+                'role': role,
+                'status': status,
+                'cooldown_ends': cooldown_ends
+            })
+    return targets
+
+def build_user_data(row, user_email):
+    """User details and demographics for the form, as transformMappingData builds them."""
+    email = row.get('Email') or user_email
+    return {
+        'email': email,
+        'name': get_display_name(email),
+        'process': row.get('Process') or 'General',
+        'ldap': row.get('Ldap') or None,
+        'gender': row.get('Gender') or '',
+        'tenure': row.get('Tenure') or '',
+        'designation': row.get('Designation') or row.get('Designation/Level') or '',
+        'age': row.get('Age') or '',
+        'genderOfManagement': row.get('Gender of Management') or row.get('Gender of the management') or ''
+    }
+
+# Exact-match filters of /api/responses: query parameter -> column
+RESPONSE_COLUMN_FILTERS = {
+    'role': 'Role Reviewed',
+    'gender': 'Gender',
+    'designation': 'Designation/Level',
+    'age': 'Age',
+    'process': 'Process',
+    'gender_of_user': 'Gender of the user',
+    'management_email': 'Management Email ID'
+}
+# Tenure buckets of the admin filters as (name, from years, below years)
+TENURE_BUCKETS = (('0-1', 0, 1), ('1-3', 1, 3), ('3-5', 3, 5), ('5+', 5, None))
+TIME_PERIODS = ('today', 'week', 'month', 'quarter', 'year')
+
+LEADING_NUMBER = re.compile(r'\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?')
+
+def parse_leading_number(value):
+    """The number at the start of the text, like JavaScript's parseFloat, or None."""
+    match = LEADING_NUMBER.match(value or '')
+    return float(match.group(0)) if match else None
+
+def parse_tenure(value):
+    """Tenure in years, reading only the digits and dots of the cell as the admin page does."""
+    return parse_leading_number(re.sub(r'[^0-9.]', '', value or ''))
+
+def tenure_bucket(years):
+    if years is None:
+        return 'unknown'
+    for name, low, high in TENURE_BUCKETS:
+        if years >= low and (high is None or years < high):
+            return name
+    return 'unknown'
+
+def months_before(day, months):
+    """The same day `months` calendar months earlier, clamped to the month's end."""
+    month_index = day.year * 12 + day.month - 1 - months
+    year, month = divmod(month_index, 12)
+    month += 1
+    following = datetime(year + (month == 12), month % 12 + 1, 1, tzinfo=day.tzinfo)
+    return day.replace(year=year, month=month, day=min(day.day, (following - timedelta(days=1)).day))
+
+def time_period_start(period, now):
+    """Earliest local time included in a time period filter."""
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period in ('today', 'week'):
+        return today - timedelta(days=7 if period == 'week' else 0)
+    return months_before(today, {'month': 1, 'quarter': 3, 'year': 12}[period])
+
+class ResponseRecords:
+    """Responses as header -> value dicts with the fields the filters need parsed once.
+
+    Follows the append-only loader: rows appended since the last sync are
+    decoded and added, and a full reload (new generation) or a changed
+    header rebuilds everything. Each record is a tuple of (data row number,
+    decoded row, timestamp, tenure years, rating). The JSON object of each
+    row is encoded once, the first time it is served, and kept with it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = None
+        self.headers = []
+        self.records = []
+        self._encoded = []
+        self.rows_decoded = 0
+        self.rows_encoded = 0
+
+    def sync(self, values, generation):
+        """Decode new rows of a loader snapshot.
+
+        Returns (headers, records, count); only the first `count` records
+        belong to this snapshot, as later syncs keep appending to the list.
+        """
+        with self._lock:
+            headers = values[0] if values else []
+            if generation != self._generation or headers != self.headers or len(values) - 1 < len(self.records):
+                self._generation = generation
+                self.headers = headers
+                self.records = []
+                self._encoded = []
+            
+            records = self.records
+            for record in row_decoder(headers).decode_all(values[1 + len(records):]):
+                records.append((
+                    len(records) + 1,
+                    record,
+                    parse_timestamp(record.get('Timestamp')),
+                    parse_tenure(record.get('Tenure')),
+                    parse_leading_number(record.get('Rating'))
+                ))
+                self.rows_decoded += 1
+            return self.headers, records, len(records)
+
+    def encoded(self, records, page):
+        """JSON objects of the full rows of `page`, records taken from `records` (a sync result)."""
+        with self._lock:
+            if records is not self.records:
+                # Synced again from scratch since; nothing kept applies
+                return JSONFragments(row_decoder(page[0][1].headers).encode_json([record[1] for record in page])
+                                     if page else [])
+            encoded = self._encoded
+            last = max((record[0] for record in page), default=0)
+            if last > len(encoded):
+                self.rows_encoded += last - len(encoded)
+                encoded.extend(row_decoder(self.headers).encode_json(
+                    [record[1] for record in records[len(encoded):last]]
+                ))
+            return JSONFragments(encoded[record[0] - 1] for record in page)
+
+# Responses sheet columns describing the submission; every other column is a question
+SUBMISSION_COLUMNS = (
+    'Timestamp', 'Encrypted Submitter ID', 'Role Reviewed', 'Process', 'Management Email ID',
+    'Gender', 'Tenure', 'Designation/Level', 'Age', 'Gender of the user', 'Additional Comments', 'Rating'
+)
+# Columns /api/answers/summary can group rating counts by
+ANSWER_GROUPS = {
+    'management_email': 's.management_email',
+    'process': 's.process',
+    'role': 's.role',
+    'question': 'a.question_id'
+}
+
+class AnswerStore:
+    """Responses in long format, in SQLite: a submissions table and one
+    answers row per (submission, question_id).
+
+    Likert answers are stored as codes 1-5 (positions in RATING_OPTIONS) and
+    other answers as text. Question ids are small integers given to each
+    question text the first time it appears as a column. The store is
+    migrated from the wide responses sheet: rows appended since the last
+    sync are split into submission and answer rows, and a changed header or
+    last row rebuilds it. wide_values() turns it back into the sheet's
+    header and rows, so /api/responses keeps its shape.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS answer_questions (
+                question_id INTEGER PRIMARY KEY,
+                question_text TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS submissions (
+                submission_id INTEGER PRIMARY KEY,
+                timestamp TEXT,
+                submitter_id TEXT,
+                management_email TEXT,
+                role TEXT,
+                process TEXT,
+                details TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS submissions_management_email ON submissions (management_email);
+            CREATE INDEX IF NOT EXISTS submissions_timestamp ON submissions (timestamp);
+            CREATE TABLE IF NOT EXISTS answers (
+                submission_id INTEGER NOT NULL,
+                question_id INTEGER NOT NULL,
+                code INTEGER,
+                answer_text TEXT,
+                PRIMARY KEY (submission_id, question_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS answers_question_code ON answers (question_id, code);
+            CREATE TABLE IF NOT EXISTS answer_store_state (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        ''')
+        state = dict(self._db.execute('SELECT key, value FROM answer_store_state'))
+        # The migrated header and how many sheet rows (header included) are in the store
+        self._headers = json.loads(state.get('headers', '[]'))
+        self._rows = int(state.get('rows', '0'))
+        self._wide = None
+        # Loader generation last compared in full; None until the first sync
+        self._generation = None
+        self.rebuilds = 0
+        self.rows_migrated = 0
+        self.rows_updated = 0
+
+    def _question_ids(self, headers):
+        """Column position -> question_id for the question columns of a header."""
+        ids = {}
+        for position, header in enumerate(headers):
+            if header in SUBMISSION_COLUMNS or not header:
+                continue
+            self._db.execute('INSERT OR IGNORE INTO answer_questions (question_text) VALUES (?)', (header,))
+            ids[position] = self._db.execute(
+                'SELECT question_id FROM answer_questions WHERE question_text = ?', (header,)
+            ).fetchone()[0]
+        return ids
+
+    def _migrate(self, numbered_rows):
+        """Split (sheet row number, wide row) pairs into submissions and answers."""
+        question_ids = self._question_ids(self._headers)
+        codes = {option: code for code, option in enumerate(RATING_OPTIONS, 1)}
+        submissions = []
+        answers = []
+        for row_number, row in numbered_rows:
+            if not row:
+                continue
+            details = {
+                header: row[position]
+                for position, header in enumerate(self._headers)
+                if position not in question_ids and position < len(row) and row[position] != ''
+            }
+            timestamp = parse_timestamp(details.get('Timestamp'))
+            submissions.append((
+                row_number,
+                timestamp.isoformat() if timestamp else None,
+                details.get('Encrypted Submitter ID'),
+                (details.get('Management Email ID') or '').strip().lower() or None,
+                details.get('Role Reviewed'),
+                details.get('Process'),
+                json.dumps(details)
+            ))
+            for position, question_id in question_ids.items():
+                value = row[position] if position < len(row) else ''
+                if value != '':
+                    code = codes.get(value)
+                    answers.append((row_number, question_id, code, None if code else value))
+        self._db.executemany('INSERT OR REPLACE INTO submissions VALUES (?, ?, ?, ?, ?, ?, ?)', submissions)
+        self._db.executemany('INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?)', answers)
+        self.rows_migrated += len(submissions)
+
+    def _wide_rows(self, first_row, last_row):
+        """Sheet rows first_row..last_row rebuilt from the store."""
+        positions = {header: position for position, header in enumerate(self._headers)}
+        rows = {}
+        for submission_id, details in self._db.execute(
+                'SELECT submission_id, details FROM submissions WHERE submission_id BETWEEN ? AND ?',
+                (first_row, last_row)):
+            row = [''] * len(self._headers)
+            for header, value in json.loads(details).items():
+                row[positions[header]] = value
+            rows[submission_id] = row
+        for submission_id, question_text, code, answer_text in self._db.execute(
+                'SELECT a.submission_id, q.question_text, a.code, a.answer_text FROM answers a '
+                'JOIN answer_questions q ON q.question_id = a.question_id '
+                'WHERE a.submission_id BETWEEN ? AND ?',
+                (first_row, last_row)):
+            rows[submission_id][positions[question_text]] = RATING_OPTIONS[code - 1] if code else answer_text
+        return [trim_row(rows.get(row_number, [])) for row_number in range(first_row, last_row + 1)]
+
+    def sync(self, values, generation=None):
+        """Migrate the rows of `values` (the wide sheet) that are not in the store yet.
+
+        A new loader generation means the sheet was re-read in full, so rows
+        already in the store are compared with it and the edited ones replaced.
+        """
+        with self._lock:
+            headers = values[0] if values else []
+            if headers != self._headers or len(values) < self._rows or (
+                    self._rows > 1 and self._wide_rows(self._rows, self._rows)[0] != trim_row(values[self._rows - 1])):
+                with self._db:
+                    self._db.execute('DELETE FROM answers')
+                    self._db.execute('DELETE FROM submissions')
+                self._headers = headers
+                self._rows = 1 if headers else 0
+                self._wide = None
+                self.rebuilds += 1
+            elif generation != self._generation and self._rows > 1:
+                changed = [
+                    (row_number, row)
+                    for row_number, (row, stored) in enumerate(
+                        zip(values[1:self._rows], self._wide_rows(2, self._rows)), 2)
+                    if trim_row(row) != stored
+                ]
+                if changed:
+                    with self._db:
+                        for row_number, _ in changed:
+                            self._db.execute('DELETE FROM answers WHERE submission_id = ?', (row_number,))
+                            self._db.execute('DELETE FROM submissions WHERE submission_id = ?', (row_number,))
+                        self._migrate(changed)
+                    self._wide = None
+                    self.rows_updated += len(changed)
+            self._generation = generation
+            
+            if len(values) > self._rows:
+                first_row = self._rows + 1
+                with self._db:
+                    self._migrate(enumerate(values[self._rows:], first_row))
+                    self._rows = len(values)
+                    self._db.executemany(
+                        'INSERT OR REPLACE INTO answer_store_state (key, value) VALUES (?, ?)',
+                        [('headers', json.dumps(self._headers)), ('rows', str(self._rows))]
+                    )
+                if self._wide is not None:
+                    self._wide.extend(self._wide_rows(first_row, self._rows))
+
+    def wide_values(self):
+        """The responses sheet as header and rows, rebuilt from the store."""
+        with self._lock:
+            if not self._headers:
+                return []
+            if self._wide is None:
+                self._wide = self._wide_rows(2, self._rows)
+            return [self._headers] + self._wide
+
+    def long_format(self, management_email=None):
+        """Question catalogue, submissions and (submission_id, question_id, code, text) answers."""
+        where = ' WHERE s.management_email = ?' if management_email else ''
+        args = (management_email.strip().lower(),) if management_email else ()
+        with self._lock:
+            questions = [
+                {'question_id': question_id, 'question_text': question_text}
+                for question_id, question_text
+                in self._db.execute('SELECT question_id, question_text FROM answer_questions ORDER BY question_id')
+            ]
+            submissions = [
+                {'submission_id': submission_id, 'timestamp': timestamp, 'submitter_id': submitter_id,
+                 'management_email': email, 'role': role, 'process': process}
+                for submission_id, timestamp, submitter_id, email, role, process in self._db.execute(
+                    'SELECT submission_id, timestamp, submitter_id, management_email, role, process '
+                    'FROM submissions s' + where + ' ORDER BY submission_id', args)
+            ]
+            answers = self._db.execute(
+                'SELECT a.submission_id, a.question_id, a.code, a.answer_text FROM answers a '
+                'JOIN submissions s ON s.submission_id = a.submission_id' + where +
+                ' ORDER BY a.submission_id, a.question_id', args
+            ).fetchall()
+        return questions, submissions, [list(answer) for answer in answers]
+
+    def summary(self, group_by, management_email=None):
+        """Likert answer counts per code for each value of `group_by` (a key of ANSWER_GROUPS)."""
+        column = ANSWER_GROUPS[group_by]
+        where = ' AND s.management_email = ?' if management_email else ''
+        args = (management_email.strip().lower(),) if management_email else ()
+        from_where = ('FROM answers a JOIN submissions s ON s.submission_id = a.submission_id '
+                      f'WHERE a.code IS NOT NULL{where}')
+        groups = {}
+        with self._lock:
+            for key, submissions in self._db.execute(
+                    f'SELECT {column}, COUNT(DISTINCT a.submission_id) {from_where} GROUP BY {column}', args):
+                groups[key] = {'key': key, 'counts': [0] * len(RATING_OPTIONS), 'submissions': submissions}
+            for key, code, count in self._db.execute(
+                    f'SELECT {column}, a.code, COUNT(*) {from_where} GROUP BY {column}, a.code', args):
+                groups[key]['counts'][code - 1] = count
+        for group in groups.values():
+            answered = sum(group['counts'])
+            group['answers'] = answered
+            group['average'] = round(
+                sum(code * count for code, count in enumerate(group['counts'], 1)) / answered, 2
+            ) if answered else None
+        return sorted(groups.values(), key=lambda group: (group['key'] is None, str(group['key'])))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'rows': max(self._rows - 1, 0),
+                'rows_migrated': self.rows_migrated,
+                'rows_updated': self.rows_updated,
+                'rebuilds': self.rebuilds
+            }
+
+def response_filter(args, now):
+    """Predicate over ResponseRecords records for the admin filters in `args`, or None.
+
+    Mirrors AdminPage.filterResponses. Raises ValueError for an unknown
+    tenure bucket, time period or rating.
+    """
+    checks = []
+    for param, column in RESPONSE_COLUMN_FILTERS.items():
+        value = args.get(param)
+        if value:
+            checks.append(lambda record, column=column, value=value: record[1].get(column) == value)
+    
+    tenure = args.get('tenure')
+    if tenure:
+        if tenure != 'unknown' and tenure not in (name for name, _, _ in TENURE_BUCKETS):
+            raise ValueError(f"Unknown tenure '{tenure}'")
+        checks.append(lambda record: tenure_bucket(record[3]) == tenure)
+    
+    rating = args.get('rating')
+    if rating:
+        try:
+            rating = float(rating)
+        except ValueError:
+            raise ValueError(f"Rating must be a number, got '{rating}'")
+        checks.append(lambda record: record[4] == rating)
+    
+    period = args.get('time_period')
+    if period:
+        if period not in TIME_PERIODS:
+            raise ValueError(f"Unknown time_period '{period}'. Expected one of: {', '.join(TIME_PERIODS)}")
+        start = time_period_start(period, now)
+        
+        def in_period(record):
+            # Like the admin page: rows without a Timestamp pass, unreadable ones only fail 'today'
+            if not record[1].get('Timestamp'):
+                return True
+            if record[2] is None:
+                return period != 'today'
+            submitted_at = record[2].astimezone(now.tzinfo)
+            if period == 'today':
+                return submitted_at.date() == start.date()
+            return submitted_at >= start
+        checks.append(in_period)
+    
+    if not checks:
+        return None
+    return lambda record: all(check(record) for check in checks)
+
+def validate_feedback(feedback_data):
+    """Return an error message for a malformed submission, or None."""
+    if not feedback_data:
+        return 'No feedback data provided'
+    if not isinstance(feedback_data, dict):
+        return 'Feedback must be a JSON object'
+    for key, value in feedback_data.items():
+        if not key.strip():
+            return 'Feedback field names must not be empty'
+        if value is not None and not isinstance(value, (str, int, float, bool)):
+            return f"Feedback field '{key}' must be a plain value"
+    return None
+
+class ResponseSchema:
+    """Cached header row of the responses sheet and its header -> column map.
+
+    The header is read once and re-read only when a submission carries a key
+    it does not know, or after invalidate(). Creating the header for an empty
+    sheet happens under the lock and overwrites row 1 instead of appending,
+    so concurrent first submissions cannot produce two header rows.
+    """
+
+    def __init__(self, spreadsheet_id, sheet_name):
+        self._spreadsheet_id = spreadsheet_id
+        self._sheet_name = sheet_name
+        self._lock = threading.Lock()
+        self.headers = None
+        self.columns = {}
+        self.loads = 0
+
+    def _set_headers(self, headers):
+        self.headers = headers
+        self.columns = {header: i for i, header in enumerate(headers)}
+
+    def _load(self):
+        self._set_headers(storage.read_header(self._spreadsheet_id, self._sheet_name))
+        self.loads += 1
+
+    def _unknown_keys(self, feedback_list):
+        unknown = []
+        for feedback in feedback_list:
+            for key in feedback:
+                if key not in self.columns and key not in unknown:
+                    unknown.append(key)
+        return unknown
+
+    def headers_for(self, feedback_list):
+        """Return the column order to write submissions in, creating the header if needed."""
+        with self._lock:
+            if self.headers is None:
+                self._load()
+            elif self._unknown_keys(feedback_list):
+                # The sheet may have gained columns since it was cached
+                self._load()
+            
+            if not self.headers:
+                # No headers yet, create them from feedback data keys
+                headers = list(feedback_list[0].keys())
+                sheet_grid.ensure_columns(self._spreadsheet_id, self._sheet_name, len(headers))
+                header_result = update_sheet(
+                    self._spreadsheet_id,
+                    f"{quote_sheet_name(self._sheet_name)}!A1",
+                    [headers]
+                )
+                print(f"Headers written: {header_result}")
+                self._set_headers(headers)
+            
+            unknown = self._unknown_keys(feedback_list)
+            if unknown:
+                print(f"Ignoring fields not in the responses sheet header: {unknown}")
+            return self.headers
+
+    def unknown_fields(self, feedback_data):
+        """Fields of a submission the header does not have, or None if the header is unavailable."""
+        with self._lock:
+            if self.headers is None:
+                try:
+                    self._load()
+                except Exception as e:
+                    print(f"Error loading responses header: {e}")
+                    return None
+            if not self.headers:
+                return []
+            return [key for key in feedback_data if key not in self.columns]
+
+    def invalidate(self):
+        with self._lock:
+            self.headers = None
+            self.columns = {}
+
+    def stats(self):
+        with self._lock:
+            return {
+                'columns': len(self.headers) if self.headers is not None else None,
+                'loads': self.loads
+            }
+
+def prepare_response_rows(feedback_list):
+    """Map submissions to rows in the responses sheet's column order."""
+    headers = response_schema.headers_for(feedback_list)
+    rows = [[feedback.get(header, '') for header in headers] for feedback in feedback_list]
+    return headers, rows
+
+def rows_within_payload(rows, max_bytes):
+    """How many leading rows fit in one append request body (always at least one)."""
+    size = 0
+    for count, row in enumerate(rows):
+        size += len(json.dumps(row)) + 1
+        if size > max_bytes and count > 0:
+            return count
+    return len(rows)
+
+def append_response_rows(rows):
+    """Append rows to the responses sheet and drop its cached copy."""
+    width = max(len(row) for row in rows)
+    append_result = append_to_sheet(
+        GOOGLE_SHEET_ID_RESPONSES,
+        f"{quote_sheet_name(RESPONSES_SHEET_NAME)}!A:{column_letters(width - 1)}",
+        rows
+    )
+    invalidate_sheet('responses')
+    return append_result
+
+# Columns that identify a submission when checking whether it already reached the sheet
+SUBMISSION_KEY_COLUMNS = ('Timestamp', 'Encrypted Submitter ID', 'Management Email ID')
+
+def submission_fingerprint(headers, row):
+    columns = [headers.index(column) for column in SUBMISSION_KEY_COLUMNS if column in headers]
+    if len(columns) < len(SUBMISSION_KEY_COLUMNS):
+        columns = range(len(headers))
+    return tuple(str(row[i]) if i < len(row) and row[i] is not None else '' for i in columns)
+
+class FeedbackJournal:
+    """Append-only local journal of accepted submissions.
+
+    Every record is fsync'd before it is acknowledged. Records are
+    `submit` (a new submission), `flushing` (about to be appended to the
+    sheet) and `flushed` (appended). On open, submissions without a
+    `flushed` record are pending again; those with a `flushing` record are
+    in doubt because the append may have reached the sheet before a crash.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self.pending = OrderedDict()
+        self.in_doubt = set()
+
+    def open(self):
+        with self._lock:
+            if self._file is not None:
+                return
+            if os.path.exists(self._path):
+                self._replay()
+            self._rewrite()
+            if self.pending:
+                print(f"Replayed {len(self.pending)} unflushed submissions from {self._path}")
+
+    def _replay(self):
+        with open(self._path, encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write was never acknowledged
+                    continue
+                op = record.get('op')
+                if op == 'submit':
+                    self.pending[record['id']] = record
+                elif op == 'flushing':
+                    self.in_doubt.update(record['ids'])
+                elif op == 'flushed':
+                    for submission_id in record['ids']:
+                        self.pending.pop(submission_id, None)
+                        self.in_doubt.discard(submission_id)
+        self.in_doubt &= set(self.pending)
+
+    def _rewrite(self):
+        """Compact the journal down to what is still pending. Lock must be held."""
+        if self._file is not None:
+            self._file.close()
+        temp_path = f"{self._path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as journal:
+            for record in self.pending.values():
+                journal.write(json.dumps(record) + '\n')
+            if self.in_doubt:
+                journal.write(json.dumps({'op': 'flushing', 'ids': sorted(self.in_doubt)}) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(temp_path, self._path)
+        self._file = open(self._path, 'a', encoding='utf-8')
+
+    def _write(self, record):
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def add(self, feedback_data):
+        """Durably record a submission and return its id."""
+        return self.add_many([feedback_data])[0]
+
+    def add_many(self, feedback_list):
+        """Durably record several submissions with one fsync and return their ids."""
+        received_at = datetime.now(timezone.utc).isoformat()
+        records = [
+            {
+                'op': 'submit',
+                'id': uuid.uuid4().hex,
+                'received_at': received_at,
+                'feedback': feedback_data
+            }
+            for feedback_data in feedback_list
+        ]
+        with self._lock:
+            self._file.write(''.join(json.dumps(record) + '\n' for record in records))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            for record in records:
+                self.pending[record['id']] = record
+        return [record['id'] for record in records]
+
+    def take(self, limit):
+        with self._lock:
+            return [record for _, record in zip(range(limit), self.pending.values())]
+
+    def pending_records(self):
+        with self._lock:
+            return list(self.pending.values())
+
+    def mark_flushing(self, ids):
+        with self._lock:
+            self._write({'op': 'flushing', 'ids': ids})
+            self.in_doubt.update(ids)
+
+    def mark_flushed(self, ids):
+        with self._lock:
+            self._write({'op': 'flushed', 'ids': ids})
+            for submission_id in ids:
+                self.pending.pop(submission_id, None)
+                self.in_doubt.discard(submission_id)
+            if not self.pending:
+                self._rewrite()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': len(self.pending),
+                'in_doubt': len(self.in_doubt)
+            }
+
+class FeedbackFlusher:
+    """Background thread that writes journaled submissions to the responses sheet.
+
+    Pending submissions are appended in batches of up to `batch_size` rows
+    per append call. Failures are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, journal, interval, batch_size, max_backoff):
+        self._journal = journal
+        self._interval = interval
+        self._batch_size = batch_size
+        self._max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.failures = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.duplicates_skipped = 0
+        self.last_error = None
+
+    def ensure_started(self):
+        """Replay the journal and start the flusher thread once per process."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._journal.open()
+            self._thread = threading.Thread(target=self._run, name='feedback-flusher', daemon=True)
+            self._thread.start()
+
+    def submit(self, feedback_data):
+        return self.submit_many([feedback_data])[0]
+
+    def submit_many(self, feedback_list):
+        submission_ids = self._journal.add_many(feedback_list)
+        self._wakeup.set()
+        return submission_ids
+
+    def pending(self):
+        """Journaled submissions not yet written to the sheet."""
+        return self._journal.pending_records()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self._interval)
+            self._wakeup.clear()
+            try:
+                with background_sheets_calls():
+                    while self.flush_once():
+                        pass
+                self.failures = 0
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                delay = min(self._max_backoff, self._interval * 2 ** self.failures)
+                delay *= random.uniform(0.5, 1.0)
+                print(f"Error flushing feedback journal (attempt {self.failures}), retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+
+    def _skip_already_written(self, records):
+        """Drop in-doubt submissions that are already in the sheet."""
+        in_doubt = [record for record in records if record['id'] in self._journal.in_doubt]
+        if not in_doubt:
+            return records
+        
+        # Straight from Sheets: an append that was never confirmed is in
+        # neither the mirror nor the cache
+        existing = storage.read_range(GOOGLE_SHEET_ID_RESPONSES, RESPONSES_RANGE)
+        if not existing:
+            return records
+        headers = existing[0]
+        written = {submission_fingerprint(headers, row) for row in existing[1:]}
+        
+        already_written = [
+            record['id'] for record in in_doubt
+            if submission_fingerprint(headers, [record['feedback'].get(h, '') for h in headers]) in written
+        ]
+        if already_written:
+            print(f"Skipping {len(already_written)} journaled submissions already in the sheet")
+            self._journal.mark_flushed(already_written)
+            self.duplicates_skipped += len(already_written)
+        return [record for record in records if record['id'] not in already_written]
+
+    def flush_once(self):
+        """Write one batch of pending submissions. Returns True if more may remain."""
+        records = self._journal.take(self._batch_size)
+        if not records:
+            return False
+        
+        records = self._skip_already_written(records)
+        if records:
+            _, rows = prepare_response_rows([record['feedback'] for record in records])
+            count = rows_within_payload(rows, SHEETS_APPEND_MAX_BYTES)
+            records, rows = records[:count], rows[:count]
+            ids = [record['id'] for record in records]
+            self._journal.mark_flushing(ids)
+            append_result = append_response_rows(rows)
+            self._journal.mark_flushed(ids)
+            self.flushes += 1
+            self.rows_flushed += len(rows)
+            print(f"Flushed {len(rows)} submissions: {append_result.get('updates', {}).get('updatedRange')}")
+        return True
+
+    def stats(self):
+        stats = self._journal.stats()
+        stats.update({
+            'running': self._thread is not None,
+            'flushes': self.flushes,
+            'rows_flushed': self.rows_flushed,
+            'duplicates_skipped': self.duplicates_skipped,
+            'consecutive_failures': self.failures,
+            'last_error': self.last_error
+        })
+        return stats
+
+def submission_key(feedback_data):
+    """(Encrypted Submitter ID, lowercased Management Email ID) of a submission, or None."""
+    submitter_id = str(feedback_data.get('Encrypted Submitter ID') or '').strip()
+    target_email = str(feedback_data.get('Management Email ID') or '').strip().lower()
+    if not submitter_id or not target_email:
+        return None
+    return submitter_id, target_email
+
+class SubmissionIndex:
+    """Latest submission time per (Encrypted Submitter ID, Management Email ID).
+
+    Built once from the responses sheet plus the journaled submissions that
+    have not reached it yet, then updated on every accepted submission, so
+    the cooldown check is a dict lookup instead of a sheet read. If the sheet
+    cannot be read the check fails open and the load is retried next time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest = {}
+        self._loaded = False
+        # Bumped by invalidate so a load that started before it is discarded
+        self._epoch = 0
+        self._loads = SingleFlight()
+        self.builds = 0
+        self.blocked = 0
+
+    def _build(self):
+        """Latest submission per key from the journal and the sheet, or None if the sheet cannot be read."""
+        if FEEDBACK_WRITE_BEHIND:
+            # Replays the journal so queued submissions count too
+            feedback_flusher.ensure_started()
+        latest = {}
+        for record in feedback_flusher.pending():
+            key = submission_key(record['feedback'])
+            submitted_at = parse_timestamp(record['received_at'])
+            if key is not None and submitted_at is not None and (key not in latest or latest[key] < submitted_at):
+                latest[key] = submitted_at
+        try:
+            entry = sheet_cache.get_entry(GOOGLE_SHEET_ID_RESPONSES, RESPONSES_RANGE)
+        except Exception as e:
+            print(f"Error building submission index, cooldowns not enforced until it loads: {e}")
+            return None
+        for key, submitted_at in latest_submissions.get(entry).items():
+            if key not in latest or latest[key] < submitted_at:
+                latest[key] = submitted_at
+        return latest
+
+    def _load(self):
+        """Build the index if needed. The sheet is read without holding the
+        lock; concurrent callers share one build and the result is merged in
+        under the lock, keeping any submission claimed in the meantime."""
+        with self._lock:
+            if self._loaded:
+                return
+            epoch = self._epoch
+        latest = self._loads.do(epoch, self._build)
+        if latest is None:
+            return
+        with self._lock:
+            if self._loaded or epoch != self._epoch:
+                return
+            for key, submitted_at in latest.items():
+                self._remember(key, submitted_at)
+            self._loaded = True
+            self.builds += 1
+            pairs = len(self._latest)
+        print(f"Submission index built with {pairs} submitter/target pairs")
+
+    def _remember(self, key, submitted_at):
+        if submitted_at is not None and (key not in self._latest or self._latest[key] < submitted_at):
+            self._latest[key] = submitted_at
+
+    def get(self, key):
+        """Latest submission time for a key, so the index can stand in for the dict cooldown_status takes."""
+        self._load()
+        with self._lock:
+            return self._latest.get(key)
+
+    def claim(self, feedback_data):
+        """Check the cooldown for a submission and record it if allowed.
+
+        Returns (status, cooldown_ends, undo); call undo() if the submission
+        is then not stored after all.
+        """
+        key = submission_key(feedback_data)
+        if key is None:
+            return 'ALLOWED', None, lambda: None
+        now = datetime.now(timezone.utc)
+        self._load()
+        with self._lock:
+            status, cooldown_ends = cooldown_status(self._latest, key[0], key[1], now)
+            if status == 'BLOCKED':
+                self.blocked += 1
+                return status, cooldown_ends, lambda: None
+            previous = self._latest.get(key)
+            self._latest[key] = now
+        
+        def undo():
+            with self._lock:
+                if self._latest.get(key) == now:
+                    if previous is None:
+                        del self._latest[key]
+                    else:
+                        self._latest[key] = previous
+        return status, cooldown_ends, undo
+
+    def invalidate(self):
+        with self._lock:
+            self._latest = {}
+            self._loaded = False
+            self._epoch += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'loaded': self._loaded,
+                'pairs': len(self._latest),
+                'builds': self.builds,
+                'blocked': self.blocked
+            }
+
+def cooldown_error(feedback_data, cooldown_ends):
+    target = feedback_data.get('Management Email ID')
+    return (f"Feedback for {target} was already submitted in the last {FEEDBACK_COOLDOWN_DAYS} days; "
+            f"it can be submitted again after {cooldown_ends}")
+
+class IdempotencyStore:
+    """Bounded, file-backed map of Idempotency-Key -> original response.
+
+    Keys expire after `ttl` seconds and the oldest are evicted beyond
+    `max_keys`. Every new key is appended to the file and fsync'd before the
+    response is sent; the file is compacted when it grows past twice the bound.
+    """
+
+    def __init__(self, path, max_keys, ttl):
+        self._path = path
+        self._max_keys = max_keys
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._file = None
+        self._lines = 0
+        self.replays = 0
+
+    def _open(self):
+        # Lock must be held
+        if self._file is not None:
+            return
+        if os.path.exists(self._path):
+            with open(self._path, encoding='utf-8') as store:
+                for line in store:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._entries[record['key']] = record
+                    self._entries.move_to_end(record['key'])
+        self._evict()
+        self._compact()
+
+    def _evict(self):
+        cutoff = time.time() - self._ttl
+        while self._entries:
+            key, record = next(iter(self._entries.items()))
+            if record['stored_at'] >= cutoff and len(self._entries) <= self._max_keys:
+                break
+            del self._entries[key]
+
+    def _compact(self):
+        if self._file is not None:
+            self._file.close()
+        temp_path = f"{self._path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as store:
+            for record in self._entries.values():
+                store.write(json.dumps(record) + '\n')
+            store.flush()
+            os.fsync(store.fileno())
+        os.replace(temp_path, self._path)
+        self._file = open(self._path, 'a', encoding='utf-8')
+        self._lines = len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            self._open()
+            record = self._entries.get(key)
+            if record is None or record['stored_at'] < time.time() - self._ttl:
+                return None
+            self.replays += 1
+            return record
+
+    def put(self, key, body, status):
+        record = {'key': key, 'stored_at': time.time(), 'body': body, 'status': status}
+        with self._lock:
+            self._open()
+            self._entries[key] = record
+            self._entries.move_to_end(key)
+            self._file.write(json.dumps(record) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._lines += 1
+            self._evict()
+            if self._lines > 2 * self._max_keys:
+                self._compact()
+        return record
+
+    def stats(self):
+        with self._lock:
+            return {
+                'keys': len(self._entries),
+                'replays': self.replays
+            }
+
+def idempotent(view):
+    """Replay the first successful response for a repeated Idempotency-Key header.
+
+    Concurrent requests with the same key wait for the first one. Only 2xx
+    responses are remembered, so a failed attempt can be retried.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        client_key = request.headers.get('Idempotency-Key')
+        if not client_key:
+            return view(*args, **kwargs)
+        key = f"{request.path}:{client_key}"
+        
+        def run():
+            record = idempotency_store.get(key)
+            if record is not None:
+                return record['body'], record['status'], True
+            response = current_app.make_response(view(*args, **kwargs))
+            body = response.get_json(silent=True)
+            if 200 <= response.status_code < 300 and body is not None:
+                # The write already succeeded; failing to remember it only
+                # costs a duplicate if the client retries this key
+                try:
+                    idempotency_store.put(key, body, response.status_code)
+                except Exception as e:
+                    print(f"Error storing response for Idempotency-Key {client_key}: {e}")
+            return body, response.status_code, False
+        
+        body, status, replayed = idempotent_requests.do(key, run)
+        if replayed:
+            print(f"Replaying stored response for Idempotency-Key {client_key}")
+        response = jsonify(body)
+        response.status_code = status
+        if replayed:
+            response.headers['Idempotent-Replayed'] = 'true'
+        return response
+    return wrapper
+
+background_workers_lock = threading.Lock()
+background_workers_started = False
+
+def start_background_workers():
+    """Warm the cache (and keep it warm if configured), replay the feedback journal and start the mirror sync.
+
+    Runs once per built app, however the app is served.
+    """
+    global background_workers_started
+    with background_workers_lock:
+        if background_workers_started:
+            return
+        background_workers_started = True
+    if CACHE_WARM_INTERVAL > 0:
+        threading.Thread(target=_cache_warm_loop, name='cache-warmer', daemon=True).start()
+    else:
+        threading.Thread(target=warm_sheet_cache, name='cache-warmer', daemon=True).start()
+    if FEEDBACK_WRITE_BEHIND:
+        feedback_flusher.ensure_started()
+    if sheet_mirror is not None:
+        sheet_mirror.ensure_started()
+
+# Workers start with the first request in whichever process serves the app
+# (flask run, gunicorn, the reloader's child), not only under __main__
+def ensure_background_workers():
+    if not background_workers_started:
+        start_background_workers()
+
+# Health check endpoint
+@api.route('/api/health', methods=['GET'])
+def health_check():
+    return jsonify({
+        'status': 'ok',
+        'message': 'Backend is running',
+        'timestamp': datetime.now().isoformat(),
+        'storage': storage.stats(),
+        'sheet_grid': sheet_grid.stats(),
+        'sheet_mirror': sheet_mirror.stats() if sheet_mirror is not None else 'disabled',
+        'sheets_client': sheets_client.stats() if sheets_client is not None else 'disabled',
+        'sheets_scheduler': sheets_scheduler.stats() if sheets_scheduler is not None else 'disabled',
+        'sheet_cache': sheet_cache.stats(),
+        'sheet_reads': sheet_reads.stats(),
+        'mapping_index_builds': mapping_index.builds,
+        'responses_loader': responses_loader.stats(),
+        'feedback_writer': feedback_flusher.stats() if FEEDBACK_WRITE_BEHIND else 'disabled',
+        'response_schema': response_schema.stats(),
+        'response_rows_decoded': response_records.rows_decoded,
+        'response_rows_encoded': response_records.rows_encoded,
+        'answer_store': answer_store.stats() if answer_store is not None else 'disabled',
+        'encoded_bodies': encoded_bodies.stats(),
+        'idempotency': idempotency_store.stats(),
+        'submission_index': submission_index.stats()
+    })
+
+# Get survey questions
+@api.route('/api/questions', methods=['GET'])
+def get_questions():
+    try:
+        print(f"Fetching questions from sheet: {GOOGLE_SHEET_ID_QUESTIONS}")
+        
+        # Get all data from questions sheet
+        entry = sheet_cache.get_entry(GOOGLE_SHEET_ID_QUESTIONS, QUESTIONS_RANGE)
+        
+        def build_payload():
+            data = entry.values
+            
+            if not data:
+                return {
+                    'success': True,
+                    'data': [],
+                    'count': 0,
+                    'message': 'No questions found',
+                    **staleness_fields(entry)
+                }
+            
+            # First row contains headers
+            headers = data[0]
+            questions = row_dicts(row_decoder(headers).decode_all(data[1:]))
+            
+            print(f"Found {len(questions)} questions")
+            
+            return {
+                'success': True,
+                'data': questions,
+                'count': len(questions),
+                'headers': headers,
+                **staleness_fields(entry)
+            }
+        
+        return cached_read([entry], build_payload)
+        
+    except SheetsUnavailableError as e:
+        print(f"Error in /api/questions: {e}")
+        return unavailable_response(e)
+        
+    except Exception as e:
+        print(f"Error in /api/questions: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'data': []
+        }), 500
+
+# Get management mapping
+@api.route('/api/mapping', methods=['GET'])
+def get_mapping():
     try:
-        credentials = service_account.Credentials.from_service_account_file(
-            SERVICE_ACCOUNT_FILE,
-            scopes=['https://www.googleapis.com/auth/spreadsheets']
-        )
-        service = build('sheets', 'v4', credentials=credentials)
-        return service
+        user_email = request.args.get('email')
+        print(f"Fetching mapping for user: {user_email or 'all users'}")
+        
+        # Mapping sheet rows, indexed by Email and Ldap
+        try:
+            response_format = requested_format()
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e),
+                'data': []
+            }), 400
+        
+        index, entry = get_mapping_index()
+        
+        def build_payload():
+            if not index.headers:
+                return {
+                    'success': True,
+                    'data': [],
+                    'count': 0,
+                    'message': 'No mapping data found',
+                    **staleness_fields(entry)
+                }
+            
+            headers = index.headers
+            
+            # Filter by user email if provided (matches Email or Ldap field)
+            if user_email:
+                mapping_data = index.lookup(user_email)
+            else:
+                mapping_data = index.rows
+            
+            print(f"Found {len(mapping_data)} mapping entries")
+            
+            return {
+                'success': True,
+                **shape_records(response_format, headers, mapping_data),
+                'count': len(mapping_data),
+                'headers': headers,
+                'filtered_by': user_email or 'all',
+                **staleness_fields(entry)
+            }
+        
+        return cached_read([entry], build_payload)
+        
+    except SheetsUnavailableError as e:
+        print(f"Error in /api/mapping: {e}")
+        return unavailable_response(e)
+        
     except Exception as e:
-        print(f"Error authenticating with Google Sheets: {e}")
-        raise
+        print(f"Error in /api/mapping: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'data': []
+        }), 500
 
-def get_sheet_data(spreadsheet_id, range_name):
-    """Get data from Google Sheets."""
+# Everything the feedback form needs on load, in one request
+@api.route('/api/bootstrap', methods=['GET'])
+def get_bootstrap():
     try:
-        service = get_google_sheets_service()
-        sheet = service.spreadsheets()
-        result = sheet.values().get(
-            spreadsheetId=spreadsheet_id,
-            range=range_name
-        ).execute()
-        return result.get('values', [])
+        user_email = request.args.get('email')
+        
+        if not user_email:
+            return jsonify({
+                'success': False,
+                'error': 'email parameter is required'
+            }), 400
+        
+        print(f"Bootstrapping feedback form for user: {user_email}")
+        
+        entries = sheet_cache.get_many(BOOTSTRAP_RANGES)
+        
+        questions = parse_survey_questions(entries[(GOOGLE_SHEET_ID_QUESTIONS, QUESTIONS_RANGE)].values)
+        index = mapping_index.get(entries[(GOOGLE_SHEET_ID_MAPPING, MAPPING_RANGE)])
+        
+        user_rows = index.lookup(user_email)
+        if user_rows:
+            # The form uses the last matching mapping row, and submits with its
+            # Email even when the user was matched by Ldap
+            user_data = build_user_data(user_rows[-1], user_email)
+            targets = resolve_feedback_targets(user_rows[-1:], submission_index,
+                                               encrypt_submitter_id(user_data['email']))
+        else:
+            print(f"User {user_email} not found in mapping, offering all targets")
+            user_data = {
+                'email': user_email,
+                'name': get_display_name(user_email),
+                'process': 'General'
+            }
+            targets = resolve_feedback_targets(index.rows, submission_index,
+                                               encrypt_submitter_id(user_email), unique=True)
+        
+        print(f"Bootstrap: {len(questions)} questions, "
+              f"{sum(len(group) for group in targets.values())} targets")
+        
+        return jsonify({
+            'success': True,
+            'questions': questions,
+            'targets': targets,
+            'user': user_data,
+            'user_found': bool(user_rows),
+            'cooldown_days': FEEDBACK_COOLDOWN_DAYS,
+            **staleness_fields(*entries.values())
+        })
+        
+    except SheetsUnavailableError as e:
+        print(f"Error in /api/bootstrap: {e}")
+        return unavailable_response(e)
+        
     except Exception as e:
-        print(f"Error getting sheet data: {e}")
-        return []
+        print(f"Error in /api/bootstrap: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
-def append_to_sheet(spreadsheet_id, range_name, values):
-    """Append data to Google Sheets."""
+# Which targets a user can submit feedback for right now
+@api.route('/api/eligibility', methods=['GET'])
+def get_eligibility():
     try:
-        service = get_google_sheets_service()
-        sheet = service.spreadsheets()
+        user_email = request.args.get('email')
         
-        body = {
-            'values': values
-        }
+        if not user_email:
+            return jsonify({
+                'success': False,
+                'error': 'email parameter is required'
+            }), 400
         
-        result = sheet.values().append(
-            spreadsheetId=spreadsheet_id,
-            range=range_name,
-            valueInputOption='USER_ENTERED',
-            insertDataOption='INSERT_ROWS',
-            body=body
-        ).execute()
+        # Defaults to the targets the user's mapping row lists
+        target_emails = [email.strip() for email in request.args.get('targets', '').split(',') if email.strip()]
+        if not target_emails:
+            index, _ = get_mapping_index()
+            user_rows = index.lookup(user_email)
+            target_emails = [
+                row.get(column) for row in user_rows[-1:]
+                for _, column in TARGET_GROUPS if '@' in (row.get(column) or '')
+            ]
+        
+        submitter_id = encrypt_submitter_id(user_email)
+        now = datetime.now(timezone.utc)
+        eligibility = {}
+        for target_email in target_emails:
+            status, cooldown_ends = cooldown_status(submission_index, submitter_id, target_email, now)
+            eligibility[target_email] = {
+                'status': status,
+                'cooldown_ends': cooldown_ends
+            }
+        
+        return jsonify({
+            'success': True,
+            'eligibility': eligibility,
+            'cooldown_days': FEEDBACK_COOLDOWN_DAYS
+        })
+        
+    except SheetsUnavailableError as e:
+        print(f"Error in /api/eligibility: {e}")
+        return unavailable_response(e)
         
-        return result
     except Exception as e:
-        print(f"Error appending to sheet: {e}")
-        raise
-
-# Health check endpoint
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    return jsonify({
-        'status': 'ok',
-        'message': 'Backend is running',
-        'timestamp': datetime.now().isoformat()
-    })
+        print(f"Error in /api/eligibility: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
 
-# Get survey questions
-@app.route('/api/questions', methods=['GET'])
-def get_questions():
+# Employees that list a leader as POC, Manager or Account manager
+@api.route('/api/hierarchy/reports', methods=['GET'])
+def get_direct_reports():
     try:
-        print(f"Fetching questions from sheet: {GOOGLE_SHEET_ID_QUESTIONS}")
+        leader = request.args.get('leader')
+        role = request.args.get('role')
         
-        # Get all data from questions sheet
-        range_name = f"{QUESTIONS_SHEET_NAME}!A:Z"
-        data = get_sheet_data(GOOGLE_SHEET_ID_QUESTIONS, range_name)
+        if not leader:
+            return jsonify({
+                'success': False,
+                'error': 'leader parameter is required',
+                'data': []
+            }), 400
         
-        if not data:
+        if role and role not in LEADER_ROLES:
             return jsonify({
-                'success': True,
-                'data': [],
-                'count': 0,
-                'message': 'No questions found'
-            })
+                'success': False,
+                'error': f"Unknown role '{role}'. Expected one of: {', '.join(LEADER_ROLES)}",
+                'data': []
+            }), 400
         
-        # First row contains headers
-        headers = data[0]
-        rows = data[1:] if len(data) > 1 else []
+        index, entry = get_mapping_index()
+        reports = index.hierarchy.direct_reports(leader, role)
+        print(f"Found {len(reports)} direct reports for {leader}")
         
-        # Convert to list of dictionaries
-        questions = []
-        for row in rows:
-            question = {}
-            for i, header in enumerate(headers):
-                if i < len(row):
-                    question[header] = row[i]
-                else:
-                    question[header] = ''
-            questions.append(question)
+        return jsonify({
+            'success': True,
+            'data': row_dicts(reports),
+            'count': len(reports),
+            'leader': leader,
+            'role': role or 'any',
+            **staleness_fields(entry)
+        })
+        
+    except SheetsUnavailableError as e:
+        print(f"Error in /api/hierarchy/reports: {e}")
+        return unavailable_response(e)
+        
+    except Exception as e:
+        print(f"Error in /api/hierarchy/reports: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'data': []
+        }), 500
+
+# Everyone under an account manager
+@api.route('/api/hierarchy/account-manager', methods=['GET'])
+def get_account_manager_employees():
+    try:
+        account_manager = request.args.get('email')
+        
+        if not account_manager:
+            return jsonify({
+                'success': False,
+                'error': 'email parameter is required',
+                'data': []
+            }), 400
         
-        print(f"Found {len(questions)} questions")
+        index, entry = get_mapping_index()
+        employees = index.hierarchy.account_manager_rows(account_manager)
+        print(f"Found {len(employees)} employees under {account_manager}")
         
         return jsonify({
             'success': True,
-            'data': questions,
-            'count': len(questions),
-            'headers': headers
+            'data': row_dicts(employees),
+            'count': len(employees),
+            'account_manager': account_manager,
+            **staleness_fields(entry)
         })
         
+    except SheetsUnavailableError as e:
+        print(f"Error in /api/hierarchy/account-manager: {e}")
+        return unavailable_response(e)
+        
     except Exception as e:
-        print(f"Error in /api/questions: {e}")
+        print(f"Error in /api/hierarchy/account-manager: {e}")
         return jsonify({
             'success': False,
             'error': str(e),
             'data': []
         }), 500
 
-# Get management mapping
-@app.route('/api/mapping', methods=['GET'])
-def get_mapping():
+# Employees per Process or Client
+@api.route('/api/hierarchy/groups', methods=['GET'])
+def get_employee_groups():
     try:
-        user_email = request.args.get('email')
-        print(f"Fetching mapping for user: {user_email or 'all users'}")
+        column = request.args.get('by', 'Process')
+        value = request.args.get('value')
         
-        # Get all data from mapping sheet
-        range_name = f"{MAPPING_SHEET_NAME}!A:Z"
-        data = get_sheet_data(GOOGLE_SHEET_ID_MAPPING, range_name)
+        if column not in GROUP_COLUMNS:
+            return jsonify({
+                'success': False,
+                'error': f"Cannot group by '{column}'. Expected one of: {', '.join(GROUP_COLUMNS)}",
+                'data': []
+            }), 400
         
-        if not data:
+        index, entry = get_mapping_index()
+        hierarchy = index.hierarchy
+        
+        if value is not None:
+            employees = hierarchy.group(column, value)
             return jsonify({
                 'success': True,
-                'data': [],
-                'count': 0,
-                'message': 'No mapping data found'
+                'data': row_dicts(employees),
+                'count': len(employees),
+                'by': column,
+                'value': value,
+                **staleness_fields(entry)
             })
         
-        # First row contains headers
-        headers = data[0]
-        rows = data[1:] if len(data) > 1 else []
+        counts = hierarchy.group(column)
+        return jsonify({
+            'success': True,
+            'data': counts,
+            'count': len(counts),
+            'by': column,
+            **staleness_fields(entry)
+        })
+        
+    except SheetsUnavailableError as e:
+        print(f"Error in /api/hierarchy/groups: {e}")
+        return unavailable_response(e)
         
-        # Convert to list of dictionaries
-        mapping_data = []
-        for row in rows:
-            item = {}
-            for i, header in enumerate(headers):
-                if i < len(row):
-                    item[header] = row[i]
-                else:
-                    item[header] = ''
-            mapping_data.append(item)
-        
-        # Filter by user email if provided
-        if user_email:
-            user_email_lower = user_email.lower()
-            filtered_data = []
-            for item in mapping_data:
-                item_email = (item.get('Email') or '').lower()
-                item_ldap = (item.get('Ldap') or '').lower()
-                
-                # Check if user email matches Email or Ldap field
-                if item_email == user_email_lower or item_ldap == user_email_lower:
-                    filtered_data.append(item)
-            
-            mapping_data = filtered_data
+    except Exception as e:
+        print(f"Error in /api/hierarchy/groups: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'data': []
+        }), 500
+
+# Everyone reachable below a leader
+@api.route('/api/hierarchy/subtree', methods=['GET'])
+def get_leader_subtree():
+    try:
+        leader = request.args.get('leader')
+        
+        if not leader:
+            return jsonify({
+                'success': False,
+                'error': 'leader parameter is required',
+                'data': []
+            }), 400
         
-        print(f"Found {len(mapping_data)} mapping entries")
+        index, entry = get_mapping_index()
+        employees = index.hierarchy.subtree(leader)
+        print(f"Found {len(employees)} employees in the subtree of {leader}")
         
         return jsonify({
             'success': True,
-            'data': mapping_data,
-            'count': len(mapping_data),
-            'headers': headers,
-            'filtered_by': user_email or 'all'
+            'data': row_dicts(employees),
+            'count': len(employees),
+            'leader': leader,
+            **staleness_fields(entry)
         })
         
+    except SheetsUnavailableError as e:
+        print(f"Error in /api/hierarchy/subtree: {e}")
+        return unavailable_response(e)
+        
     except Exception as e:
-        print(f"Error in /api/mapping: {e}")
+        print(f"Error in /api/hierarchy/subtree: {e}")
         return jsonify({
             'success': False,
             'error': str(e),
@@ -2399,50 +4683,54 @@ def get_mapping():
         }), 500
 
 # Submit feedback
-@app.route('/api/submit-feedback', methods=['POST'])
+@api.route('/api/submit-feedback', methods=['POST'])
+@idempotent
 def submit_feedback():
     try:
-        feedback_data = request.json
-        print(f"Received feedback submission with {len(feedback_data)} fields")
+        feedback_data = request.get_json(silent=True)
         
-        if not feedback_data:
+        error = validate_feedback(feedback_data)
+        if error:
             return jsonify({
                 'success': False,
-                'error': 'No feedback data provided'
+                'error': error
             }), 400
         
-        # Get existing data to determine column order
-        range_name = f"{RESPONSES_SHEET_NAME}!A1:Z1"  # Get headers only
-        existing_headers = get_sheet_data(GOOGLE_SHEET_ID_RESPONSES, range_name)
-        
-        # Prepare row data
-        if existing_headers and len(existing_headers) > 0:
-            # Sheet has headers, match column order
-            headers = existing_headers[0]
-            row_data = []
-            for header in headers:
-                row_data.append(feedback_data.get(header, ''))
-        else:
-            # No headers yet, create them from feedback data keys
-            headers = list(feedback_data.keys())
-            row_data = list(feedback_data.values())
+        print(f"Received feedback submission with {len(feedback_data)} fields")
+        
+        status, cooldown_ends, undo = submission_index.claim(feedback_data)
+        if status == 'BLOCKED':
+            print(f"Rejected feedback for {feedback_data.get('Management Email ID')}: in cooldown until {cooldown_ends}")
+            return jsonify({
+                'success': False,
+                'error': cooldown_error(feedback_data, cooldown_ends),
+                'cooldown_ends': cooldown_ends
+            }), 409
+        
+        if FEEDBACK_WRITE_BEHIND:
+            # Journal it durably; the flusher writes it to the sheet
+            feedback_flusher.ensure_started()
+            try:
+                submission_id = feedback_flusher.submit(feedback_data)
+            except Exception:
+                undo()
+                raise
+            print(f"Feedback {submission_id} journaled for writing")
             
-            # First, write headers
-            header_result = append_to_sheet(
-                GOOGLE_SHEET_ID_RESPONSES,
-                f"{RESPONSES_SHEET_NAME}!A1",
-                [headers]
-            )
-            print(f"Headers written: {header_result}")
-        
-        # Append the data row
-        append_range = f"{RESPONSES_SHEET_NAME}!A:Z"
-        append_result = append_to_sheet(
-            GOOGLE_SHEET_ID_RESPONSES,
-            append_range,
-            [row_data]
-        )
+            return jsonify({
+                'success': True,
+                'message': 'Feedback submitted successfully',
+                'submission_id': submission_id,
+                'queued': True,
+                'timestamp': datetime.now().isoformat()
+            })
         
+        try:
+            _, rows = prepare_response_rows([feedback_data])
+            append_result = append_response_rows(rows)
+        except Exception:
+            undo()
+            raise
         print(f"Feedback appended successfully: {append_result}")
         
         return jsonify({
@@ -2458,55 +4746,374 @@ def submit_feedback():
             'error': str(e)
         }), 500
 
-# Get feedback responses (for admin)
-@app.route('/api/responses', methods=['GET'])
+# Submit many feedback records at once
+@api.route('/api/submit-feedback/batch', methods=['POST'])
+@idempotent
+def submit_feedback_batch():
+    try:
+        payload = request.get_json(silent=True)
+        feedback_list = payload.get('feedback') if isinstance(payload, dict) else payload
+        
+        if not isinstance(feedback_list, list) or not feedback_list:
+            return jsonify({
+                'success': False,
+                'error': 'Expected a non-empty JSON array of feedback objects'
+            }), 400
+        
+        if len(feedback_list) > FEEDBACK_BATCH_MAX_RECORDS:
+            return jsonify({
+                'success': False,
+                'error': f"At most {FEEDBACK_BATCH_MAX_RECORDS} records per batch"
+            }), 413
+        
+        print(f"Received batch of {len(feedback_list)} feedback records")
+        
+        # Validate everything up front; invalid records are reported, not written
+        results = []
+        accepted = []
+        undos = []
+        for index, feedback_data in enumerate(feedback_list):
+            error = validate_feedback(feedback_data)
+            if error:
+                results.append({'index': index, 'success': False, 'error': error})
+                continue
+            status, cooldown_ends, undo = submission_index.claim(feedback_data)
+            if status == 'BLOCKED':
+                results.append({
+                    'index': index,
+                    'success': False,
+                    'error': cooldown_error(feedback_data, cooldown_ends),
+                    'cooldown_ends': cooldown_ends
+                })
+                continue
+            result = {'index': index, 'success': True}
+            unknown = response_schema.unknown_fields(feedback_data)
+            if unknown:
+                result['ignored_fields'] = unknown
+            results.append(result)
+            accepted.append(result)
+            undos.append(undo)
+        
+        valid_feedback = [feedback_list[result['index']] for result in accepted]
+        
+        if valid_feedback and FEEDBACK_WRITE_BEHIND:
+            feedback_flusher.ensure_started()
+            try:
+                submission_ids = feedback_flusher.submit_many(valid_feedback)
+            except Exception:
+                for undo in undos:
+                    undo()
+                raise
+            for result, submission_id in zip(accepted, submission_ids):
+                result['submission_id'] = submission_id
+                result['status'] = 'queued'
+        elif valid_feedback:
+            written = 0
+            try:
+                _, rows = prepare_response_rows(valid_feedback)
+                while written < len(rows):
+                    count = rows_within_payload(rows[written:], SHEETS_APPEND_MAX_BYTES)
+                    append_response_rows(rows[written:written + count])
+                    for result in accepted[written:written + count]:
+                        result['status'] = 'written'
+                    written += count
+            except Exception as e:
+                print(f"Error appending feedback batch after {written} rows: {e}")
+                for result, undo in zip(accepted[written:], undos[written:]):
+                    result['success'] = False
+                    result['error'] = str(e)
+                    undo()
+        
+        succeeded = sum(1 for result in results if result['success'])
+        print(f"Batch accepted {succeeded} of {len(results)} records")
+        
+        return jsonify({
+            'success': succeeded == len(results),
+            'results': results,
+            'accepted': succeeded,
+            'rejected': len(results) - succeeded,
+            'timestamp': datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        print(f"Error in /api/submit-feedback/batch: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+# Get feedback responses (for admin). With ?stream=1 or Accept: application/x-ndjson
+# the body is a metadata line followed by one JSON line per response.
+@api.route('/api/responses', methods=['GET'])
 def get_responses():
     try:
-        print("Fetching feedback responses")
+        since = request.args.get('since')
+        after = request.args.get('after')
+        print(f"Fetching feedback responses{f' since {since}' if since else ''}")
+        
+        try:
+            limit = request.args.get('limit', type=int)
+            offset = request.args.get('offset', 0, type=int)
+            if (limit is not None and not 0 < limit <= RESPONSES_MAX_PAGE_SIZE) or offset < 0:
+                raise ValueError(f"limit must be 1-{RESPONSES_MAX_PAGE_SIZE} and offset must not be negative")
+            matches = response_filter(request.args, datetime.now().astimezone())
+            response_format = requested_format()
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e),
+                'data': []
+            }), 400
         
-        range_name = f"{RESPONSES_SHEET_NAME}!A:Z"
-        data = get_sheet_data(GOOGLE_SHEET_ID_RESPONSES, range_name)
+        # Refresh through the cache, then read the loader's copy together
+        # with its generation so the returned cursor matches the rows
+        entry = sheet_cache.get_entry(GOOGLE_SHEET_ID_RESPONSES, RESPONSES_RANGE)
+        data, generation = responses_loader.snapshot()
+        if answer_store is not None:
+            answer_store.sync(data, generation)
+            data = answer_store.wide_values()
         
         if not data:
             return jsonify({
                 'success': True,
                 'data': [],
                 'count': 0,
-                'message': 'No responses found'
+                'total': 0,
+                'cursor': make_responses_cursor(generation, 0),
+                'reset': True,
+                'next_after': None,
+                'message': 'No responses found',
+                **staleness_fields(entry)
             })
         
-        headers = data[0]
-        rows = data[1:] if len(data) > 1 else []
+        headers, records, row_count = response_records.sync(data, generation)
+        cursor = make_responses_cursor(generation, row_count)
+        
+        # With a valid cursor only the rows appended after it are returned
+        start = responses_cursor_offset(since, generation, row_count) if since else None
+        if since and start is None:
+            print("Responses cursor is stale, sending a full reload")
+        reset = start is None
+        start = start or 0
+        
+        # Keyset pagination continues after the last row of the previous page
+        if after:
+            after_row = responses_cursor_offset(after, generation, row_count)
+            if after_row is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'The page token is no longer valid; start again from the first page',
+                    'data': []
+                }), 409
+            start = max(start, after_row)
+        
+        fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+        unknown = [field for field in fields if field not in headers]
+        if unknown:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown fields: {', '.join(unknown)}",
+                'data': []
+            }), 400
+        
+        if wants_ndjson():
+            # Rows are filtered, sliced and encoded lazily while streaming
+            selected = islice(records, start, row_count)
+            if matches is not None:
+                selected = filter(matches, selected)
+            page = islice(selected, offset, offset + limit if limit is not None else None)
+            print(f"Streaming responses from row {start + 1}")
+            return ndjson_response(
+                {
+                    'success': True,
+                    'headers': fields or headers,
+                    'cursor': cursor,
+                    'reset': reset,
+                    **staleness_fields(entry)
+                },
+                (
+                    {field: record[1].get(field) for field in fields} if fields else record[1].to_dict()
+                    for record in page
+                )
+            )
         
-        responses = []
-        for row in rows:
-            response = {}
-            for i, header in enumerate(headers):
-                if i < len(row):
-                    response[header] = row[i]
-                else:
-                    response[header] = ''
-            responses.append(response)
+        def build_payload():
+            selected = records[start:row_count]
+            if matches is not None:
+                selected = [record for record in selected if matches(record)]
+            total = len(selected)
+            
+            page = selected[offset:offset + limit] if limit is not None else selected[offset:]
+            more = offset + len(page) < total
+            next_after = make_responses_cursor(generation, page[-1][0]) if page and more else None
+            
+            print(f"Found {len(page)} responses ({total} matching)")
+            
+            if response_format == 'records' and not fields and negotiated_mimetype() == 'application/json':
+                shaped = {'data': response_records.encoded(records, page), 'format': 'records'}
+            else:
+                shaped = shape_records(response_format, fields or headers, [record[1] for record in page])
+            
+            return {
+                'success': True,
+                **shaped,
+                'count': len(page),
+                'total': total,
+                'sheet_total': row_count,
+                'headers': fields or headers,
+                'cursor': cursor,
+                'reset': reset,
+                'next_after': next_after,
+                **staleness_fields(entry)
+            }
+        
+        # Relative time periods move with the calendar, not only with the sheet
+        variant = datetime.now().astimezone().date().isoformat() if request.args.get('time_period') else ''
+        return cached_read([entry], build_payload, variant)
+        
+    except SheetsUnavailableError as e:
+        print(f"Error in /api/responses: {e}")
+        return unavailable_response(e)
+        
+    except Exception as e:
+        print(f"Error in /api/responses: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'data': []
+        }), 500
+
+def answer_store_disabled():
+    return jsonify({
+        'success': False,
+        'error': 'The answer store is disabled; set ANSWER_STORE=true to enable it',
+        'data': []
+    }), 404
+
+def load_answer_store():
+    """Bring the answer store up to date with the responses sheet and return the cache entry."""
+    entry = sheet_cache.get_entry(GOOGLE_SHEET_ID_RESPONSES, RESPONSES_RANGE)
+    data, generation = responses_loader.snapshot()
+    answer_store.sync(data, generation)
+    return entry
+
+# Get responses in long format: one answer per (submission, question_id)
+@api.route('/api/answers', methods=['GET'])
+def get_answers():
+    if answer_store is None:
+        return answer_store_disabled()
+    try:
+        management_email = request.args.get('management_email')
+        entry = load_answer_store()
+        questions, submissions, answers = answer_store.long_format(management_email)
         
-        print(f"Found {len(responses)} responses")
+        print(f"Found {len(answers)} answers in {len(submissions)} submissions")
         
         return jsonify({
             'success': True,
-            'data': responses,
-            'count': len(responses),
-            'headers': headers
+            'questions': questions,
+            'rating_options': RATING_OPTIONS,
+            'submissions': submissions,
+            # [submission_id, question_id, code, text]: code is 1-5 for rating_options, text otherwise
+            'answers': answers,
+            'count': len(answers),
+            **staleness_fields(entry)
         })
         
+    except SheetsUnavailableError as e:
+        print(f"Error in /api/answers: {e}")
+        return unavailable_response(e)
+        
     except Exception as e:
-        print(f"Error in /api/responses: {e}")
+        print(f"Error in /api/answers: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'data': []
+        }), 500
+
+# Get Likert answer counts per leader, process, role or question
+@api.route('/api/answers/summary', methods=['GET'])
+def get_answer_summary():
+    if answer_store is None:
+        return answer_store_disabled()
+    try:
+        group_by = request.args.get('group_by', 'management_email')
+        if group_by not in ANSWER_GROUPS:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown group_by '{group_by}'. Expected one of: {', '.join(ANSWER_GROUPS)}",
+                'data': []
+            }), 400
+        
+        entry = load_answer_store()
+        groups = answer_store.summary(group_by, request.args.get('management_email'))
+        
+        return jsonify({
+            'success': True,
+            'group_by': group_by,
+            'rating_options': RATING_OPTIONS,
+            'data': groups,
+            'count': len(groups),
+            **staleness_fields(entry)
+        })
+        
+    except SheetsUnavailableError as e:
+        print(f"Error in /api/answers/summary: {e}")
+        return unavailable_response(e)
+        
+    except Exception as e:
+        print(f"Error in /api/answers/summary: {e}")
         return jsonify({
             'success': False,
             'error': str(e),
             'data': []
         }), 500
 
+# Drop cached sheet data so the next read goes to Google Sheets
+@api.route('/api/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    try:
+        payload = request.get_json(silent=True) or {}
+        sheet = payload.get('sheet') or request.args.get('sheet')
+        
+        if sheet:
+            if sheet not in NAMED_SHEETS:
+                return jsonify({
+                    'success': False,
+                    'error': f"Unknown sheet '{sheet}'. Expected one of: {', '.join(NAMED_SHEETS)}"
+                }), 400
+            if sheet_mirror is not None:
+                sheet_mirror.sync_all(sheet)
+            dropped = invalidate_sheet(sheet, reload=True)
+        else:
+            if sheet_mirror is not None:
+                sheet_mirror.sync_all()
+            responses_loader.reset()
+            dropped = sheet_cache.invalidate()
+        
+        # Also forget the responses header and submission index so they are re-read
+        if sheet in (None, 'responses'):
+            response_schema.invalidate()
+            submission_index.invalidate()
+        
+        print(f"Invalidated {dropped} cached ranges for {sheet or 'all sheets'}")
+        
+        return jsonify({
+            'success': True,
+            'invalidated': dropped,
+            'sheet': sheet or 'all'
+        })
+        
+    except Exception as e:
+        print(f"Error in /api/cache/invalidate: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 # Test endpoint
-@app.route('/api/test', methods=['GET'])
+@api.route('/api/test', methods=['GET'])
 def test_endpoint():
     return jsonify({
         'success': True,
@@ -2520,7 +5127,7 @@ def test_endpoint():
     })
 
 # Get current user (placeholder - you can implement proper auth later)
-@app.route('/api/current-user', methods=['GET'])
+@api.route('/api/current-user', methods=['GET'])
 def get_current_user():
     # This is a placeholder. In production, implement proper authentication
     return jsonify({
@@ -2528,6 +5135,122 @@ def get_current_user():
         'message': 'User authentication not implemented'
     })
 
+def create_storage(backend):
+    if backend == 'sheets':
+        return SheetsStorage(sheets_client, sheets_scheduler)
+    if backend == 'sqlite':
+        return SQLiteStorage(STORAGE_SQLITE_PATH)
+    if backend == 'memory':
+        return MemoryStorage()
+    raise ValueError(f"Unknown STORAGE_BACKEND '{backend}', expected one of: {', '.join(STORAGE_BACKENDS)}")
+
+def create_app(backend=None, background_workers=True):
+    """Build the components behind the endpoints and an app serving them.
+
+    `backend` is a SheetStorage to use instead of the one STORAGE_BACKEND
+    names; tests pass a MemoryStorage. Without `background_workers` nothing
+    runs in the background until started explicitly. Serve with
+    `flask --app app run` or `gunicorn 'app:create_app()'`.
+    """
+    global sheets_client, sheets_scheduler, storage, sheet_grid, sheet_mirror, sheet_reads, \
+        sheets_fanout, sheet_cache, responses_loader, encoded_bodies, mapping_index, \
+        latest_submissions, response_records, answer_store, response_schema, feedback_flusher, \
+        submission_index, idempotency_store, idempotent_requests, background_workers_started
+    
+    if backend is None and STORAGE_BACKEND == 'sheets':
+        sheets_client = SheetsClient(
+            SERVICE_ACCOUNT_FILE,
+            SHEETS_SCOPES,
+            pool_size=SHEETS_HTTP_POOL_SIZE,
+            timeout=SHEETS_HTTP_TIMEOUT
+        )
+        sheets_scheduler = SheetsScheduler(
+            sheets_client,
+            reads_per_minute=SHEETS_READS_PER_MINUTE,
+            writes_per_minute=SHEETS_WRITES_PER_MINUTE,
+            burst=SHEETS_QUOTA_BURST,
+            max_retries=SHEETS_MAX_RETRIES,
+            base_delay=SHEETS_RETRY_BASE_DELAY,
+            max_delay=SHEETS_RETRY_MAX_DELAY,
+            breaker_failures=SHEETS_BREAKER_FAILURES,
+            breaker_reset=SHEETS_BREAKER_RESET_SECONDS
+        )
+    else:
+        sheets_client = sheets_scheduler = None
+    storage = backend if backend is not None else create_storage(STORAGE_BACKEND)
+    print(f"Storage backend: {storage.name}")
+    sheet_grid = SheetGrid(storage, SHEET_GRID_TTL)
+    
+    sheet_reads = SingleFlight()
+    sheets_fanout = ThreadPoolExecutor(
+        max_workers=SHEETS_FANOUT_WORKERS,
+        thread_name_prefix='sheets-fanout'
+    )
+    sheet_cache = SheetCache(
+        fetch_sheet_values,
+        fetch_sheet_values_batch,
+        default_ttl=DEFAULT_CACHE_TTL,
+        max_stale=CACHE_MAX_STALE,
+        source_status=mirror_status
+    )
+    sheet_cache.configure(GOOGLE_SHEET_ID_QUESTIONS, QUESTIONS_SHEET_NAME, QUESTIONS_CACHE_TTL)
+    sheet_cache.configure(GOOGLE_SHEET_ID_MAPPING, MAPPING_SHEET_NAME, MAPPING_CACHE_TTL)
+    sheet_cache.configure(GOOGLE_SHEET_ID_RESPONSES, RESPONSES_SHEET_NAME, RESPONSES_CACHE_TTL)
+    responses_loader = AppendOnlySheetLoader(
+        GOOGLE_SHEET_ID_RESPONSES,
+        RESPONSES_SHEET_NAME,
+        sample_every=RESPONSES_SAMPLE_EVERY,
+        sample_rows=RESPONSES_SAMPLE_ROWS
+    )
+    sheet_cache.register_loader(GOOGLE_SHEET_ID_RESPONSES, RESPONSES_RANGE, responses_loader.load)
+    
+    if SHEET_MIRROR and storage.name == 'sheets':
+        sheet_mirror = SheetMirror(
+            SHEET_MIRROR_PATH,
+            storage,
+            sheet_grid,
+            {
+                'questions': (GOOGLE_SHEET_ID_QUESTIONS, QUESTIONS_SHEET_NAME, False),
+                'mapping': (GOOGLE_SHEET_ID_MAPPING, MAPPING_SHEET_NAME, False),
+                'responses': (GOOGLE_SHEET_ID_RESPONSES, RESPONSES_SHEET_NAME, True)
+            },
+            interval=SHEET_MIRROR_SYNC_INTERVAL,
+            full_sync_every=SHEET_MIRROR_FULL_SYNC_EVERY,
+            max_lag=SHEET_MIRROR_MAX_LAG,
+            on_change=mirror_changed
+        )
+    else:
+        sheet_mirror = None
+    
+    encoded_bodies = EncodedBodyCache(ENCODED_BODY_CACHE_BYTES)
+    mapping_index = DerivedView(MappingIndex)
+    latest_submissions = DerivedView(build_latest_submissions)
+    response_records = ResponseRecords()
+    answer_store = AnswerStore(ANSWER_STORE_PATH) if ANSWER_STORE else None
+    response_schema = ResponseSchema(GOOGLE_SHEET_ID_RESPONSES, RESPONSES_SHEET_NAME)
+    feedback_flusher = FeedbackFlusher(
+        FeedbackJournal(FEEDBACK_JOURNAL_PATH),
+        interval=FEEDBACK_FLUSH_INTERVAL,
+        batch_size=FEEDBACK_FLUSH_BATCH_SIZE,
+        max_backoff=FEEDBACK_FLUSH_MAX_BACKOFF
+    )
+    submission_index = SubmissionIndex()
+    idempotency_store = IdempotencyStore(
+        IDEMPOTENCY_STORE_PATH,
+        max_keys=IDEMPOTENCY_MAX_KEYS,
+        ttl=IDEMPOTENCY_TTL_HOURS * 3600
+    )
+    idempotent_requests = SingleFlight()
+    
+    app = Flask(__name__)
+    CORS(app)  # Enable CORS for all routes
+    app.register_blueprint(api)
+    with background_workers_lock:
+        background_workers_started = False
+    if background_workers:
+        app.before_request(ensure_background_workers)
+    return app
+
 if __name__ == '__main__':
     # Verify environment variables
     print("=" * 50)
@@ -2545,4 +5268,10 @@ if __name__ == '__main__':
         print("and save it as 'credentials.json' in the same directory as this file.")
         exit(1)
     
+    app = create_app()
+    
+    # With the reloader, only the serving child process runs background workers
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_workers()
+    
     app.run(debug=True, port=5000, host='0.0.0.0')
\ No newline at end of file
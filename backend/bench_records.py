@@ -0,0 +1,75 @@
+"""Benchmark of the /api/responses records body: building it from scratch
+against joining the row JSON that ResponseRecords keeps.
+
+Usage: python bench_records.py [rows] [questions]
+"""
+import json
+import random
+import sys
+import timeit
+
+from flask import Flask
+
+from app import RATING_OPTIONS, SUBMISSION_COLUMNS, ResponseRecords, encode_payload, row_dicts
+
+def make_sheet(row_count, question_count):
+    """A responses-like sheet; a quarter of the rows miss their trailing cells."""
+    headers = list(SUBMISSION_COLUMNS) + [f"Question {i + 1} of the survey?" for i in range(question_count)]
+    rows = []
+    for i in range(row_count):
+        row = [f"2026-01-{i % 28 + 1:02d} 10:00:00", f"{i:064x}", 'POC', 'Ops', f"leader{i % 50}@example.com",
+               'F', '2 years', 'L3', '30', 'M', '', '4']
+        row += [random.choice(RATING_OPTIONS) for _ in range(question_count)]
+        if i % 4 == 0:
+            row = row[:len(row) - random.randint(1, question_count)]
+        rows.append(row)
+    return headers, rows
+
+def decode_with_loop(headers, rows):
+    """The loop the endpoint used before: a bounds check and a dict insert per cell."""
+    decoded = []
+    for row in rows:
+        item = {}
+        for i, header in enumerate(headers):
+            item[header] = row[i] if i < len(row) else ''
+        decoded.append(item)
+    return decoded
+
+def best_of(function, repeat=5):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+def main():
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    question_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    random.seed(1)
+    headers, rows = make_sheet(row_count, question_count)
+    values = [headers] + rows
+    
+    with Flask(__name__).app_context():
+        def body(data):
+            return encode_payload({'success': True, 'data': data}, 'application/json')
+        
+        def first_read():
+            response_records = ResponseRecords()
+            _, records, _ = response_records.sync(values, 1)
+            return body(response_records.encoded(records, records))
+        
+        response_records = ResponseRecords()
+        _, records, _ = response_records.sync(values, 1)
+        expected = json.loads(body(decode_with_loop(headers, rows)))
+        assert json.loads(body(row_dicts([record[1] for record in records]))) == expected
+        assert json.loads(body(response_records.encoded(records, records))) == expected
+        
+        loop = best_of(lambda: body(decode_with_loop(headers, rows)))
+        dicts = best_of(lambda: body(row_dicts([record[1] for record in records])))
+        first = best_of(first_read, repeat=3)
+        kept = best_of(lambda: body(response_records.encoded(records, records)))
+    
+    print(f"{row_count} rows x {len(headers)} columns, records body")
+    print(f"  per-cell dict loop + JSON        {loop * 1000:8.1f} ms")
+    print(f"  decoded rows to dicts + JSON     {dicts * 1000:8.1f} ms  ({loop / dicts:.1f}x)")
+    print(f"  first read: decode and encode    {first * 1000:8.1f} ms  ({loop / first:.1f}x)")
+    print(f"  later reads: kept row JSON       {kept * 1000:8.1f} ms  ({loop / kept:.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+"""Read-through cache of sheet ranges: collapsed concurrent reads, TTL
+entries served stale while they refresh, and values derived from them."""
+import threading
+import time
+
+from scheduler import background_sheets_calls
+from storage import parse_a1_range
+
+class _FlightCall:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait for it and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.issued = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _FlightCall()
+                self._calls[key] = call
+                self.issued += 1
+                leader = True
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'issued': self.issued,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls)
+            }
+
+class SheetCacheEntry:
+    """Cached values of one (spreadsheet_id, range) plus bookkeeping.
+
+    `version` changes only when the fetched values differ from the previous
+    copy, so anything derived from an entry can be rebuilt on version change.
+    `error` is set while the entry is being served because reloading it (or
+    syncing the mirror it was read from) failed. `synced_at` is when the
+    values were last known to match Google Sheets.
+    """
+
+    __slots__ = ('values', 'version', 'fetched_at', 'synced_at', 'error')
+
+    def __init__(self, values, version, fetched_at, synced_at=None, error=None):
+        self.values = values
+        self.version = version
+        self.fetched_at = fetched_at
+        self.synced_at = fetched_at if synced_at is None else synced_at
+        self.error = error
+
+class SheetCache:
+    """Read-through TTL cache keyed by (spreadsheet_id, range).
+
+    Fresh entries are returned directly. Entries past their TTL but within
+    `max_stale` are returned as-is while a single background thread refreshes
+    them. Missing or too-old entries are loaded synchronously; if that load
+    fails, the last good copy is served, however old, with `error` set.
+    """
+
+    def __init__(self, loader, batch_loader, default_ttl, max_stale, source_status=None):
+        self._loader = loader
+        self._batch_loader = batch_loader
+        # (spreadsheet_id, range) -> (synced_at, error) of a local copy the
+        # loader read from, or None when the values came from Sheets
+        self._source_status = source_status or (lambda spreadsheet_id, range_name: None)
+        self._default_ttl = default_ttl
+        self._max_stale = max_stale
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._ttls = {}
+        self._key_loaders = {}
+        self._refreshing = set()
+        self._next_version = 1
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_errors = 0
+        self.stale_served = 0
+
+    def configure(self, spreadsheet_id, sheet_name, ttl):
+        """Set the TTL used for every range of one sheet."""
+        self._ttls[(spreadsheet_id, sheet_name)] = ttl
+
+    def register_loader(self, spreadsheet_id, range_name, loader):
+        """Load one range with its own loader (called without arguments)."""
+        self._key_loaders[(spreadsheet_id, range_name)] = loader
+
+    def ttl_for(self, spreadsheet_id, range_name):
+        sheet_name = parse_a1_range(range_name)[0]
+        return self._ttls.get((spreadsheet_id, sheet_name), self._default_ttl)
+
+    def _lookup(self, key):
+        """Return a servable entry for key (refreshing it if stale) or None."""
+        ttl = self.ttl_for(*key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = time.time() - entry.fetched_at
+                if age < ttl:
+                    self.hits += 1
+                    return entry
+                if age < ttl + self._max_stale:
+                    self.stale_hits += 1
+                    self._start_refresh(key)
+                    return entry
+            self.misses += 1
+            return None
+
+    def get_entry(self, spreadsheet_id, range_name):
+        """Return the cache entry for a range, loading it if needed."""
+        key = (spreadsheet_id, range_name)
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry
+        try:
+            return self._load(key)
+        except Exception as e:
+            entry = self._last_good(key, e)
+            if entry is None:
+                raise
+            return entry
+
+    def get(self, spreadsheet_id, range_name):
+        return self.get_entry(spreadsheet_id, range_name).values
+
+    def get_many(self, pairs):
+        """Return entries for several (spreadsheet_id, range) pairs.
+
+        Ranges that are not cached are loaded together through the batch
+        loader instead of one upstream call each.
+        """
+        entries = {}
+        missing = []
+        for key in pairs:
+            entry = self._lookup(key)
+            if entry is not None:
+                entries[key] = entry
+            elif key not in missing:
+                missing.append(key)
+        
+        if missing:
+            try:
+                entries.update(self._load_many(missing))
+            except Exception as e:
+                fallback = {key: self._last_good(key, e) for key in missing}
+                if any(entry is None for entry in fallback.values()):
+                    raise
+                entries.update(fallback)
+        return entries
+
+    def refresh_many(self, pairs):
+        """Reload several ranges together regardless of their age."""
+        self._load_many(list(pairs))
+
+    def _load(self, key):
+        loader = self._key_loaders.get(key)
+        values = loader() if loader else self._loader(*key)
+        return self._store(key, values)
+
+    def _load_many(self, keys):
+        entries = {}
+        batched = [key for key in keys if key not in self._key_loaders]
+        if batched:
+            for key, values in self._batch_loader(batched).items():
+                entries[key] = self._store(key, values)
+        for key in keys:
+            if key in self._key_loaders:
+                entries[key] = self._load(key)
+        return entries
+
+    def _store(self, key, values):
+        now = time.time()
+        synced_at, error = self._source_status(*key) or (now, None)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.values is values or entry.values == values):
+                entry.fetched_at = now
+                entry.synced_at = synced_at
+                entry.error = error
+                return entry
+            entry = SheetCacheEntry(values, self._next_version, now, synced_at, error)
+            self._next_version += 1
+            self._entries[key] = entry
+            return entry
+
+    def _last_good(self, key, error):
+        """The cached copy of key to serve after a failed load, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.error = str(error)
+            self.stale_served += 1
+        print(f"Serving cached copy of {key} from {time.time() - entry.fetched_at:.0f}s ago: {error}")
+        return entry
+
+    def _start_refresh(self, key):
+        # Called with the lock held; at most one refresh per key at a time
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        threading.Thread(target=self._refresh, args=(key,), daemon=True).start()
+
+    def _refresh(self, key):
+        try:
+            with background_sheets_calls():
+                self._load(key)
+        except Exception as e:
+            self.refresh_errors += 1
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.error = str(e)
+            print(f"Error refreshing cached sheet data {key}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def invalidate(self, spreadsheet_id=None, sheet_name=None):
+        """Drop cached entries for one sheet, one spreadsheet, or everything."""
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if (spreadsheet_id is None or key[0] == spreadsheet_id)
+                and (sheet_name is None or parse_a1_range(key[1])[0] == sheet_name)
+            ]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'refreshing': len(self._refreshing),
+                'refresh_errors': self.refresh_errors,
+                'stale_served': self.stale_served
+            }
+
+class DerivedView:
+    """A value computed from a cached sheet and rebuilt only when it changes.
+
+    The build function receives the sheet values and runs at most once per
+    cache entry version.
+    """
+
+    def __init__(self, build):
+        self._build = build
+        self._lock = threading.Lock()
+        self._version = None
+        self._value = None
+        self.builds = 0
+
+    def get(self, entry):
+        with self._lock:
+            if self._version != entry.version:
+                self._value = self._build(entry.values)
+                self._version = entry.version
+                self.builds += 1
+            return self._value
@@ -0,0 +1,282 @@
+"""Gate for every Google Sheets API call: priorities, quota token buckets,
+retries with backoff and a circuit breaker per spreadsheet."""
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+# Priorities of upstream calls; lower runs first
+FOREGROUND, BACKGROUND = 0, 1
+PRIORITY_NAMES = ('foreground', 'background')
+
+_sheets_context = threading.local()
+
+def current_sheets_priority():
+    return getattr(_sheets_context, 'priority', FOREGROUND)
+
+@contextmanager
+def sheets_priority(priority):
+    """Run the Sheets calls made by this thread inside the block at `priority`."""
+    previous = current_sheets_priority()
+    _sheets_context.priority = priority
+    try:
+        yield
+    finally:
+        _sheets_context.priority = previous
+
+def background_sheets_calls():
+    """Mark the calls inside the block as background work (refreshes, flushes)."""
+    return sheets_priority(BACKGROUND)
+
+class TokenBucket:
+    """Token bucket refilled at `per_minute` tokens per minute, holding at most `burst`.
+
+    A caller waits while a caller of higher priority is waiting, so
+    user-facing calls are served before background ones when tokens are scarce.
+    """
+
+    def __init__(self, per_minute, burst):
+        self._rate = per_minute / 60.0
+        self._capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiting = [0] * len(PRIORITY_NAMES)
+        self._granted = [0] * len(PRIORITY_NAMES)
+        self._total_wait = [0.0] * len(PRIORITY_NAMES)
+        self._max_wait = [0.0] * len(PRIORITY_NAMES)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def acquire(self, priority):
+        """Take one token, waiting as needed. Returns the seconds waited."""
+        started = time.monotonic()
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    self._refill()
+                    outranked = any(self._waiting[:priority])
+                    if self._tokens >= 1 and not outranked:
+                        self._tokens -= 1
+                        break
+                    # Woken early when a higher-priority caller leaves
+                    timeout = (1 - self._tokens) / self._rate if self._tokens < 1 else None
+                    self._cond.wait(timeout)
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+            
+            waited = time.monotonic() - started
+            self._granted[priority] += 1
+            self._total_wait[priority] += waited
+            self._max_wait[priority] = max(self._max_wait[priority], waited)
+            return waited
+
+    def stats(self):
+        with self._cond:
+            self._refill()
+            return {
+                'tokens': round(self._tokens, 2),
+                'per_minute': self._rate * 60,
+                'queue_wait': {
+                    name: {
+                        'waiting': self._waiting[priority],
+                        'granted': self._granted[priority],
+                        'avg_ms': round(1000 * self._total_wait[priority] / self._granted[priority], 1)
+                        if self._granted[priority] else 0.0,
+                        'max_ms': round(1000 * self._max_wait[priority], 1)
+                    }
+                    for priority, name in enumerate(PRIORITY_NAMES)
+                }
+            }
+
+# Upstream failures that are safe to retry. A write that failed any other way
+# may still have been applied, so only rate limiting (nothing was done) is
+# retried for writes; the feedback journal handles the rest.
+RETRYABLE_READ_STATUSES = (429, 500, 502, 503, 504)
+RETRYABLE_WRITE_STATUSES = (429,)
+
+def is_upstream_failure(error):
+    """Whether an error means Google Sheets is failing, as opposed to a bad request."""
+    if isinstance(error, HttpError):
+        return error.resp.status in RETRYABLE_READ_STATUSES
+    return isinstance(error, (ConnectionError, TimeoutError, httplib2.HttpLib2Error))
+
+class SheetsUnavailableError(Exception):
+    """Raised without calling Google while a spreadsheet's circuit breaker is open."""
+
+    def __init__(self, spreadsheet_id, retry_after):
+        super().__init__(f"Google Sheets is unavailable for spreadsheet {spreadsheet_id}; "
+                         f"retrying in {retry_after:.0f}s")
+        self.spreadsheet_id = spreadsheet_id
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Fails calls fast after `failure_threshold` consecutive upstream failures.
+
+    Closed: calls go through. Open: calls raise SheetsUnavailableError until
+    `reset_timeout` has passed. Half-open: one probe call goes through; its
+    success closes the breaker and its failure opens it again.
+    """
+
+    def __init__(self, spreadsheet_id, failure_threshold, reset_timeout):
+        self._spreadsheet_id = spreadsheet_id
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.rejected = 0
+        self.trips = 0
+
+    def allow(self):
+        """Raise SheetsUnavailableError unless a call may go upstream now."""
+        with self._lock:
+            if self.state == 'closed':
+                return
+            retry_after = self.opened_at + self._reset_timeout - time.monotonic()
+            if self.state == 'open' and retry_after <= 0:
+                # This caller is the probe; everyone else keeps failing fast
+                self.state = 'half_open'
+                print(f"Circuit breaker for {self._spreadsheet_id} half-open, probing")
+                return
+            self.rejected += 1
+            raise SheetsUnavailableError(self._spreadsheet_id, max(retry_after, 1))
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                print(f"Circuit breaker for {self._spreadsheet_id} closed")
+            self.state = 'closed'
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or (self.state == 'closed' and self.failures >= self._failure_threshold):
+                if self.state == 'closed':
+                    self.trips += 1
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                print(f"Circuit breaker for {self._spreadsheet_id} open after {self.failures} failures")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'trips': self.trips,
+                'rejected': self.rejected
+            }
+
+class SheetsScheduler:
+    """Single gate for every Google Sheets API call.
+
+    Reads and writes draw from separate token buckets sized to the quota,
+    user-facing calls are served before background ones, and rate-limited or
+    transiently failed calls are retried with jittered exponential backoff
+    (honouring Retry-After when Google sends it). Each spreadsheet has a
+    circuit breaker so an outage fails fast instead of waiting out retries.
+    """
+
+    def __init__(self, client, reads_per_minute, writes_per_minute, burst,
+                 max_retries, base_delay, max_delay, breaker_failures, breaker_reset):
+        self._client = client
+        self._buckets = {
+            'read': TokenBucket(reads_per_minute, burst),
+            'write': TokenBucket(writes_per_minute, burst)
+        }
+        self._max_retries = max_retries
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._breaker_failures = breaker_failures
+        self._breaker_reset = breaker_reset
+        self._breakers = {}
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.gave_up = 0
+        self.errors = {}
+
+    def _retry_delay(self, error, kind, attempt):
+        """Seconds to wait before retrying, or None if the error is final."""
+        if isinstance(error, HttpError):
+            status = error.resp.status
+            retryable = status in (RETRYABLE_READ_STATUSES if kind == 'read' else RETRYABLE_WRITE_STATUSES)
+        else:
+            status = type(error).__name__
+            retryable = kind == 'read' and is_upstream_failure(error)
+        
+        with self._lock:
+            self.errors[str(status)] = self.errors.get(str(status), 0) + 1
+            if not retryable:
+                return None
+            if attempt >= self._max_retries:
+                self.gave_up += 1
+                return None
+            self.retries += 1
+        
+        delay = min(self._max_delay, self._base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+        if isinstance(error, HttpError):
+            try:
+                delay = max(delay, float(error.resp.get('retry-after', 0)))
+            except ValueError:
+                pass
+        return delay
+
+    def breaker_for(self, spreadsheet_id):
+        with self._lock:
+            breaker = self._breakers.get(spreadsheet_id)
+            if breaker is None:
+                breaker = CircuitBreaker(spreadsheet_id, self._breaker_failures, self._breaker_reset)
+                self._breakers[spreadsheet_id] = breaker
+            return breaker
+
+    def execute(self, request, spreadsheet_id, kind='read'):
+        """Execute a googleapiclient request once a quota token is available.
+
+        Raises SheetsUnavailableError while the spreadsheet's breaker is open.
+        """
+        bucket = self._buckets[kind]
+        breaker = self.breaker_for(spreadsheet_id)
+        priority = current_sheets_priority()
+        attempt = 0
+        while True:
+            breaker.allow()
+            bucket.acquire(priority)
+            try:
+                result = self._client.execute(request)
+            except Exception as e:
+                if is_upstream_failure(e):
+                    breaker.record_failure()
+                else:
+                    # Google answered, even if it rejected the request
+                    breaker.record_success()
+                delay = self._retry_delay(e, kind, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                print(f"Sheets {kind} failed ({e}), retry {attempt}/{self._max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+            else:
+                breaker.record_success()
+                return result
+
+    def stats(self):
+        stats = {kind: bucket.stats() for kind, bucket in self._buckets.items()}
+        with self._lock:
+            stats.update({
+                'retries': self.retries,
+                'gave_up': self.gave_up,
+                'errors': dict(self.errors)
+            })
+            breakers = list(self._breakers.items())
+        stats['breakers'] = {spreadsheet_id: breaker.stats() for spreadsheet_id, breaker in breakers}
+        return stats
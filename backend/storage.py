@@ -0,0 +1,793 @@
+"""Storage backends the endpoints read and write spreadsheets through:
+Google Sheets, SQLite, process memory and the SQLite mirror of Sheets,
+plus A1 range helpers and the cached grid sizes of each sheet."""
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import google_auth_httplib2
+import httplib2
+from google.oauth2 import service_account
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+from scheduler import background_sheets_calls
+
+class SheetsClient:
+    """Process-wide Google Sheets client shared by all request threads.
+
+    The service account credentials and the discovery-built service are
+    created once. httplib2 connections are not thread-safe, so requests are
+    executed on keep-alive connections leased from a small pool instead of
+    on the service's own connection.
+    """
+
+    def __init__(self, service_account_file, scopes, pool_size, timeout):
+        self._service_account_file = service_account_file
+        self._scopes = scopes
+        self._pool_size = pool_size
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._credentials = None
+        self._service = None
+        self._idle_http = []
+        self.clients_built = 0
+        self.clients_reused = 0
+        self.token_refreshes = 0
+
+    def _fresh_credentials(self):
+        """Load the credentials on first use and refresh the token when it expires.
+
+        Must be called with the lock held so only one thread refreshes.
+        """
+        if self._credentials is None:
+            self._credentials = service_account.Credentials.from_service_account_file(
+                self._service_account_file,
+                scopes=self._scopes
+            )
+        if not self._credentials.valid:
+            self._credentials.refresh(
+                google_auth_httplib2.Request(httplib2.Http(timeout=self._timeout))
+            )
+            self.token_refreshes += 1
+        return self._credentials
+
+    def spreadsheets(self):
+        """Return the shared spreadsheets() resource used to build requests."""
+        with self._lock:
+            credentials = self._fresh_credentials()
+            if self._service is None:
+                self._service = build(
+                    'sheets', 'v4',
+                    credentials=credentials,
+                    cache_discovery=False
+                )
+            return self._service.spreadsheets()
+
+    @contextmanager
+    def http(self):
+        """Lease an authorized keep-alive connection for the duration of one call."""
+        with self._lock:
+            credentials = self._fresh_credentials()
+            if self._idle_http:
+                http = self._idle_http.pop()
+                self.clients_reused += 1
+            else:
+                http = google_auth_httplib2.AuthorizedHttp(
+                    credentials,
+                    http=httplib2.Http(timeout=self._timeout)
+                )
+                self.clients_built += 1
+        try:
+            yield http
+        finally:
+            with self._lock:
+                if len(self._idle_http) < self._pool_size:
+                    self._idle_http.append(http)
+
+    def execute(self, request):
+        """Execute a googleapiclient request on a pooled connection."""
+        with self.http() as http:
+            return request.execute(http=http)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'clients_built': self.clients_built,
+                'clients_reused': self.clients_reused,
+                'token_refreshes': self.token_refreshes,
+                'idle_connections': len(self._idle_http)
+            }
+
+def quote_sheet_name(sheet_name):
+    """Sheet name as written in A1 notation, quoted when it is not a plain word."""
+    if re.fullmatch(r'\w+', sheet_name):
+        return sheet_name
+    return "'" + sheet_name.replace("'", "''") + "'"
+
+def column_index(letters):
+    """0-based index of a column given by its letters ('A' -> 0, 'AA' -> 26)."""
+    index = 0
+    for letter in letters.upper():
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+def column_letters(index):
+    """Letters of the column at a 0-based index (0 -> 'A', 26 -> 'AA')."""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+A1_RANGE = re.compile(r"^(?:'((?:[^']|'')+)'|([^'!]+))(?:!([A-Za-z]*\d*)(?::([A-Za-z]*\d*))?)?$")
+A1_CELL = re.compile(r'^([A-Za-z]*)(\d*)$')
+
+def parse_a1_range(range_name):
+    """Split an A1 range into (sheet_name, first_row, last_row, first_column, last_column).
+
+    Rows are 1-based, columns 0-based, and an open end ('A:Z', 'A5:Z', '1:1'
+    or a bare sheet name) is None. Raises ValueError for anything else.
+    """
+    match = A1_RANGE.match(range_name)
+    if not match:
+        raise ValueError(f"Invalid A1 range: {range_name}")
+    quoted, plain, start, end = match.groups()
+    sheet_name = quoted.replace("''", "'") if quoted else plain
+    if not start:
+        return sheet_name, 1, None, 0, None
+    
+    start_column, start_row = A1_CELL.match(start).groups()
+    if end is None:
+        # A single cell
+        end_column, end_row = start_column, start_row
+    else:
+        end_column, end_row = A1_CELL.match(end).groups()
+    if bool(start_column) != bool(end_column) or bool(start_row) and not (end_row or end_column):
+        raise ValueError(f"Invalid A1 range: {range_name}")
+    
+    first_row = int(start_row) if start_row else 1
+    last_row = int(end_row) if end_row else None
+    first_column = column_index(start_column) if start_column else 0
+    last_column = column_index(end_column) if end_column else None
+    if first_row < 1 or (last_row is not None and last_row < first_row) or \
+            (last_column is not None and last_column < first_column):
+        raise ValueError(f"Invalid A1 range: {range_name}")
+    return sheet_name, first_row, last_row, first_column, last_column
+
+def format_a1_range(sheet_name, first_row, last_row, first_column, last_column):
+    return (f"{quote_sheet_name(sheet_name)}!"
+            f"{column_letters(first_column)}{first_row}:{column_letters(last_column)}{last_row}")
+
+def trim_values(values):
+    """Drop trailing empty cells and rows, as the Sheets API does in values responses."""
+    trimmed = []
+    for row in values:
+        end = len(row)
+        while end and row[end - 1] == '':
+            end -= 1
+        trimmed.append(row[:end])
+    while trimmed and not trimmed[-1]:
+        trimmed.pop()
+    return trimmed
+
+def trim_row(row):
+    trimmed = trim_values([row])
+    return trimmed[0] if trimmed else []
+
+def cell_text(value):
+    return '' if value is None else str(value)
+
+class SheetStorage:
+    """Interface the endpoints read and write spreadsheets through.
+
+    Ranges use A1 notation and values are lists of rows of strings, trimmed
+    the way the Sheets API trims them. Implementations override read_range,
+    append_rows and update_range; batched and whole-sheet reads default to
+    those.
+    """
+
+    name = None
+
+    def read_range(self, spreadsheet_id, range_name):
+        raise NotImplementedError
+
+    def read_ranges(self, spreadsheet_id, ranges):
+        return [self.read_range(spreadsheet_id, range_name) for range_name in ranges]
+
+    def read_sheet(self, spreadsheet_id, sheet_name):
+        """Every used cell of a sheet."""
+        return self.read_range(spreadsheet_id, quote_sheet_name(sheet_name))
+
+    def read_header(self, spreadsheet_id, sheet_name):
+        """The sheet's first row, or [] when the sheet is empty."""
+        values = self.read_range(spreadsheet_id, f"{quote_sheet_name(sheet_name)}!1:1")
+        return values[0] if values else []
+
+    def read_grid(self, spreadsheet_id):
+        """Size of every sheet of a spreadsheet, as {title: {'sheet_id', 'rows', 'columns'}}."""
+        raise NotImplementedError
+
+    def append_columns(self, spreadsheet_id, sheet_id, count):
+        """Grow a sheet's grid by `count` columns."""
+        raise NotImplementedError
+
+    def append_rows(self, spreadsheet_id, range_name, rows):
+        """Append rows after the last used row. Returns a Sheets-style append result."""
+        raise NotImplementedError
+
+    def update_range(self, spreadsheet_id, range_name, rows):
+        """Overwrite cells starting at the range's first cell. Returns a Sheets-style update result."""
+        raise NotImplementedError
+
+    def stats(self):
+        return {'backend': self.name}
+
+class SheetsStorage(SheetStorage):
+    """Google Sheets, with every call going through the quota-aware scheduler."""
+
+    name = 'sheets'
+
+    def __init__(self, client, scheduler):
+        self._client = client
+        self._scheduler = scheduler
+
+    def read_range(self, spreadsheet_id, range_name):
+        request = self._client.spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=range_name
+        )
+        result = self._scheduler.execute(request, spreadsheet_id)
+        return result.get('values', [])
+
+    def read_ranges(self, spreadsheet_id, ranges):
+        request = self._client.spreadsheets().values().batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=list(ranges)
+        )
+        result = self._scheduler.execute(request, spreadsheet_id)
+        value_ranges = result.get('valueRanges', [])
+        return [value_range.get('values', []) for value_range in value_ranges]
+
+    def read_grid(self, spreadsheet_id):
+        request = self._client.spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            fields='sheets.properties(sheetId,title,gridProperties(rowCount,columnCount))'
+        )
+        result = self._scheduler.execute(request, spreadsheet_id)
+        grid = {}
+        for sheet in result.get('sheets', []):
+            properties = sheet['properties']
+            size = properties.get('gridProperties', {})
+            grid[properties['title']] = {
+                'sheet_id': properties.get('sheetId', 0),
+                'rows': size.get('rowCount', 0),
+                'columns': size.get('columnCount', 0)
+            }
+        return grid
+
+    def append_columns(self, spreadsheet_id, sheet_id, count):
+        request = self._client.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={'requests': [{
+                'appendDimension': {'sheetId': sheet_id, 'dimension': 'COLUMNS', 'length': count}
+            }]}
+        )
+        return self._scheduler.execute(request, spreadsheet_id, 'write')
+
+    def append_rows(self, spreadsheet_id, range_name, rows):
+        request = self._client.spreadsheets().values().append(
+            spreadsheetId=spreadsheet_id,
+            range=range_name,
+            valueInputOption='USER_ENTERED',
+            insertDataOption='INSERT_ROWS',
+            body={'values': rows}
+        )
+        return self._scheduler.execute(request, spreadsheet_id, 'write')
+
+    def update_range(self, spreadsheet_id, range_name, rows):
+        request = self._client.spreadsheets().values().update(
+            spreadsheetId=spreadsheet_id,
+            range=range_name,
+            valueInputOption='USER_ENTERED',
+            body={'values': rows}
+        )
+        return self._scheduler.execute(request, spreadsheet_id, 'write')
+
+class GridStorage(SheetStorage):
+    """Sheets-compatible storage kept as numbered rows of strings.
+
+    Range parsing, trimming, append placement and cell merging are shared
+    here; the local backends only implement _read_rows, _last_row and
+    _store_rows for one (spreadsheet, sheet) at a time. All access is
+    serialized by one lock so appends get consecutive row numbers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+
+    def _read_rows(self, spreadsheet_id, sheet_name, first_row, last_row):
+        """(row_number, cells) for stored rows in the window, in row order."""
+        raise NotImplementedError
+
+    def _last_row(self, spreadsheet_id, sheet_name):
+        """Number of the last stored row, 0 for an empty sheet."""
+        raise NotImplementedError
+
+    def _store_rows(self, spreadsheet_id, sheet_name, rows):
+        """Replace the given (row_number, cells) rows."""
+        raise NotImplementedError
+
+    def _sheet_sizes(self, spreadsheet_id):
+        """(sheet_name, last row, widest row) of every stored sheet of a spreadsheet."""
+        raise NotImplementedError
+
+    def read_grid(self, spreadsheet_id):
+        with self._lock:
+            sizes = self._sheet_sizes(spreadsheet_id or '')
+        return {
+            sheet_name: {'sheet_id': sheet_name, 'rows': rows, 'columns': columns}
+            for sheet_name, rows, columns in sizes
+        }
+
+    def append_columns(self, spreadsheet_id, sheet_id, count):
+        # Local sheets have no fixed grid, rows are as wide as what is written
+        return None
+
+    def read_range(self, spreadsheet_id, range_name):
+        sheet_name, first_row, last_row, first_column, last_column = parse_a1_range(range_name)
+        stop = last_column + 1 if last_column is not None else None
+        with self._lock:
+            self.reads += 1
+            stored = self._read_rows(spreadsheet_id or '', sheet_name, first_row, last_row)
+        values = []
+        for row_number, cells in stored:
+            # Rows missing from the store are empty rows of the sheet
+            values.extend([] for _ in range(row_number - first_row - len(values)))
+            values.append(cells[first_column:stop])
+        return trim_values(values)
+
+    def _write(self, spreadsheet_id, sheet_name, first_row, first_column, rows):
+        """Merge rows into the stored cells from (first_row, first_column) on; lock held."""
+        last_row = first_row + len(rows) - 1
+        existing = dict(self._read_rows(spreadsheet_id, sheet_name, first_row, last_row))
+        stored = []
+        for row_number, row in enumerate(rows, first_row):
+            cells = list(existing.get(row_number, []))
+            cells.extend([''] * (first_column + len(row) - len(cells)))
+            cells[first_column:first_column + len(row)] = [cell_text(value) for value in row]
+            stored.append((row_number, trim_row(cells)))
+        self._store_rows(spreadsheet_id, sheet_name, stored)
+        self.writes += 1
+        width = max((len(row) for row in rows), default=0)
+        return {
+            'spreadsheetId': spreadsheet_id,
+            'updatedRange': format_a1_range(sheet_name, first_row, last_row,
+                                            first_column, first_column + max(width, 1) - 1),
+            'updatedRows': len(rows),
+            'updatedColumns': width,
+            'updatedCells': sum(len(row) for row in rows)
+        }
+
+    def append_rows(self, spreadsheet_id, range_name, rows):
+        sheet_name, _, _, first_column, _ = parse_a1_range(range_name)
+        spreadsheet_id = spreadsheet_id or ''
+        with self._lock:
+            first_row = self._last_row(spreadsheet_id, sheet_name) + 1
+            updates = self._write(spreadsheet_id, sheet_name, first_row, first_column, rows)
+        return {'spreadsheetId': spreadsheet_id, 'updates': updates}
+
+    def update_range(self, spreadsheet_id, range_name, rows):
+        sheet_name, first_row, _, first_column, _ = parse_a1_range(range_name)
+        with self._lock:
+            return self._write(spreadsheet_id or '', sheet_name, first_row, first_column, rows)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.name,
+                'reads': self.reads,
+                'writes': self.writes
+            }
+
+class MemoryStorage(GridStorage):
+    """Process-local sheets for tests and local development; nothing is persisted."""
+
+    name = 'memory'
+
+    def __init__(self):
+        super().__init__()
+        self._sheets = {}
+
+    def _read_rows(self, spreadsheet_id, sheet_name, first_row, last_row):
+        rows = self._sheets.get((spreadsheet_id, sheet_name), [])
+        window = rows[first_row - 1:last_row]
+        return [(row_number, list(cells)) for row_number, cells in enumerate(window, first_row)]
+
+    def _last_row(self, spreadsheet_id, sheet_name):
+        rows = self._sheets.get((spreadsheet_id, sheet_name), [])
+        last = len(rows)
+        while last and not rows[last - 1]:
+            last -= 1
+        return last
+
+    def _sheet_sizes(self, spreadsheet_id):
+        return [
+            (sheet_name, len(rows), max((len(row) for row in rows), default=0))
+            for (sheet_id, sheet_name), rows in self._sheets.items()
+            if sheet_id == spreadsheet_id
+        ]
+
+    def _store_rows(self, spreadsheet_id, sheet_name, rows):
+        sheet = self._sheets.setdefault((spreadsheet_id, sheet_name), [])
+        for row_number, cells in rows:
+            sheet.extend([] for _ in range(row_number - len(sheet)))
+            sheet[row_number - 1] = cells
+
+class SQLiteStorage(GridStorage):
+    """Sheets kept in a local SQLite database, one table row per sheet row.
+
+    The primary key (spreadsheet_id, sheet_name, row_number) is the index
+    every access uses: range reads are a key-range scan and finding the
+    append position is a single seek to the largest row number.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path):
+        super().__init__()
+        self._path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        # Readers in other processes are not blocked while rows are written
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS sheet_rows (
+                spreadsheet_id TEXT NOT NULL,
+                sheet_name TEXT NOT NULL,
+                row_number INTEGER NOT NULL,
+                cells TEXT NOT NULL,
+                PRIMARY KEY (spreadsheet_id, sheet_name, row_number)
+            ) WITHOUT ROWID
+        ''')
+        self._db.commit()
+
+    def _read_rows(self, spreadsheet_id, sheet_name, first_row, last_row):
+        cursor = self._db.execute(
+            'SELECT row_number, cells FROM sheet_rows '
+            'WHERE spreadsheet_id = ? AND sheet_name = ? AND row_number BETWEEN ? AND ? '
+            'ORDER BY row_number',
+            (spreadsheet_id, sheet_name, first_row, last_row if last_row is not None else 2 ** 62)
+        )
+        return [(row_number, json.loads(cells)) for row_number, cells in cursor]
+
+    def _last_row(self, spreadsheet_id, sheet_name):
+        row = self._db.execute(
+            "SELECT MAX(row_number) FROM sheet_rows "
+            "WHERE spreadsheet_id = ? AND sheet_name = ? AND cells != '[]'",
+            (spreadsheet_id, sheet_name)
+        ).fetchone()
+        return row[0] or 0
+
+    def _sheet_sizes(self, spreadsheet_id):
+        return self._db.execute(
+            'SELECT sheet_name, MAX(row_number), MAX(json_array_length(cells)) FROM sheet_rows '
+            'WHERE spreadsheet_id = ? GROUP BY sheet_name',
+            (spreadsheet_id,)
+        ).fetchall()
+
+    def _insert_rows(self, spreadsheet_id, sheet_name, rows):
+        self._db.executemany(
+            'INSERT OR REPLACE INTO sheet_rows (spreadsheet_id, sheet_name, row_number, cells) '
+            'VALUES (?, ?, ?, ?)',
+            [(spreadsheet_id, sheet_name, row_number, json.dumps(cells)) for row_number, cells in rows]
+        )
+
+    def _store_rows(self, spreadsheet_id, sheet_name, rows):
+        with self._db:
+            self._insert_rows(spreadsheet_id, sheet_name, rows)
+
+class SheetMirror(SQLiteStorage):
+    """Local SQLite copy (WAL mode) of the sheets the read endpoints use.
+
+    Once a sheet has synced, every read of it is answered from the database,
+    also right after a restart since the file persists, so request latency
+    no longer depends on Google. A background worker reconciles each sheet
+    incrementally. Append-only sheets read the header, the last mirrored row
+    and the rows after it in one batched call and only insert the new rows.
+    Other sheets are read whole and only rows that differ are rewritten;
+    append-only sheets get the same treatment every `full_sync_every` syncs
+    or when the probe finds an edit. Rows this process writes are copied in
+    as soon as Sheets accepts them.
+
+    A sheet is only read from the mirror while its last successful sync is
+    at most `max_lag` seconds old, so a file left by an earlier run or a
+    stalled worker sends reads back to Sheets.
+    """
+
+    name = 'mirror'
+
+    def __init__(self, path, source, grid, sheets, interval, full_sync_every, max_lag, on_change):
+        super().__init__(path)
+        self._source = source
+        self._grid = grid
+        # (spreadsheet_id, sheet_name) -> (name, whether the sheet is append-only)
+        self._sheets = {(spreadsheet_id, sheet_name): (name, append_only)
+                        for name, (spreadsheet_id, sheet_name, append_only) in sheets.items()
+                        if spreadsheet_id}
+        self._interval = interval
+        self._full_sync_every = max(1, full_sync_every)
+        self._max_lag = max_lag
+        self._on_change = on_change
+        self._sync_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.syncs = 0
+        self.full_syncs = 0
+        self.rows_synced = 0
+        self.rows_written_through = 0
+        self.sync_errors = 0
+        self.last_error = None
+        # Per sheet: syncs run (to space out full syncs) and the error of the
+        # last sync while it keeps failing
+        self._sheet_syncs = {key: 0 for key in self._sheets}
+        self._sync_errors = {}
+        
+        with self._lock, self._db:
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.executescript('''
+                CREATE TABLE IF NOT EXISTS mirror_sheets (
+                    spreadsheet_id TEXT NOT NULL,
+                    sheet_name TEXT NOT NULL,
+                    synced_at REAL NOT NULL,
+                    PRIMARY KEY (spreadsheet_id, sheet_name)
+                ) WITHOUT ROWID;
+                -- Left by earlier versions, which kept an indexed copy of the responses
+                DROP TABLE IF EXISTS responses;
+            ''')
+            self._synced = {
+                (spreadsheet_id, sheet_name): synced_at
+                for spreadsheet_id, sheet_name, synced_at
+                in self._db.execute('SELECT spreadsheet_id, sheet_name, synced_at FROM mirror_sheets')
+                if (spreadsheet_id, sheet_name) in self._sheets
+            }
+
+    def covers(self, spreadsheet_id, range_name):
+        """Whether reads of this range can be answered from the mirror."""
+        try:
+            sheet_name = parse_a1_range(range_name)[0]
+        except ValueError:
+            return False
+        synced_at = self._synced.get((spreadsheet_id or '', sheet_name))
+        return synced_at is not None and time.time() - synced_at <= self._max_lag
+
+    def status(self, spreadsheet_id, range_name):
+        """(synced_at, error of the last sync or None) for the sheet of a range."""
+        key = (spreadsheet_id or '', parse_a1_range(range_name)[0])
+        return self._synced.get(key), self._sync_errors.get(key)
+
+    def _truncate(self, spreadsheet_id, sheet_name, last_row):
+        """Drop mirrored rows after last_row; lock held, inside a transaction."""
+        self._db.execute(
+            'DELETE FROM sheet_rows WHERE spreadsheet_id = ? AND sheet_name = ? AND row_number > ?',
+            (spreadsheet_id, sheet_name, last_row)
+        )
+
+    def _probe(self, spreadsheet_id, sheet_name, held):
+        """Rows appended since the last sync, or None if earlier rows changed."""
+        quoted = quote_sheet_name(sheet_name)
+        header_range = f"{quoted}!1:1"
+        last_range = f"{quoted}!{held}:{held}"
+        width = len(self.read_header(spreadsheet_id, sheet_name))
+        try:
+            header, last, tail = self._source.read_ranges(
+                spreadsheet_id,
+                [header_range, last_range, self._grid.rows_range(spreadsheet_id, sheet_name, held + 1, width)]
+            )
+        except HttpError as e:
+            # e.g. the tail range starts past the end of the grid
+            if e.resp.status != 400:
+                raise
+            return None
+        if header != self.read_range(spreadsheet_id, header_range) or \
+                last != self.read_range(spreadsheet_id, last_range):
+            return None
+        return tail
+
+    def sync_sheet(self, spreadsheet_id, sheet_name):
+        """Bring one sheet up to date. Returns how many mirrored rows changed."""
+        key = (spreadsheet_id, sheet_name)
+        with self._sync_lock:
+            self.syncs += 1
+            self._sheet_syncs[key] += 1
+            with self._lock:
+                held = self._last_row(*key)
+            
+            tail = None
+            if self._sheets[key][1] and key in self._synced and held and \
+                    self._sheet_syncs[key] % self._full_sync_every:
+                tail = self._probe(spreadsheet_id, sheet_name, held)
+            
+            appended_only = True
+            if tail is not None:
+                changed = len(tail)
+                if tail:
+                    with self._lock:
+                        self._write(spreadsheet_id, sheet_name, held + 1, 0, tail)
+            else:
+                values = self._source.read_sheet(spreadsheet_id, sheet_name)
+                self.full_syncs += 1
+                with self._lock:
+                    mirrored = dict(self._read_rows(spreadsheet_id, sheet_name, 1, None))
+                    differing = [
+                        (row_number, row) for row_number, row in enumerate(values, 1)
+                        if mirrored.get(row_number, []) != row
+                    ]
+                    removed = sum(1 for row_number in mirrored if row_number > len(values))
+                    with self._db:
+                        self._insert_rows(spreadsheet_id, sheet_name, differing)
+                        self._truncate(spreadsheet_id, sheet_name, len(values))
+                changed = len(differing) + removed
+                appended_only = not removed and all(row_number > held for row_number, _ in differing)
+            
+            synced_at = time.time()
+            with self._lock, self._db:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO mirror_sheets (spreadsheet_id, sheet_name, synced_at) VALUES (?, ?, ?)',
+                    (spreadsheet_id, sheet_name, synced_at)
+                )
+            self._synced[key] = synced_at
+            self._sync_errors.pop(key, None)
+            self.rows_synced += changed
+        
+        if changed:
+            print(f"Mirror synced {self._sheets[key][0]}: {changed} rows changed")
+            self._on_change(spreadsheet_id, sheet_name, appended_only)
+        return changed
+
+    def sync_all(self, name=None):
+        """Sync every mirrored sheet, or only the named one; errors are logged, not raised."""
+        for key, (sheet, _) in self._sheets.items():
+            if name is not None and sheet != name:
+                continue
+            try:
+                with background_sheets_calls():
+                    self.sync_sheet(*key)
+            except Exception as e:
+                self.sync_errors += 1
+                self.last_error = self._sync_errors[key] = str(e)
+                print(f"Error syncing mirror of {sheet}: {e}")
+
+    def write_through(self, spreadsheet_id, result, rows):
+        """Copy rows Sheets just accepted into the mirror at the range Sheets reported.
+
+        When the rows would not directly follow what the mirror holds (another
+        writer got there first) the next sync is started instead.
+        """
+        try:
+            updated_range = (result.get('updates') or result).get('updatedRange')
+            sheet_name, first_row, _, first_column, _ = parse_a1_range(updated_range)
+            key = (spreadsheet_id or '', sheet_name)
+            if key not in self._synced:
+                return
+            with self._lock:
+                if first_row > self._last_row(*key) + 1:
+                    self._wakeup.set()
+                    return
+                self._write(key[0], sheet_name, first_row, first_column, rows)
+            self.rows_written_through += len(rows)
+        except Exception as e:
+            print(f"Mirror write-through skipped ({e}), syncing instead")
+            self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self.sync_all()
+            self._wakeup.wait(self._interval)
+            self._wakeup.clear()
+
+    def ensure_started(self):
+        """Start the sync worker once per process."""
+        with self._sync_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='sheet-mirror', daemon=True)
+            self._thread.start()
+
+    def stats(self):
+        now = time.time()
+        return {
+            # Seconds since each sheet last synced, None before its first sync
+            'lag_seconds': {
+                name: round(now - self._synced[key], 1) if key in self._synced else None
+                for key, (name, _) in self._sheets.items()
+            },
+            'syncs': self.syncs,
+            'full_syncs': self.full_syncs,
+            'rows_synced': self.rows_synced,
+            'rows_written_through': self.rows_written_through,
+            'sync_errors': self.sync_errors,
+            'last_error': self.last_error,
+            'failing': {self._sheets[key][0]: error for key, error in self._sync_errors.items()}
+        }
+
+class SheetGrid:
+    """Grid size of every sheet, read from spreadsheet metadata and cached.
+
+    One metadata call returns every sheet of a spreadsheet, so the column
+    bound of row-window reads costs at most one extra call per spreadsheet
+    and TTL. Writes wider than a sheet's grid add the missing columns first.
+    """
+
+    def __init__(self, source, ttl):
+        self._source = source
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._grids = {}
+        self.loads = 0
+        self.columns_added = 0
+
+    def _grid(self, spreadsheet_id, refresh=False):
+        with self._lock:
+            cached = self._grids.get(spreadsheet_id)
+            if cached is not None and not refresh and time.time() - cached[0] < self._ttl:
+                return cached[1]
+        grid = self._source.read_grid(spreadsheet_id)
+        with self._lock:
+            self._grids[spreadsheet_id] = (time.time(), grid)
+            self.loads += 1
+        return grid
+
+    def columns(self, spreadsheet_id, sheet_name, at_least=0):
+        """Column count of a sheet, never below `at_least` (the widest row already known).
+
+        Falls back to `at_least` when the metadata cannot be read, so a Sheets
+        outage does not break reads that could be served locally.
+        """
+        try:
+            sheet = self._grid(spreadsheet_id).get(sheet_name)
+        except Exception as e:
+            print(f"Error reading grid of {sheet_name}: {e}")
+            sheet = None
+        return max(sheet['columns'] if sheet else 0, at_least, 1)
+
+    def rows_range(self, spreadsheet_id, sheet_name, first_row, at_least=0):
+        """A1 range of every column from first_row to the end of the sheet."""
+        last_column = column_letters(self.columns(spreadsheet_id, sheet_name, at_least) - 1)
+        return f"{quote_sheet_name(sheet_name)}!A{first_row}:{last_column}"
+
+    def ensure_columns(self, spreadsheet_id, sheet_name, count):
+        """Append columns to the sheet's grid until it has at least `count`."""
+        sheet = self._grid(spreadsheet_id).get(sheet_name)
+        if sheet is None or sheet['columns'] >= count:
+            return
+        # The cached size may be old, so check again before growing the grid
+        sheet = self._grid(spreadsheet_id, refresh=True).get(sheet_name)
+        if sheet is None or sheet['columns'] >= count:
+            return
+        added = count - sheet['columns']
+        self._source.append_columns(spreadsheet_id, sheet['sheet_id'], added)
+        print(f"Added {added} columns to {sheet_name}")
+        with self._lock:
+            sheet['columns'] = count
+            self.columns_added += added
+
+    def invalidate(self, spreadsheet_id=None):
+        with self._lock:
+            if spreadsheet_id is None:
+                self._grids.clear()
+            else:
+                self._grids.pop(spreadsheet_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'spreadsheets': len(self._grids),
+                'loads': self.loads,
+                'columns_added': self.columns_added
+            }
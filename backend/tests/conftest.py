@@ -0,0 +1,95 @@
+import os
+from datetime import datetime, timedelta
+
+# Distinct spreadsheets for the three sheets; set before app reads its configuration
+os.environ['GOOGLE_SHEET_ID_MAPPING'] = 'mapping-sheet'
+os.environ['GOOGLE_SHEET_ID_QUESTIONS'] = 'questions-sheet'
+os.environ['GOOGLE_SHEET_ID_RESPONSES'] = 'responses-sheet'
+os.environ['MAPPING_SHEET_NAME'] = 'Sheet1'
+os.environ['QUESTIONS_SHEET_NAME'] = 'Sheet1'
+os.environ['RESPONSES_SHEET_NAME'] = 'Form Responses 1'
+
+import pytest
+
+import app as feedback_app
+from storage import MemoryStorage, quote_sheet_name
+
+MAPPING = [
+    ['Email', 'Name', 'POC', 'Manager', 'Account manager', 'Process', 'Client', 'Ldap'],
+    ['user@example.com', 'User', 'poc@example.com', 'manager@example.com', 'am@example.com', 'Ops', 'Acme', 'user']
+]
+QUESTIONS = [
+    ['Question', 'Type'],
+    ['The leader communicates clearly', 'rating']
+]
+
+
+def days_ago(days):
+    return (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+RESPONSES = [
+    ['Timestamp', 'Encrypted Submitter ID', 'Management Email ID', 'Role Reviewed', 'Process',
+     'The leader communicates clearly'],
+    [days_ago(10), 'submitter-1', 'poc@example.com', 'POC', 'Ops', 'Agree'],
+    [days_ago(9), 'submitter-2', 'manager@example.com', 'Manager', 'Ops', 'Neutral']
+]
+
+
+def submission(target='poc@example.com', submitter='submitter-9', answer='Agree'):
+    """A form submission for one of the mapped leaders."""
+    return {
+        'Timestamp': days_ago(1),
+        'Encrypted Submitter ID': submitter,
+        'Management Email ID': target,
+        'Role Reviewed': 'POC',
+        'Process': 'Ops',
+        'The leader communicates clearly': answer
+    }
+
+
+def sheet_range(name, cells=''):
+    """A1 range of a named sheet of the app, e.g. sheet_range('responses', 'A2')."""
+    _, sheet_name = feedback_app.NAMED_SHEETS[name]
+    return quote_sheet_name(sheet_name) + (f"!{cells}" if cells else '')
+
+
+def read_sheet(sheets, name):
+    spreadsheet_id, sheet_name = feedback_app.NAMED_SHEETS[name]
+    return sheets.read_sheet(spreadsheet_id, sheet_name)
+
+
+def write_sheet(sheets, name, cells, rows):
+    spreadsheet_id, _ = feedback_app.NAMED_SHEETS[name]
+    sheets.update_range(spreadsheet_id, sheet_range(name, cells), rows)
+
+
+@pytest.fixture
+def sheets():
+    storage = MemoryStorage()
+    write_sheet(storage, 'mapping', 'A1', MAPPING)
+    write_sheet(storage, 'questions', 'A1', QUESTIONS)
+    write_sheet(storage, 'responses', 'A1', RESPONSES)
+    return storage
+
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    """Point every local file at tmp_path and write submissions straight to the sheet."""
+    monkeypatch.setattr(feedback_app, 'FEEDBACK_JOURNAL_PATH', str(tmp_path / 'journal.jsonl'))
+    monkeypatch.setattr(feedback_app, 'IDEMPOTENCY_STORE_PATH', str(tmp_path / 'idempotency.jsonl'))
+    monkeypatch.setattr(feedback_app, 'ANSWER_STORE_PATH', str(tmp_path / 'answers.db'))
+    monkeypatch.setattr(feedback_app, 'FEEDBACK_WRITE_BEHIND', False)
+    monkeypatch.setattr(feedback_app, 'FEEDBACK_FLUSH_INTERVAL', 3600)
+    monkeypatch.setattr(feedback_app, 'ANSWER_STORE', False)
+    return monkeypatch
+
+
+@pytest.fixture
+def app(settings, sheets):
+    return feedback_app.create_app(sheets, background_workers=False)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,34 @@
+import app as feedback_app
+from conftest import write_sheet
+
+
+def answers(client):
+    body = client.get('/api/responses').get_json()
+    return [row['The leader communicates clearly'] for row in body['data']]
+
+
+def test_invalidate_rebuilds_answer_store(settings, sheets):
+    settings.setattr(feedback_app, 'ANSWER_STORE', True)
+    client = feedback_app.create_app(sheets, background_workers=False).test_client()
+    answers(client)
+    write_sheet(sheets, 'responses', 'F2', [['Disagree']])
+    client.post('/api/cache/invalidate', json={'sheet': 'responses'})
+
+    assert answers(client) == ['Disagree', 'Neutral']
+    summary = client.get('/api/answers/summary?group_by=question').get_json()
+    counts = summary['data'][0]['counts']
+    assert counts == [0, 1, 1, 0, 0]
+
+
+def test_summary_counts_answers_per_group(settings, sheets):
+    settings.setattr(feedback_app, 'ANSWER_STORE', True)
+    client = feedback_app.create_app(sheets, background_workers=False).test_client()
+    answers(client)
+
+    by_role = client.get('/api/answers/summary?group_by=role').get_json()['data']
+    assert [(group['key'], group['counts'], group['average']) for group in by_role] == [
+        ('Manager', [0, 0, 1, 0, 0], 3.0),
+        ('POC', [0, 0, 0, 1, 0], 4.0)
+    ]
+    one_leader = client.get('/api/answers/summary?group_by=role&management_email=POC@example.com').get_json()['data']
+    assert [(group['key'], group['submissions'], group['answers']) for group in one_leader] == [('POC', 1, 1)]
@@ -0,0 +1,66 @@
+import app as feedback_app
+from conftest import submission
+
+
+def test_bootstrap_does_not_need_the_responses_sheet(client, sheets, monkeypatch):
+    read_range = sheets.read_range
+
+    def responses_unavailable(spreadsheet_id, range_name):
+        if spreadsheet_id == feedback_app.GOOGLE_SHEET_ID_RESPONSES:
+            raise ConnectionError('responses unavailable')
+        return read_range(spreadsheet_id, range_name)
+    monkeypatch.setattr(sheets, 'read_range', responses_unavailable)
+    monkeypatch.setattr(sheets, 'read_ranges', lambda spreadsheet_id, ranges: [
+        responses_unavailable(spreadsheet_id, range_name) for range_name in ranges
+    ])
+
+    response = client.get('/api/bootstrap?email=user@example.com')
+    assert response.status_code == 200
+    assert response.get_json()['stale'] is False
+
+
+def targets_by_email(body):
+    return {target['email']: target for group in body['targets'].values() for target in group}
+
+
+def test_bootstrap_loads_the_form_in_one_request(client):
+    body = client.get('/api/bootstrap?email=user@example.com').get_json()
+
+    assert body['success'] is True
+    assert body['user_found'] is True
+    assert body['user']['email'] == 'user@example.com'
+    assert body['user']['ldap'] == 'user'
+    assert [question['question_text'] for question in body['questions']] == ['The leader communicates clearly']
+    assert sorted(targets_by_email(body)) == ['am@example.com', 'manager@example.com', 'poc@example.com']
+    assert body['cooldown_days'] == feedback_app.FEEDBACK_COOLDOWN_DAYS
+
+
+def test_bootstrap_marks_targets_in_cooldown(client):
+    submitted = submission(submitter=feedback_app.encrypt_submitter_id('user@example.com'))
+    assert client.post('/api/submit-feedback', json=submitted).status_code == 200
+
+    targets = targets_by_email(client.get('/api/bootstrap?email=user@example.com').get_json())
+    assert targets['poc@example.com']['status'] == 'BLOCKED'
+    assert targets['poc@example.com']['cooldown_ends']
+    assert targets['manager@example.com']['status'] == 'ALLOWED'
+
+
+def test_bootstrap_by_ldap_uses_the_mapped_email(client):
+    submitted = submission(submitter=feedback_app.encrypt_submitter_id('user@example.com'))
+    assert client.post('/api/submit-feedback', json=submitted).status_code == 200
+
+    body = client.get('/api/bootstrap?email=USER').get_json()
+    assert body['user']['email'] == 'user@example.com'
+    assert targets_by_email(body)['poc@example.com']['status'] == 'BLOCKED'
+
+
+def test_unknown_user_is_offered_every_leader_once(client):
+    body = client.get('/api/bootstrap?email=someone@example.com').get_json()
+
+    assert body['user_found'] is False
+    assert body['user'] == {'email': 'someone@example.com', 'name': 'Someone', 'process': 'General'}
+    assert len(targets_by_email(body)) == sum(len(group) for group in body['targets'].values()) == 3
+
+
+def test_bootstrap_requires_an_email(client):
+    assert client.get('/api/bootstrap').status_code == 400
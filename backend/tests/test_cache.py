@@ -0,0 +1,146 @@
+import threading
+import time
+
+import pytest
+
+from cache import DerivedView, SheetCache, SingleFlight
+
+
+def test_single_flight_collapses_concurrent_calls():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'values'
+
+    def call():
+        results.append(flight.do('key', load))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=call) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    while flight.stats()['coalesced'] < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ['values'] * 5
+    assert flight.stats() == {'issued': 1, 'coalesced': 4, 'in_flight': 0}
+
+
+def test_single_flight_shares_errors_and_forgets_them():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError('upstream down')
+
+    with pytest.raises(RuntimeError):
+        flight.do('key', fail)
+    assert flight.do('key', lambda: 'recovered') == 'recovered'
+
+
+class Source:
+    def __init__(self):
+        self.values = [['a']]
+        self.error = None
+        self.reads = []
+
+    def load(self, spreadsheet_id, range_name):
+        self.reads.append(range_name)
+        if self.error:
+            raise self.error
+        return [list(row) for row in self.values]
+
+    def load_many(self, keys):
+        return {key: self.load(*key) for key in keys}
+
+
+@pytest.fixture
+def source():
+    return Source()
+
+
+def test_fresh_entries_are_served_without_reloading(source):
+    cache = SheetCache(source.load, source.load_many, default_ttl=60, max_stale=60)
+    first = cache.get_entry('sheet', 'Data!A:Z')
+    second = cache.get_entry('sheet', 'Data!A:Z')
+
+    assert second is first
+    assert source.reads == ['Data!A:Z']
+    assert cache.stats()['hits'] == 1
+
+
+def test_version_changes_only_with_values(source):
+    cache = SheetCache(source.load, source.load_many, default_ttl=0, max_stale=0)
+    first = cache.get_entry('sheet', 'Data').version
+    assert cache.get_entry('sheet', 'Data').version == first
+    source.values = [['b']]
+    assert cache.get_entry('sheet', 'Data').version != first
+
+
+def test_failed_reload_serves_last_good_copy(source):
+    cache = SheetCache(source.load, source.load_many, default_ttl=0, max_stale=0)
+    cache.get_entry('sheet', 'Data')
+    source.error = ConnectionError('no route')
+
+    entry = cache.get_entry('sheet', 'Data')
+    assert entry.values == [['a']]
+    assert entry.error == 'no route'
+    assert cache.stats()['stale_served'] == 1
+
+    source.error = None
+    assert cache.get_entry('sheet', 'Data').error is None
+
+
+def test_failed_first_load_raises(source):
+    cache = SheetCache(source.load, source.load_many, default_ttl=60, max_stale=60)
+    source.error = ConnectionError('no route')
+    with pytest.raises(ConnectionError):
+        cache.get_entry('sheet', 'Data')
+
+
+def test_ttl_is_configured_per_sheet(source):
+    cache = SheetCache(source.load, source.load_many, default_ttl=5, max_stale=0)
+    cache.configure('sheet', 'Form Responses 1', 30)
+
+    assert cache.ttl_for('sheet', "'Form Responses 1'!A2:Z") == 30
+    assert cache.ttl_for('sheet', 'Other!A:Z') == 5
+
+
+def test_invalidate_matches_quoted_sheet_names(source):
+    cache = SheetCache(source.load, source.load_many, default_ttl=60, max_stale=60)
+    cache.get_many([('sheet', "'Form Responses 1'!A:Z"), ('sheet', 'Other!A:Z')])
+
+    assert cache.invalidate('sheet', 'Form Responses 1') == 1
+    cache.get_entry('sheet', 'Other!A:Z')
+    assert source.reads == ["'Form Responses 1'!A:Z", 'Other!A:Z']
+
+
+def test_source_status_marks_mirror_reads(source):
+    cache = SheetCache(source.load, source.load_many, default_ttl=60, max_stale=60,
+                       source_status=lambda spreadsheet_id, range_name: (100.0, 'sync failed'))
+    entry = cache.get_entry('sheet', 'Data')
+    assert (entry.synced_at, entry.error) == (100.0, 'sync failed')
+
+
+def test_derived_view_rebuilds_on_version_change(source):
+    cache = SheetCache(source.load, source.load_many, default_ttl=0, max_stale=0)
+    builds = []
+    view = DerivedView(lambda values: builds.append(values) or len(values))
+
+    assert view.get(cache.get_entry('sheet', 'Data')) == 1
+    assert view.get(cache.get_entry('sheet', 'Data')) == 1
+    source.values = [['a'], ['b']]
+    assert view.get(cache.get_entry('sheet', 'Data')) == 2
+    assert len(builds) == 2
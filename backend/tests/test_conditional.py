@@ -0,0 +1,68 @@
+import gzip
+
+import app as feedback_app
+from conftest import submission, write_sheet
+
+
+def test_unchanged_read_is_not_modified(client):
+    first = client.get('/api/questions')
+    etag = first.headers['ETag']
+    assert first.status_code == 200
+    assert not etag.startswith('W/')
+    assert {'Accept', 'Accept-Encoding'} <= set(first.vary)
+
+    again = client.get('/api/questions', headers={'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.get_data() == b''
+    assert again.headers['ETag'] == etag
+    assert {'Accept', 'Accept-Encoding'} <= set(again.vary)
+
+
+def test_etag_follows_the_sheet_and_the_query(client, sheets):
+    etag = client.get('/api/questions').headers['ETag']
+    write_sheet(sheets, 'questions', 'A2', [['Rewritten question']])
+    client.post('/api/cache/invalidate', json={'sheet': 'questions'})
+
+    changed = client.get('/api/questions', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+    everyone = client.get('/api/mapping').headers['ETag']
+    assert client.get('/api/mapping', query_string={'email': 'user@example.com'}).headers['ETag'] != everyone
+
+
+def test_new_response_changes_the_etag(client):
+    etag = client.get('/api/responses').headers['ETag']
+    client.post('/api/submit-feedback', json=submission())
+
+    response = client.get('/api/responses', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['count'] == 3
+
+
+def test_large_bodies_are_compressed(client, settings):
+    settings.setattr(feedback_app, 'COMPRESS_MIN_BYTES', 1)
+    plain = client.get('/api/responses')
+    compressed = client.get('/api/responses', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in plain.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(compressed.get_data()) == plain.get_data()
+    # The coding is part of the representation, so each gets its own ETag
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+
+
+def test_stale_copy_gets_no_etag(client, sheets, settings):
+    client.get('/api/questions')
+    feedback_app.sheet_cache.get_entry(feedback_app.GOOGLE_SHEET_ID_QUESTIONS,
+                                       feedback_app.QUESTIONS_RANGE).fetched_at = 0
+
+    def unavailable(*args):
+        raise ConnectionError('Sheets unavailable')
+    for method in ('read_range', 'read_ranges', 'read_sheet'):
+        settings.setattr(sheets, method, unavailable)
+
+    response = client.get('/api/questions')
+    assert response.status_code == 200
+    assert response.get_json()['stale'] is True
+    assert 'ETag' not in response.headers
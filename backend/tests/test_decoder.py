@@ -0,0 +1,61 @@
+import json
+
+import app as feedback_app
+from app import RowDecoder, row_decoder, row_dicts
+from conftest import RESPONSES, submission
+
+
+def test_rows_are_padded_and_cut_to_the_header():
+    decoder = RowDecoder(['a', 'b', 'c'])
+    short, exact, long = decoder.decode_all([['1'], ['1', '2', '3'], ['1', '2', '3', '4']])
+
+    assert short == ('1', '', '')
+    assert exact == ('1', '2', '3')
+    assert long == ('1', '2', '3')
+    assert short.get('a') == '1' and short.get('c') == '' and short.get('missing', 'x') == 'x'
+    assert short.to_dict() == {'a': '1', 'b': '', 'c': ''}
+
+
+def test_duplicate_headers_keep_the_last_cell_like_a_dict():
+    row, = RowDecoder(['a', 'b', 'a']).decode_all([['1', '2', '3']])
+    assert row.get('a') == '3'
+    assert row_dicts([row]) == [dict(zip(['a', 'b', 'a'], ['1', '2', '3']))]
+
+
+def test_decoders_are_shared_per_header():
+    assert row_decoder(['a', 'b']) is row_decoder(('a', 'b'))
+    assert row_decoder(['a', 'b']) is not row_decoder(['b', 'a'])
+
+
+def test_encoded_rows_match_jsonify():
+    headers = ['Zeta', 'alpha', 'Comment', 'alpha', 'Ünïcode']
+    decoder = RowDecoder(headers)
+    rows = decoder.decode_all([
+        ['1', '2', 'She said "hi" \\ bye\n', '4', 'naïve ✓'],
+        ['only'],
+    ])
+
+    assert decoder.encode_json(rows) == [
+        json.dumps(row.to_dict(), sort_keys=True, separators=(',', ':')) for row in rows
+    ]
+
+
+def test_cells_that_are_not_strings_are_encoded_too():
+    decoder = RowDecoder(['a', 'b'])
+    assert decoder.encode_json([('1', 2)]) == ['{"a":"1","b":2}']
+
+
+def test_responses_body_matches_the_rows(client):
+    body = client.get('/api/responses').get_json()
+    assert body['data'] == [dict(zip(RESPONSES[0], row)) for row in RESPONSES[1:]]
+    assert body['format'] == 'records'
+
+
+def test_appended_rows_are_encoded_once(client):
+    client.get('/api/responses')
+    assert feedback_app.response_records.rows_encoded == 2
+
+    client.post('/api/submit-feedback', json=submission())
+    body = client.get('/api/responses').get_json()
+    assert [row['Encrypted Submitter ID'] for row in body['data']] == ['submitter-1', 'submitter-2', 'submitter-9']
+    assert feedback_app.response_records.rows_encoded == 3
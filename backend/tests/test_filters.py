@@ -0,0 +1,131 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app import months_before, parse_leading_number, parse_tenure, tenure_bucket, time_period_start
+from conftest import days_ago, write_sheet
+
+HEADERS = ['Timestamp', 'Encrypted Submitter ID', 'Management Email ID', 'Role Reviewed', 'Process',
+           'Tenure', 'Rating']
+ROWS = [
+    [days_ago(0), 's-1', 'poc@example.com', 'POC', 'Ops', '6 months', '4'],
+    [days_ago(3), 's-2', 'manager@example.com', 'Manager', 'Ops', '2 years', '3.5 / 5'],
+    [days_ago(20), 's-3', 'poc@example.com', 'POC', 'Sales', '4 yrs', '4'],
+    [days_ago(40), 's-4', 'am@example.com', 'Account manager', 'Sales', '7', ''],
+    ['', 's-5', 'poc@example.com', 'POC', 'Ops', '', '2'],
+    ['not a date', 's-6', 'am@example.com', 'Account manager', 'Ops', 'unknown', '5'],
+]
+
+
+@pytest.fixture
+def client(client, sheets):
+    write_sheet(sheets, 'responses', 'A1', [HEADERS] + ROWS)
+    return client
+
+
+def fetch(client, **params):
+    response = client.get('/api/responses', query_string=params)
+    return response.status_code, response.get_json()
+
+
+def submitters(client, **params):
+    status, body = fetch(client, **params)
+    assert status == 200, body
+    return [row['Encrypted Submitter ID'] for row in body['data']]
+
+
+@pytest.mark.parametrize('text, number', [
+    ('4', 4.0), ('3.5 / 5', 3.5), ('  -2x', -2.0), ('.5', 0.5), ('1e2 points', 100.0), ('abc', None), ('', None), (None, None)
+])
+def test_parse_leading_number_reads_like_parse_float(text, number):
+    assert parse_leading_number(text) == number
+
+
+@pytest.mark.parametrize('text, years, bucket', [
+    ('6 months', 6.0, '5+'), ('0.5 years', 0.5, '0-1'), ('1', 1.0, '1-3'), ('4.9 yrs', 4.9, '3-5'),
+    ('5', 5.0, '5+'), ('unknown', None, 'unknown'), ('', None, 'unknown')
+])
+def test_tenure_reads_only_digits_and_dots(text, years, bucket):
+    assert parse_tenure(text) == years
+    assert tenure_bucket(years) == bucket
+
+
+def test_months_before_clamps_to_the_end_of_the_month():
+    assert months_before(datetime(2026, 3, 31), 1) == datetime(2026, 2, 28)
+    assert months_before(datetime(2024, 3, 31), 1) == datetime(2024, 2, 29)
+    assert months_before(datetime(2026, 1, 15), 3) == datetime(2025, 10, 15)
+    assert months_before(datetime(2026, 12, 31), 12) == datetime(2025, 12, 31)
+
+
+def test_time_periods_start_at_local_midnight():
+    now = datetime(2026, 5, 20, 15, 30, tzinfo=timezone.utc)
+    starts = {period: time_period_start(period, now).date().isoformat()
+              for period in ('today', 'week', 'month', 'quarter', 'year')}
+    assert starts == {'today': '2026-05-20', 'week': '2026-05-13', 'month': '2026-04-20',
+                      'quarter': '2026-02-20', 'year': '2025-05-20'}
+
+
+def test_column_filters_match_exactly(client):
+    assert submitters(client, role='POC') == ['s-1', 's-3', 's-5']
+    assert submitters(client, role='POC', process='Ops') == ['s-1', 's-5']
+    assert submitters(client, management_email='POC@example.com') == []
+
+
+def test_tenure_and_rating_filters(client):
+    assert submitters(client, tenure='5+') == ['s-1', 's-4']
+    assert submitters(client, tenure='1-3') == ['s-2']
+    assert submitters(client, tenure='unknown') == ['s-5', 's-6']
+    assert submitters(client, rating='4') == ['s-1', 's-3']
+    assert submitters(client, rating='3.5') == ['s-2']
+
+
+def test_time_period_filter_keeps_rows_without_a_readable_timestamp(client):
+    assert submitters(client, time_period='today') == ['s-1', 's-5']
+    assert submitters(client, time_period='week') == ['s-1', 's-2', 's-5', 's-6']
+    assert submitters(client, time_period='month') == ['s-1', 's-2', 's-3', 's-5', 's-6']
+
+
+@pytest.mark.parametrize('params', [
+    {'tenure': '2-4'}, {'time_period': 'decade'}, {'rating': 'good'}, {'limit': '0'}, {'limit': '100000'},
+    {'offset': '-1'}, {'fields': 'Timestamp,Nope'}, {'format': 'xml'}
+])
+def test_invalid_parameters_are_rejected(client, params):
+    status, body = fetch(client, **params)
+    assert status == 400
+    assert body['success'] is False
+
+
+def test_fields_project_each_row(client):
+    status, body = fetch(client, fields='Rating, Process', role='Manager')
+    assert body['headers'] == ['Rating', 'Process']
+    assert body['data'] == [{'Rating': '3.5 / 5', 'Process': 'Ops'}]
+
+
+def test_pages_follow_the_filtered_rows(client):
+    status, first = fetch(client, process='Ops', limit=2)
+    assert [row['Encrypted Submitter ID'] for row in first['data']] == ['s-1', 's-2']
+    assert (first['count'], first['total'], first['sheet_total']) == (2, 4, 6)
+
+    status, second = fetch(client, process='Ops', limit=2, after=first['next_after'])
+    assert [row['Encrypted Submitter ID'] for row in second['data']] == ['s-5', 's-6']
+    assert second['next_after'] is None
+
+    assert submitters(client, process='Ops', limit=2, offset=1) == ['s-2', 's-5']
+
+
+def test_stale_page_token_is_rejected(client):
+    status, first = fetch(client, limit=2)
+    client.post('/api/cache/invalidate', json={'sheet': 'responses'})
+    status, body = fetch(client, limit=2, after=first['next_after'])
+    assert status == 409
+
+
+def test_rows_and_columnar_formats(client):
+    status, rows = fetch(client, format='rows', fields='Encrypted Submitter ID,Process', limit=2)
+    assert rows['format'] == 'rows'
+    assert rows['data'] == [['s-1', 'Ops'], ['s-2', 'Ops']]
+
+    status, columnar = fetch(client, format='columnar', fields='Process,Encrypted Submitter ID')
+    process, submitter = columnar['data']
+    assert [process['dictionary'][code] for code in process['codes']] == ['Ops', 'Ops', 'Sales', 'Sales', 'Ops', 'Ops']
+    assert submitter['values'] == ['s-1', 's-2', 's-3', 's-4', 's-5', 's-6']
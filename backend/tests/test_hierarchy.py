@@ -0,0 +1,75 @@
+import pytest
+
+from conftest import write_sheet
+
+# am -> manager -> lead -> a, b; a is also am's manager, closing a cycle
+MAPPING = [
+    ['Email', 'Name', 'POC', 'Manager', 'Account manager', 'Process', 'Client', 'Ldap'],
+    ['manager@example.com', 'Manager', '', '', 'am@example.com', 'Ops', 'Acme', 'manager'],
+    ['lead@example.com', 'Lead', '', 'manager@example.com', 'am@example.com', 'Ops', 'Acme', 'lead'],
+    ['a@example.com', 'A', 'lead@example.com', 'manager@example.com', '', 'Sales', 'Beta', 'a'],
+    ['b@example.com', 'B', 'LEAD@example.com', '', '', 'Ops', '', 'b'],
+    ['am@example.com', 'Am', '', 'a@example.com', '', 'Sales', 'Beta', 'am'],
+    ['other@example.com', 'Other', 'elsewhere@example.com', '', '', 'Ops', 'Acme', 'other'],
+]
+
+
+@pytest.fixture
+def client(client, sheets):
+    write_sheet(sheets, 'mapping', 'A1', MAPPING)
+    return client
+
+
+def emails(client, path, **params):
+    response = client.get(f'/api/hierarchy/{path}', query_string=params)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == len(body['data'])
+    return [row['Email'] for row in body['data']]
+
+
+def test_subtree_walks_every_level_breadth_first(client):
+    assert emails(client, 'subtree', leader='am@example.com') == [
+        'manager@example.com', 'lead@example.com', 'a@example.com', 'b@example.com', 'am@example.com'
+    ]
+
+
+def test_subtree_ignores_case_and_ends_on_cycles(client):
+    # Through a back to am and up again, each row once
+    assert emails(client, 'subtree', leader='LEAD@EXAMPLE.COM') == [
+        'a@example.com', 'b@example.com', 'am@example.com', 'manager@example.com', 'lead@example.com'
+    ]
+    assert emails(client, 'subtree', leader='b@example.com') == []
+
+
+def test_direct_reports_by_role(client):
+    assert emails(client, 'reports', leader='lead@example.com') == ['a@example.com', 'b@example.com']
+    assert emails(client, 'reports', leader='manager@example.com', role='Manager') == [
+        'lead@example.com', 'a@example.com'
+    ]
+    assert emails(client, 'reports', leader='manager@example.com', role='POC') == []
+    assert emails(client, 'account-manager', email='am@example.com') == ['manager@example.com', 'lead@example.com']
+
+
+def test_groups(client):
+    counts = client.get('/api/hierarchy/groups').get_json()['data']
+    assert counts == {'Ops': 4, 'Sales': 2}
+    assert client.get('/api/hierarchy/groups', query_string={'by': 'Client'}).get_json()['data'] == {'Acme': 3, 'Beta': 2}
+    assert emails(client, 'groups', by='Process', value='Sales') == ['a@example.com', 'am@example.com']
+
+
+@pytest.mark.parametrize('path, params', [
+    ('subtree', {}), ('reports', {}), ('reports', {'leader': 'lead@example.com', 'role': 'CEO'}),
+    ('account-manager', {}), ('groups', {'by': 'Name'})
+])
+def test_invalid_hierarchy_requests(client, path, params):
+    response = client.get(f'/api/hierarchy/{path}', query_string=params)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_subtree_follows_mapping_edits(client, sheets):
+    assert emails(client, 'subtree', leader='b@example.com') == []
+    write_sheet(sheets, 'mapping', 'C7', [['b@example.com']])
+    client.post('/api/cache/invalidate', json={'sheet': 'mapping'})
+    assert emails(client, 'subtree', leader='b@example.com') == ['other@example.com']
@@ -0,0 +1,130 @@
+import json
+
+import pytest
+
+import app as feedback_app
+from conftest import read_sheet, submission
+from storage import SheetMirror
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return feedback_app.FeedbackJournal(str(tmp_path / 'journal.jsonl'))
+
+
+def test_journal_replays_unflushed_submissions(journal, tmp_path):
+    journal.open()
+    flushed, pending = journal.add_many([submission(), submission(target='am@example.com')])
+    journal.mark_flushing([flushed])
+    journal.mark_flushed([flushed])
+
+    reopened = feedback_app.FeedbackJournal(str(tmp_path / 'journal.jsonl'))
+    reopened.open()
+    assert [record['id'] for record in reopened.pending_records()] == [pending]
+    assert reopened.stats() == {'pending': 1, 'in_doubt': 0}
+
+
+def test_journal_ignores_torn_last_line(journal, tmp_path):
+    journal.open()
+    submission_id = journal.add(submission())
+    with open(tmp_path / 'journal.jsonl', 'a', encoding='utf-8') as torn:
+        torn.write('{"op": "submit", "id": ')
+
+    reopened = feedback_app.FeedbackJournal(str(tmp_path / 'journal.jsonl'))
+    reopened.open()
+    assert [record['id'] for record in reopened.pending_records()] == [submission_id]
+
+
+def test_journal_keeps_in_doubt_submissions(journal, tmp_path):
+    journal.open()
+    submission_id = journal.add(submission())
+    journal.mark_flushing([submission_id])
+
+    reopened = feedback_app.FeedbackJournal(str(tmp_path / 'journal.jsonl'))
+    reopened.open()
+    assert reopened.in_doubt == {submission_id}
+    with open(tmp_path / 'journal.jsonl', encoding='utf-8') as compacted:
+        ops = [json.loads(line)['op'] for line in compacted]
+    assert ops == ['submit', 'flushing']
+
+
+def make_flusher(journal):
+    return feedback_app.FeedbackFlusher(journal, interval=3600, batch_size=10, max_backoff=1)
+
+
+def test_flusher_writes_replayed_submissions(app, journal, tmp_path, sheets):
+    journal.open()
+    journal.add(submission())
+    reopened = feedback_app.FeedbackJournal(str(tmp_path / 'journal.jsonl'))
+    reopened.open()
+    flusher = make_flusher(reopened)
+
+    assert flusher.flush_once() is True
+    assert flusher.flush_once() is False
+    assert read_sheet(sheets, 'responses')[-1][1] == 'submitter-9'
+    assert flusher.stats()['pending'] == 0
+
+
+def test_flusher_skips_in_doubt_submission_already_in_sheet(app, journal, tmp_path, sheets):
+    journal.open()
+    submission_id = journal.add(submission())
+    journal.mark_flushing([submission_id])
+    # The append reached the sheet, but the process died before `flushed`
+    feedback_app.append_response_rows(feedback_app.prepare_response_rows([submission()])[1])
+
+    reopened = feedback_app.FeedbackJournal(str(tmp_path / 'journal.jsonl'))
+    reopened.open()
+    flusher = make_flusher(reopened)
+    while flusher.flush_once():
+        pass
+
+    assert len(read_sheet(sheets, 'responses')) == 4
+    assert flusher.stats()['duplicates_skipped'] == 1
+    assert flusher.stats()['pending'] == 0
+
+
+
+def test_flusher_checks_sheets_not_the_mirror_for_in_doubt_submissions(app, journal, tmp_path, sheets, settings):
+    mirror = SheetMirror(
+        str(tmp_path / 'mirror.db'), sheets, feedback_app.sheet_grid,
+        {'responses': feedback_app.NAMED_SHEETS['responses'] + (True,)},
+        interval=3600, full_sync_every=20, max_lag=300, on_change=feedback_app.mirror_changed
+    )
+    mirror.sync_all()
+    settings.setattr(feedback_app, 'sheet_mirror', mirror)
+    journal.open()
+    journal.mark_flushing([journal.add(submission())])
+    # The append reached Sheets, but neither the mirror nor the journal saw it
+    _, rows = feedback_app.prepare_response_rows([submission()])
+    sheets.append_rows(feedback_app.GOOGLE_SHEET_ID_RESPONSES, feedback_app.RESPONSES_RANGE, rows)
+
+    reopened = feedback_app.FeedbackJournal(str(tmp_path / 'journal.jsonl'))
+    reopened.open()
+    flusher = make_flusher(reopened)
+    while flusher.flush_once():
+        pass
+
+    assert len(read_sheet(sheets, 'responses')) == 4
+    assert flusher.stats()['duplicates_skipped'] == 1
+
+def test_flusher_rewrites_in_doubt_submission_missing_from_sheet(app, journal, tmp_path, sheets):
+    journal.open()
+    journal.mark_flushing([journal.add(submission())])
+
+    reopened = feedback_app.FeedbackJournal(str(tmp_path / 'journal.jsonl'))
+    reopened.open()
+    flusher = make_flusher(reopened)
+    while flusher.flush_once():
+        pass
+
+    assert len(read_sheet(sheets, 'responses')) == 4
+    assert flusher.stats()['duplicates_skipped'] == 0
+
+
+def test_write_behind_submission_counts_for_cooldown(settings, sheets):
+    settings.setattr(feedback_app, 'FEEDBACK_WRITE_BEHIND', True)
+    client = feedback_app.create_app(sheets, background_workers=False).test_client()
+
+    response = client.post('/api/submit-feedback', json=submission())
+    assert response.get_json()['queued'] is True
+    assert client.post('/api/submit-feedback', json=submission()).status_code == 409
@@ -0,0 +1,114 @@
+import pytest
+
+from storage import MemoryStorage, SheetGrid, SheetMirror
+
+RESPONSES = ('responses-sheet', 'Form Responses 1')
+QUESTIONS = ('questions-sheet', 'Sheet1')
+
+
+@pytest.fixture
+def source():
+    storage = MemoryStorage()
+    storage.update_range(RESPONSES[0], "'Form Responses 1'!A1", [
+        ['Timestamp', 'Management Email ID', 'Process', 'Encrypted Submitter ID'],
+        ['2026-01-05 10:00:00', 'poc@example.com', 'Ops', 'submitter-1']
+    ])
+    storage.update_range(QUESTIONS[0], 'Sheet1!A1', [['Question'], ['Clear?']])
+    return storage
+
+
+@pytest.fixture
+def changes():
+    return []
+
+
+def make_mirror(path, source, changes, max_lag=300, full_sync_every=10):
+    return SheetMirror(
+        str(path), source, SheetGrid(source, 300),
+        {'responses': RESPONSES + (True,), 'questions': QUESTIONS + (False,)},
+        interval=3600, full_sync_every=full_sync_every,
+        max_lag=max_lag, on_change=lambda *change: changes.append(change)
+    )
+
+
+@pytest.fixture
+def mirror(tmp_path, source, changes):
+    return make_mirror(tmp_path / 'mirror.db', source, changes)
+
+
+def test_reads_are_covered_once_synced(mirror, source):
+    assert not mirror.covers(*RESPONSES)
+    mirror.sync_all()
+
+    assert mirror.covers(RESPONSES[0], "'Form Responses 1'!A2:D")
+    assert mirror.read_sheet(*RESPONSES) == source.read_sheet(*RESPONSES)
+    assert mirror.read_sheet(*QUESTIONS) == [['Question'], ['Clear?']]
+    assert not mirror.covers('other-sheet', 'Sheet1')
+
+
+def test_appends_are_synced_incrementally(mirror, source, changes):
+    mirror.sync_all()
+    changes.clear()
+    full_syncs = mirror.full_syncs
+    source.append_rows(RESPONSES[0], "'Form Responses 1'!A1", [['2026-01-06 10:00:00', 'am@example.com', 'Ops', 's-2']])
+
+    assert mirror.sync_sheet(*RESPONSES) == 1
+    assert mirror.full_syncs == full_syncs
+    assert changes == [RESPONSES + (True,)]
+    assert mirror.read_sheet(*RESPONSES) == source.read_sheet(*RESPONSES)
+
+
+def test_edits_are_found_and_reported(mirror, source, changes):
+    mirror.sync_all()
+    changes.clear()
+    source.update_range(RESPONSES[0], "'Form Responses 1'!B2", [['manager@example.com']])
+    source.update_range(QUESTIONS[0], 'Sheet1!A2', [['Clearer?']])
+    mirror.sync_all()
+
+    assert changes == [RESPONSES + (False,), QUESTIONS + (False,)]
+    assert mirror.read_range(RESPONSES[0], "'Form Responses 1'!B2") == [['manager@example.com']]
+    assert mirror.read_sheet(*QUESTIONS) == [['Question'], ['Clearer?']]
+
+
+def test_unchanged_sheets_report_nothing(mirror, changes):
+    mirror.sync_all()
+    changes.clear()
+    mirror.sync_all()
+    assert changes == []
+
+
+def test_failing_sync_is_reported_until_it_recovers(mirror, source, monkeypatch):
+    mirror.sync_all()
+    synced_at, _ = mirror.status(*QUESTIONS)
+
+    def unavailable(*args):
+        raise ConnectionError('Sheets unavailable')
+    monkeypatch.setattr(source, 'read_sheet', unavailable)
+    mirror.sync_all('questions')
+
+    assert mirror.status(*QUESTIONS) == (synced_at, 'Sheets unavailable')
+    assert mirror.stats()['failing'] == {'questions': 'Sheets unavailable'}
+
+    monkeypatch.undo()
+    mirror.sync_all('questions')
+    assert mirror.status(*QUESTIONS)[1] is None
+    assert mirror.stats()['failing'] == {}
+
+
+def test_old_mirror_file_is_not_trusted(tmp_path, mirror, source, changes):
+    mirror.sync_all()
+
+    reopened = make_mirror(tmp_path / 'mirror.db', source, changes)
+    assert reopened.covers(*RESPONSES)
+    lagging = make_mirror(tmp_path / 'mirror.db', source, changes, max_lag=0)
+    assert not lagging.covers(*RESPONSES)
+
+
+def test_write_through_copies_accepted_rows(mirror, source):
+    mirror.sync_all()
+    rows = [['2026-01-07 10:00:00', 'am@example.com', 'Ops', 's-3']]
+    result = source.append_rows(RESPONSES[0], "'Form Responses 1'!A1", rows)
+    mirror.write_through(RESPONSES[0], result, rows)
+
+    assert mirror.read_sheet(*RESPONSES) == source.read_sheet(*RESPONSES)
+    assert mirror.stats()['rows_written_through'] == 1
@@ -0,0 +1,74 @@
+import app as feedback_app
+from conftest import sheet_range, submission, write_sheet
+
+
+def answers(client):
+    body = client.get('/api/responses').get_json()
+    return [row['The leader communicates clearly'] for row in body['data']]
+
+
+def test_invalidate_rereads_edited_rows(client, sheets):
+    assert answers(client) == ['Agree', 'Neutral']
+    write_sheet(sheets, 'responses', 'F2', [['Disagree']])
+
+    # An edit above the last row is invisible to the incremental refresh
+    feedback_app.sheet_cache.invalidate()
+    assert answers(client) == ['Agree', 'Neutral']
+
+    response = client.post('/api/cache/invalidate', json={'sheet': 'responses'})
+    assert response.status_code == 200
+    assert answers(client) == ['Disagree', 'Neutral']
+    assert feedback_app.responses_loader.stats()['generation'] == 2
+
+
+def test_invalidate_all_resets_loader(client, sheets):
+    answers(client)
+    write_sheet(sheets, 'responses', 'F2', [['Strongly Agree']])
+    client.post('/api/cache/invalidate')
+    assert answers(client) == ['Strongly Agree', 'Neutral']
+
+
+# Delta sync
+
+def submitters(body):
+    return [row['Encrypted Submitter ID'] for row in body['data']]
+
+
+def test_cursor_returns_only_rows_appended_after_it(client):
+    first = client.get('/api/responses').get_json()
+    assert first['reset'] is True
+    assert submitters(first) == ['submitter-1', 'submitter-2']
+
+    unchanged = client.get('/api/responses', query_string={'since': first['cursor']}).get_json()
+    assert (unchanged['reset'], unchanged['data'], unchanged['cursor']) == (False, [], first['cursor'])
+
+    client.post('/api/submit-feedback', json=submission())
+    delta = client.get('/api/responses', query_string={'since': first['cursor']}).get_json()
+    assert delta['reset'] is False
+    assert submitters(delta) == ['submitter-9']
+    assert delta['sheet_total'] == 3
+    assert delta['cursor'] != first['cursor']
+
+
+def test_cursor_from_before_a_full_reload_resets(client):
+    cursor = client.get('/api/responses').get_json()['cursor']
+    client.post('/api/cache/invalidate', json={'sheet': 'responses'})
+
+    body = client.get('/api/responses', query_string={'since': cursor}).get_json()
+    assert body['reset'] is True
+    assert submitters(body) == ['submitter-1', 'submitter-2']
+
+
+def test_unusable_cursors_reset(client):
+    cursor = client.get('/api/responses').get_json()['cursor']
+    epoch, generation, _ = cursor.split('.')
+    for since in ('garbage', f'{epoch}.{generation}.99', f'{epoch}.{generation}.-1', f'other.{generation}.1'):
+        body = client.get('/api/responses', query_string={'since': since}).get_json()
+        assert body['reset'] is True, since
+        assert len(body['data']) == 2
+
+
+def test_cursor_of_an_empty_sheet(client, sheets):
+    sheets.update_range(feedback_app.GOOGLE_SHEET_ID_RESPONSES, sheet_range('responses', 'A1'), [[''] * 6] * 3)
+    body = client.get('/api/responses').get_json()
+    assert (body['data'], body['reset'], body['total']) == ([], True, 0)
@@ -0,0 +1,133 @@
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+import scheduler
+from scheduler import CircuitBreaker, SheetsScheduler, SheetsUnavailableError
+
+
+def http_error(status):
+    return HttpError(httplib2.Response({'status': status}), b'')
+
+
+class Client:
+    """Stands in for SheetsClient; each call pops the next outcome."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def execute(self, request):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def make_scheduler(client, breaker_failures=5):
+    return SheetsScheduler(client, reads_per_minute=6000, writes_per_minute=6000, burst=100,
+                           max_retries=3, base_delay=0.001, max_delay=0.01,
+                           breaker_failures=breaker_failures, breaker_reset=30)
+
+
+def test_rate_limited_read_is_retried():
+    client = Client([http_error(429), http_error(503), {'values': []}])
+    gate = make_scheduler(client)
+
+    assert gate.execute('request', 'sheet') == {'values': []}
+    assert client.calls == 3
+    assert gate.stats()['retries'] == 2
+    assert gate.stats()['errors'] == {'429': 1, '503': 1}
+
+
+def test_bad_request_is_not_retried():
+    client = Client([http_error(400)])
+    gate = make_scheduler(client)
+
+    with pytest.raises(HttpError):
+        gate.execute('request', 'sheet')
+    assert client.calls == 1
+    assert gate.breaker_for('sheet').state == 'closed'
+
+
+def test_failed_write_is_retried_only_when_rate_limited():
+    client = Client([http_error(429), http_error(503)])
+    gate = make_scheduler(client)
+
+    with pytest.raises(HttpError):
+        gate.execute('request', 'sheet', kind='write')
+    assert client.calls == 2
+
+
+def test_retries_give_up():
+    client = Client([http_error(500)] * 4)
+    gate = make_scheduler(client)
+
+    with pytest.raises(HttpError):
+        gate.execute('request', 'sheet')
+    assert client.calls == 4
+    assert gate.stats()['gave_up'] == 1
+
+
+def test_open_breaker_fails_fast():
+    client = Client([http_error(503)] * 2)
+    gate = make_scheduler(client, breaker_failures=2)
+
+    with pytest.raises(SheetsUnavailableError) as raised:
+        gate.execute('request', 'sheet')
+    assert raised.value.spreadsheet_id == 'sheet'
+    assert client.calls == 2
+    assert gate.stats()['breakers']['sheet']['state'] == 'open'
+    # Other spreadsheets keep their own breaker
+    assert gate.breaker_for('other').state == 'closed'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler.time, 'monotonic', clock.monotonic)
+    return clock
+
+
+def test_breaker_probes_after_reset_timeout(clock):
+    breaker = CircuitBreaker('sheet', failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.allow()
+    breaker.record_failure()
+
+    with pytest.raises(SheetsUnavailableError) as raised:
+        breaker.allow()
+    assert raised.value.retry_after == 30
+
+    clock.now += 31
+    breaker.allow()
+    assert breaker.state == 'half_open'
+    # Only the probe goes through while it is in flight
+    with pytest.raises(SheetsUnavailableError):
+        breaker.allow()
+
+    breaker.record_success()
+    breaker.allow()
+    assert breaker.stats() == {'state': 'closed', 'consecutive_failures': 0, 'trips': 1, 'rejected': 2}
+
+
+def test_failed_probe_reopens_breaker(clock):
+    breaker = CircuitBreaker('sheet', failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 31
+    breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == 'open'
+    with pytest.raises(SheetsUnavailableError):
+        breaker.allow()
+    assert breaker.trips == 1
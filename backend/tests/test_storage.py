@@ -0,0 +1,75 @@
+import pytest
+
+from storage import MemoryStorage, SQLiteStorage, parse_a1_range, quote_sheet_name
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def storage(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryStorage()
+    return SQLiteStorage(str(tmp_path / 'sheets.db'))
+
+
+def test_append_follows_last_row(storage):
+    storage.update_range('sheet', 'Data!A1', [['Name', 'Score'], ['a', 1]])
+    result = storage.append_rows('sheet', 'Data!A:B', [['b', 2], ['c', 3]])
+
+    assert result['updates']['updatedRange'] == 'Data!A3:B4'
+    assert storage.read_sheet('sheet', 'Data') == [['Name', 'Score'], ['a', '1'], ['b', '2'], ['c', '3']]
+
+
+def test_read_range_trims_like_sheets(storage):
+    storage.update_range('sheet', 'Data!A1', [['a', 'b', ''], [], ['', 'c']])
+    storage.update_range('sheet', 'Data!A5', [['', '']])
+
+    assert storage.read_range('sheet', 'Data!A1:C') == [['a', 'b'], [], ['', 'c']]
+    assert storage.read_range('sheet', 'Data!B2:B3') == [[], ['c']]
+    assert storage.read_range('sheet', 'Data!10:12') == []
+
+
+def test_update_merges_into_existing_cells(storage):
+    storage.update_range('sheet', 'Data!A1', [['a', 'b', 'c']])
+    storage.update_range('sheet', 'Data!B1', [['x']])
+    storage.update_range('sheet', 'Data!E1', [['y']])
+
+    assert storage.read_sheet('sheet', 'Data') == [['a', 'x', 'c', '', 'y']]
+    assert storage.read_header('sheet', 'Data') == ['a', 'x', 'c', '', 'y']
+
+
+def test_sheets_are_separate(storage):
+    storage.update_range('sheet', "'Form Responses 1'!A1", [['one']])
+    storage.update_range('sheet', 'Data!A1', [['two']])
+    storage.update_range('other', "'Form Responses 1'!A1", [['three']])
+
+    assert storage.read_sheet('sheet', 'Form Responses 1') == [['one']]
+    assert storage.read_ranges('sheet', ["'Form Responses 1'!A1", 'Data!A1']) == [[['one']], [['two']]]
+    assert sorted(storage.read_grid('sheet')) == ['Data', 'Form Responses 1']
+
+
+def test_sqlite_storage_persists(tmp_path):
+    path = str(tmp_path / 'sheets.db')
+    SQLiteStorage(path).append_rows('sheet', 'Data!A1', [['kept']])
+    assert SQLiteStorage(path).read_sheet('sheet', 'Data') == [['kept']]
+
+
+@pytest.mark.parametrize('range_name, expected', [
+    ('Sheet1', ('Sheet1', 1, None, 0, None)),
+    ('Sheet1!A2:C', ('Sheet1', 2, None, 0, 2)),
+    ('Sheet1!5:7', ('Sheet1', 5, 7, 0, None)),
+    ('Sheet1!B3', ('Sheet1', 3, 3, 1, 1)),
+    ("'Form Responses 1'!A1:Z1", ('Form Responses 1', 1, 1, 0, 25)),
+    ("'Bob''s sheet'!AA10:AB", ("Bob's sheet", 10, None, 26, 27)),
+])
+def test_parse_a1_range(range_name, expected):
+    assert parse_a1_range(range_name) == expected
+
+
+@pytest.mark.parametrize('range_name', ['Sheet1!A:3', 'Sheet1!B2:A2', 'Sheet1!A3:A2', "'Unclosed!A1"])
+def test_parse_a1_range_rejects_invalid(range_name):
+    with pytest.raises(ValueError):
+        parse_a1_range(range_name)
+
+
+def test_quote_sheet_name_round_trips():
+    for sheet_name in ('Sheet1', 'Form Responses 1', "Bob's sheet"):
+        assert parse_a1_range(quote_sheet_name(sheet_name) + '!A1')[0] == sheet_name
@@ -0,0 +1,60 @@
+import json
+
+from conftest import submission
+
+NDJSON = 'application/x-ndjson'
+
+
+def stream(client, headers=None, **params):
+    response = client.get('/api/responses', query_string=params, headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == NDJSON
+    meta, *rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    return meta, rows
+
+
+def test_stream_has_a_metadata_line_then_one_line_per_response(client):
+    body = client.get('/api/responses').get_json()
+    meta, rows = stream(client, stream='1')
+
+    assert meta == {'success': True, 'headers': body['headers'], 'cursor': body['cursor'],
+                    'reset': True, 'stale': False}
+    assert rows == body['data']
+
+
+def test_stream_is_negotiated_by_accept(client):
+    meta, rows = stream(client, headers={'Accept': NDJSON})
+    assert len(rows) == 2
+
+    response = client.get('/api/responses', headers={'Accept': f'application/json, {NDJSON};q=0.5'})
+    assert response.mimetype == 'application/json'
+    assert 'Accept' in response.vary
+
+
+def test_stream_applies_fields_filters_and_paging(client):
+    client.post('/api/submit-feedback', json=submission(submitter='submitter-3'))
+    client.post('/api/submit-feedback', json=submission(submitter='submitter-4', answer='Disagree'))
+
+    meta, rows = stream(client, stream='1', fields='Encrypted Submitter ID,The leader communicates clearly',
+                        management_email='poc@example.com', offset=1, limit=2)
+    assert meta['headers'] == ['Encrypted Submitter ID', 'The leader communicates clearly']
+    assert rows == [
+        {'Encrypted Submitter ID': 'submitter-3', 'The leader communicates clearly': 'Agree'},
+        {'Encrypted Submitter ID': 'submitter-4', 'The leader communicates clearly': 'Disagree'}
+    ]
+
+
+def test_stream_continues_from_a_cursor(client):
+    cursor = stream(client, stream='1')[0]['cursor']
+    client.post('/api/submit-feedback', json=submission())
+
+    meta, rows = stream(client, stream='1', since=cursor)
+    assert meta['reset'] is False
+    assert meta['cursor'] != cursor
+    assert [row['Encrypted Submitter ID'] for row in rows] == ['submitter-9']
+
+
+def test_bad_stream_parameters_are_plain_json_errors(client):
+    response = client.get('/api/responses', query_string={'stream': '1', 'fields': 'Nope'})
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
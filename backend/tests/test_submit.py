@@ -0,0 +1,101 @@
+import threading
+
+import app as feedback_app
+from conftest import read_sheet, submission
+
+
+def test_repeat_submission_in_cooldown_is_rejected(client, sheets):
+    assert client.post('/api/submit-feedback', json=submission()).status_code == 200
+
+    response = client.post('/api/submit-feedback', json=submission(answer='Disagree'))
+    assert response.status_code == 409
+    body = response.get_json()
+    assert body['success'] is False
+    assert body['cooldown_ends']
+    assert len(read_sheet(sheets, 'responses')) == 4
+
+
+def test_cooldown_counts_rows_already_in_sheet(client):
+    response = client.post('/api/submit-feedback', json=submission(submitter='submitter-1'))
+    assert response.status_code == 409
+
+
+def test_batch_reports_cooldown_per_record(client, sheets):
+    response = client.post('/api/submit-feedback/batch', json=[
+        submission(submitter='submitter-1'),
+        submission(target='am@example.com')
+    ])
+    body = response.get_json()
+    assert [result['success'] for result in body['results']] == [False, True]
+    assert body['results'][0]['cooldown_ends']
+    assert len(read_sheet(sheets, 'responses')) == 4
+
+
+
+def test_failed_batch_releases_its_cooldown_claims(client, sheets, monkeypatch):
+    headers_for = feedback_app.response_schema.headers_for
+
+    def unreadable(feedback_list):
+        raise ConnectionError('header unavailable')
+    monkeypatch.setattr(feedback_app.response_schema, 'headers_for', unreadable)
+    body = client.post('/api/submit-feedback/batch', json=[submission()]).get_json()
+    assert body['results'][0]['success'] is False
+    assert len(read_sheet(sheets, 'responses')) == 3
+
+    monkeypatch.setattr(feedback_app.response_schema, 'headers_for', headers_for)
+    body = client.post('/api/submit-feedback/batch', json=[submission()]).get_json()
+    assert body['results'][0]['success'] is True
+
+def test_idempotent_retry_replays_first_response(client, sheets):
+    headers = {'Idempotency-Key': 'retry-1'}
+    first = client.post('/api/submit-feedback', json=submission(), headers=headers)
+    second = client.post('/api/submit-feedback', json=submission(), headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert second.get_json() == first.get_json()
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert 'Idempotent-Replayed' not in first.headers
+    assert len(read_sheet(sheets, 'responses')) == 4
+
+
+def test_idempotent_failures_are_not_remembered(client):
+    headers = {'Idempotency-Key': 'blocked-1'}
+    blocked = submission(submitter='submitter-1')
+    assert client.post('/api/submit-feedback', json=blocked, headers=headers).status_code == 409
+
+    # Once the cooldown no longer applies, the same key runs the request again
+    client.post('/api/cache/invalidate', json={'sheet': 'responses'})
+    feedback_app.submission_index.invalidate()
+    response = client.post('/api/submit-feedback', json=submission(), headers=headers)
+    assert response.status_code == 200
+    assert 'Idempotent-Replayed' not in response.headers
+
+
+def test_concurrent_requests_with_one_key_append_once(app, sheets):
+    results = []
+
+    def submit():
+        with app.test_client() as client:
+            response = client.post('/api/submit-feedback', json=submission(),
+                                   headers={'Idempotency-Key': 'concurrent-1'})
+            results.append(response.status_code)
+
+    threads = [threading.Thread(target=submit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [200] * 4
+    assert len(read_sheet(sheets, 'responses')) == 4
+
+
+def test_idempotency_store_failure_keeps_success(client, sheets, monkeypatch):
+    def broken_put(key, body, status):
+        raise OSError('disk full')
+    monkeypatch.setattr(feedback_app.idempotency_store, 'put', broken_put)
+
+    response = client.post('/api/submit-feedback', json=submission(), headers={'Idempotency-Key': 'disk-1'})
+    assert response.status_code == 200
+    assert response.get_json()['success'] is True
+    assert len(read_sheet(sheets, 'responses')) == 4
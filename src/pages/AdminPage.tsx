@@ -1,11 +1,11 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Home, BarChart3, FileText, Mail, LogOut, Users, TrendingUp, AlertTriangle, RefreshCw, Loader2, Filter, CheckCircle, Info, Zap, AlertCircle, Target, Globe, Lightbulb, Award, Database, CheckSquare, MessageSquare, Search, Smile, Repeat, Heart, Compass, Bell, Calendar, Percent } from 'lucide-react';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
 import { useToast } from '@/hooks/use-toast';
-import { fetchFeedbackResponses, type FeedbackResponse, fetchManagementMapping } from '@/services/sheetsApi';
+import { fetchFeedbackResponses, fetchResponsesPage, type FeedbackResponse, fetchManagementMapping } from '@/services/sheetsApi';
 import SheetsDataTable from '@/components/SheetsDataTable';
 import { EmployeeMapping } from '@/services/mappingApi';
 import {
@@ -31,6 +31,13 @@ const AdminPage = () => {
   const [loading, setLoading] = useState(true);
   const [employeeMappings, setEmployeeMappings] = useState<EmployeeMapping[]>([]);
   const [mappingLoading, setMappingLoading] = useState(false);
+  // Sync cursor and rows loaded so far, so refreshes only fetch new responses
+  const responsesCursor = useRef<string | null>(null);
+  const loadedResponses = useRef<FeedbackResponse[]>([]);
+  // Current page of the logs table, filtered and paginated by the backend
+  const [logPage, setLogPage] = useState<{ data: FeedbackResponse[]; total: number; sheetTotal: number } | null>(null);
+  // Bumped on every successful responses load so the logs page is fetched again
+  const [responsesGeneration, setResponsesGeneration] = useState(0);
   const [stats, setStats] = useState({
     uniqueSubmitters: 0,
     totalResponses: 0,
@@ -87,6 +94,37 @@ const AdminPage = () => {
     setCurrentPage(1);
   }, [filters]);
 
+  // The logs table fetches only the page it shows
+  useEffect(() => {
+    if (activeTab !== 'logs') return;
+    let cancelled = false;
+
+    fetchResponsesPage(
+      {
+        role: filters.role,
+        gender: filters.gender,
+        tenure: filters.tenure,
+        designation: filters.designation,
+        age: filters.age,
+        rating: filters.rating,
+        process: filters.process,
+        gender_of_user: filters.genderOfUser,
+        management_email: filters.managementEmail,
+        time_period: filters.timePeriod
+      },
+      { limit: itemsPerPage, offset: (currentPage - 1) * itemsPerPage }
+    ).then(result => {
+      if (cancelled) return;
+      setLogPage(result.success
+        ? { data: result.data, total: result.total, sheetTotal: result.sheet_total }
+        : null);
+    });
+
+    return () => {
+      cancelled = true;
+    };
+  }, [activeTab, filters, currentPage, itemsPerPage, responsesGeneration]);
+
   // Function to load both responses and mapping data
   const loadAllData = async () => {
     setLoading(true);
@@ -455,7 +493,7 @@ const AdminPage = () => {
   const loadResponsesData = async () => {
     setLoading(true);
     try {
-      const result = await fetchFeedbackResponses();
+      const result = await fetchFeedbackResponses(responsesCursor.current);
       if (result.success && result.data) {
         // Enrich responses with client data from mappings
         const enrichedResponses = result.data.map(response => {
@@ -505,11 +543,19 @@ const AdminPage = () => {
           return responseWithClient;
         });
 
-        setResponses(enrichedResponses);
-        calculateStats(enrichedResponses);
+        // Merge new rows unless the backend asked for a full reload
+        const allResponses = result.reset === false
+          ? [...loadedResponses.current, ...enrichedResponses]
+          : enrichedResponses;
+        responsesCursor.current = result.cursor || null;
+        loadedResponses.current = allResponses;
+
+        setResponses(allResponses);
+        setResponsesGeneration(generation => generation + 1);
+        calculateStats(allResponses);
         toast({
           title: 'Data Loaded',
-          description: `Fetched ${enrichedResponses.length} responses from Google Sheets`,
+          description: `Fetched ${allResponses.length} responses from Google Sheets`,
         });
       } else {
         toast({
@@ -1234,9 +1280,13 @@ const AdminPage = () => {
   };
 
   const filteredResponses = filterResponses(responses);
-  const totalPages = Math.ceil(filteredResponses.length / itemsPerPage);
-  const currentLogs = filteredResponses
-    .slice((currentPage - 1) * itemsPerPage, currentPage * itemsPerPage);
+  // The backend's page when it loaded, otherwise filter and slice locally
+  const logTotal = logPage ? logPage.total : filteredResponses.length;
+  const logSheetTotal = logPage ? logPage.sheetTotal : responses.length;
+  const totalPages = Math.ceil(logTotal / itemsPerPage);
+  const currentLogs = logPage
+    ? logPage.data
+    : filteredResponses.slice((currentPage - 1) * itemsPerPage, currentPage * itemsPerPage);
 
   const participationRate = stats.totalEmployees > 0
     ? Math.round((stats.uniqueSubmitters / stats.totalEmployees) * 100)
@@ -6316,7 +6366,7 @@ const AdminPage = () => {
                     <div className="flex flex-col sm:flex-row justify-between items-start sm:items-center gap-4">
                       <div className="flex items-center gap-2">
                         <div className="px-3 py-1 bg-primary/10 text-primary rounded-full text-sm font-medium">
-                          {filteredResponses.length} records
+                          {logTotal} records
                         </div>
                         <div className="text-sm text-muted-foreground">
                           72 columns • Page {currentPage} of {totalPages}
@@ -6683,12 +6733,12 @@ const AdminPage = () => {
                     )}
                   </div>
 
-                  {filteredResponses.length === 0 ? (
+                  {logTotal === 0 ? (
                     <div className="text-center py-12 border rounded-lg">
                       <FileText className="w-12 h-12 text-muted-foreground mx-auto mb-4" />
                       <h3 className="text-lg font-medium mb-2">No data available</h3>
                       <p className="text-muted-foreground mb-4">
-                        {responses.length === 0
+                        {logSheetTotal === 0
                           ? "No response data found in Google Sheets"
                           : "No records match your filters"}
                       </p>
@@ -6974,10 +7024,10 @@ const AdminPage = () => {
                       {/* Enhanced pagination */}
                       <div className="flex flex-col sm:flex-row justify-between items-center gap-4 mt-6 pt-4 border-t">
                         <div className="text-sm text-muted-foreground">
-                          Showing {Math.min(itemsPerPage, filteredResponses.length - (currentPage - 1) * itemsPerPage)} of {filteredResponses.length} rows
-                          {responses.length !== filteredResponses.length && (
+                          Showing {Math.min(itemsPerPage, logTotal - (currentPage - 1) * itemsPerPage)} of {logTotal} rows
+                          {logSheetTotal !== logTotal && (
                             <span className="text-blue-600 ml-2">
-                              (Filtered from {responses.length} total)
+                              (Filtered from {logSheetTotal} total)
                             </span>
                           )}
                         </div>
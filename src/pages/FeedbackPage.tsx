@@ -1823,14 +1823,14 @@
 
 // src/pages/FeedbackPage.tsx
 
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { ArrowLeft, ChevronRight, Loader2, AlertCircle, CheckCircle2, RefreshCw, User, Calendar } from 'lucide-react';
 import { Button } from '@/components/ui/button';
 import { Textarea } from '@/components/ui/textarea';
 import { Progress } from '@/components/ui/progress';
 import { useToast } from '@/hooks/use-toast';
-import { fetchSurveyQuestions, fetchManagementMapping, submitFeedback, getCurrentUserEmail, checkBackendHealth } from '@/services/sheetsApi';
+import { fetchBootstrap, fetchEligibility, submitFeedback, newIdempotencyKey, getCurrentUserEmail } from '@/services/sheetsApi';
 
 // Storage utilities for cooldown management
 const STORAGE_KEY = 'vox_feedback_submissions';
@@ -1981,6 +1981,9 @@ interface FeedbackTarget {
   name: string;
   process: string;
   role: string;
+  // Cooldown status from the backend; absent when only local history is known
+  status?: 'ALLOWED' | 'BLOCKED';
+  cooldown_ends?: string | null;
 }
 
 interface FeedbackTargets {
@@ -2036,17 +2039,8 @@ const FeedbackPage = () => {
   const [answers, setAnswers] = useState<Record<string, string>>({});
   const [comments, setComments] = useState('');
   const [isSubmitting, setIsSubmitting] = useState(false);
-
-  // Function to get user's display name from email
-  const getDisplayName = (email: string): string => {
-    if (!email.includes('@')) return email;
-
-    const namePart = email.split('@')[0];
-    return namePart
-      .replace(/\./g, ' ')
-      .replace(/_/g, ' ')
-      .replace(/\b\w/g, l => l.toUpperCase());
-  };
+  // Idempotency key of the current submission, kept across retries
+  const submissionKey = useRef<string | null>(null);
 
   useEffect(() => {
     // Clear submissions older than 6 months on component mount
@@ -2097,79 +2091,6 @@ const FeedbackPage = () => {
     }
   };
 
-  const transformQuestionsData = (data: any[]): Question[] => {
-    if (!data || data.length === 0) {
-      console.log('No data received from Google Sheets');
-      return [];
-    }
-
-    console.log('📊 Processing questions from Google Sheets...');
-    console.log('Total rows received:', data.length);
-
-    const questionsList: Question[] = [];
-    let currentCategory = 'General';
-    let questionCount = 0;
-
-    // The key for the column (might vary)
-    const columnKey = Object.keys(data[0] || {})[0] || 'Topic: Support & Approachability';
-    console.log(`Using column key: "${columnKey}"`);
-
-    // Process each row
-    data.forEach((row, rowIndex) => {
-      const cellValue = row[columnKey] || '';
-      if (typeof cellValue !== 'string') return;
-
-      const text = cellValue.trim();
-      if (!text) return;
-
-      // Check if this is a topic header
-      if (text.toLowerCase().startsWith('topic:')) {
-        currentCategory = text.replace('Topic:', '').trim();
-        console.log(`  → Category set to: ${currentCategory}`);
-        return;
-      }
-
-      // Skip rating options
-      if (text === 'Strongly disagree' ||
-        text === 'disagree' ||
-        text === 'neutral' ||
-        text === 'agree' ||
-        text === 'Strongly agree' ||
-        text.toLowerCase().includes('strongly disagree') ||
-        text.toLowerCase().includes('strongly agree')) {
-        return;
-      }
-
-      // Skip section headers and demographics
-      if (text.toLowerCase().includes('about you') ||
-        text.toLowerCase().includes('your role') ||
-        text.toLowerCase().includes('overall rating') ||
-        text.toLowerCase().includes('gender') ||
-        text.toLowerCase().includes('tenure') ||
-        text.toLowerCase().includes('designation') ||
-        text.toLowerCase().includes('level') ||
-        text.toLowerCase().includes('age') ||
-        text.length < 5) {
-        return;
-      }
-
-      if (text.length >= 10 && !text.toLowerCase().startsWith('topic:')) {
-        questionCount++;
-        questionsList.push({
-          question_id: `q${questionCount}`,
-          question_text: text,
-          question_type: 'rating',
-          options: ['Strongly Disagree', 'Disagree', 'Neutral', 'Agree', 'Strongly Agree'],
-          category: currentCategory,
-          required: true
-        });
-      }
-    });
-
-    console.log(`\n✅ Successfully extracted ${questionsList.length} questions`);
-    return questionsList;
-  };
-
   // const transformMappingData = (data: any[], userEmail: string): { targets: FeedbackTargets, userData: UserData | null } => {
   //   console.log('transformMappingData called with:', {
   //     dataLength: data.length,
@@ -2260,132 +2181,6 @@ const FeedbackPage = () => {
 
   //   return { targets: targetsData, userData: userDataResult };
   // };
-  // In your FeedbackPage.tsx - Update the transformMappingData function
-  const transformMappingData = (data: any[], userEmail: string): { targets: FeedbackTargets, userData: UserData | null } => {
-    console.log('transformMappingData called with:', {
-      dataLength: data.length,
-      userEmail
-    });
-
-    const targetsData: FeedbackTargets = {
-      'POC': [],
-      'Manager': [],
-      'Account Manager': []
-    };
-
-    let userMapping: MappingData | null = null;
-
-    // Find user in mapping data
-    data.forEach((item, index) => {
-      const itemEmail = item.Email || '';
-      const itemLdap = item.Ldap || '';
-      const userEmailLower = userEmail.toLowerCase();
-
-      if (itemEmail.toLowerCase() === userEmailLower ||
-        itemLdap.toLowerCase() === userEmailLower) {
-        userMapping = item;
-        console.log('Found matching user at row', index, ':', item);
-      }
-    });
-
-    if (!userMapping) {
-      return { targets: targetsData, userData: null };
-    }
-
-    // Extract user data with demographics
-    const userProcess = userMapping.Process || 'General';
-    const userEmailFromMapping = userMapping.Email || userEmail;
-    const userDisplayName = getDisplayName(userEmailFromMapping);
-
-    const userDataResult: UserData = {
-      email: userEmailFromMapping,
-      name: userDisplayName,
-      process: userProcess,
-      ldap: userMapping.Ldap || undefined,
-      // Add demographic fields
-      gender: userMapping.Gender || '',
-      tenure: userMapping.Tenure || '',
-      designation: userMapping.Designation || userMapping['Designation/Level'] || '',
-      age: userMapping.Age || '',
-      genderOfManagement: userMapping['Gender of Management'] || userMapping['Gender of the management'] || ''
-    };
-
-    // Create targets
-    if (userMapping.POC && userMapping.POC.includes('@')) {
-      targetsData['POC'].push({
-        email: userMapping.POC,
-        name: getDisplayName(userMapping.POC),
-        process: userProcess,
-        role: 'POC'
-      });
-    }
-
-    if (userMapping.Manager && userMapping.Manager.includes('@')) {
-      targetsData['Manager'].push({
-        email: userMapping.Manager,
-        name: getDisplayName(userMapping.Manager),
-        process: userProcess,
-        role: 'Manager'
-      });
-    }
-
-    if (userMapping['Account manager'] && userMapping['Account manager'].includes('@')) {
-      targetsData['Account Manager'].push({
-        email: userMapping['Account manager'],
-        name: getDisplayName(userMapping['Account manager']),
-        process: userProcess,
-        role: 'Account Manager'
-      });
-    }
-
-    return { targets: targetsData, userData: userDataResult };
-  };
-  const getAllTargets = (data: any[]): FeedbackTargets => {
-    const targetsData: FeedbackTargets = {
-      'POC': [],
-      'Manager': [],
-      'Account Manager': []
-    };
-
-    const seenEmails = new Set<string>();
-
-    data.forEach((item) => {
-      // For POC
-      if (item.POC && item.POC.includes('@') && !seenEmails.has(item.POC.toLowerCase())) {
-        targetsData['POC'].push({
-          email: item.POC,
-          name: getDisplayName(item.POC),
-          process: item.Process || 'General',
-          role: 'POC'
-        });
-        seenEmails.add(item.POC.toLowerCase());
-      }
-
-      // For Manager
-      if (item.Manager && item.Manager.includes('@') && !seenEmails.has(item.Manager.toLowerCase())) {
-        targetsData['Manager'].push({
-          email: item.Manager,
-          name: getDisplayName(item.Manager),
-          process: item.Process || 'General',
-          role: 'Manager'
-        });
-        seenEmails.add(item.Manager.toLowerCase());
-      }
-
-      // For Account Manager
-      if (item['Account manager'] && item['Account manager'].includes('@') && !seenEmails.has(item['Account manager'].toLowerCase())) {
-        targetsData['Account Manager'].push({
-          email: item['Account manager'],
-          name: getDisplayName(item['Account manager']),
-          process: item.Process || 'General',
-          role: 'Account Manager'
-        });
-        seenEmails.add(item['Account manager'].toLowerCase());
-      }
-    });
-
-    return targetsData;
-  };
 
   const identifyUserAndLoadData = async () => {
     setStep('loading');
@@ -2393,60 +2188,32 @@ const FeedbackPage = () => {
     try {
       console.log('🚀 Starting data load...');
 
-      // Step 1: Check backend health
-      const isBackendHealthy = await checkBackendHealth();
-      if (!isBackendHealthy) {
-        throw new Error('Backend server is not responding. Please make sure it is running on http://localhost:5000');
-      }
-
-      // Step 2: Get user email
+      // Step 1: Get user email
       const userEmail = getCurrentUserEmail();
       console.log('👤 User email:', userEmail);
 
-      // Step 3: Load questions
-      console.log('📋 Loading questions...');
-      const questionsResult = await fetchSurveyQuestions();
+      // Step 2: Load questions, targets and user details in one request
+      console.log('📋 Loading feedback form data...');
+      const bootstrap = await fetchBootstrap(userEmail);
 
-      if (!questionsResult.success) {
-        throw new Error(questionsResult.error || 'Failed to load questions');
+      if (!bootstrap.success) {
+        throw new Error(bootstrap.error || 'Backend server is not responding. Please make sure it is running on http://localhost:5000');
       }
 
-      if (!questionsResult.data || questionsResult.data.length === 0) {
+      if (!bootstrap.questions || bootstrap.questions.length === 0) {
         console.warn('No questions data received');
       }
 
-      const transformedQuestions = transformQuestionsData(questionsResult.data);
-      console.log(`✅ Transformed ${transformedQuestions.length} questions`);
-      setQuestions(transformedQuestions);
-
-      // Step 4: Load mapping for user
-      console.log('📋 Loading mapping for user:', userEmail);
-      const mappingResult = await fetchManagementMapping(userEmail);
-
-      if (!mappingResult.success) {
-        throw new Error(mappingResult.error || 'Failed to load mapping data');
-      }
-
-      const { targets, userData } = transformMappingData(mappingResult.data, userEmail);
+      console.log(`✅ Loaded ${bootstrap.questions.length} questions`);
+      setQuestions(bootstrap.questions);
 
-      if (userData) {
-        console.log('✅ User found in mapping:', userData.name);
-        setTargets(targets);
-        setUserData(userData);
+      if (bootstrap.user_found) {
+        console.log('✅ User found in mapping:', bootstrap.user.name);
       } else {
         console.log('⚠️ User not found in mapping, showing all targets');
-        // Get all mappings without filter
-        const allMappingResult = await fetchManagementMapping();
-        if (allMappingResult.success) {
-          const allTargets = getAllTargets(allMappingResult.data);
-          setTargets(allTargets);
-          setUserData({
-            email: userEmail,
-            name: getDisplayName(userEmail),
-            process: 'General'
-          });
-        }
       }
+      setTargets(bootstrap.targets);
+      setUserData(bootstrap.user);
 
       console.log('🎉 Moving to select-target step');
       setStep('select-target');
@@ -2466,9 +2233,57 @@ const FeedbackPage = () => {
   const selectTarget = (role: string, target: FeedbackTarget) => {
     setSelectedRole(role);
     setSelectedTarget(target);
+    submissionKey.current = null;
     setStep('questions');
   };
 
+  // The backend's cooldown status wins; local history is only a fallback
+  const isTargetEligible = (target: FeedbackTarget): boolean => {
+    if (target.status) {
+      return target.status === 'ALLOWED';
+    }
+    return userData ? canSubmitFeedback(target.email, userData.email) : true;
+  };
+
+  const targetCooldownEnd = (target: FeedbackTarget): Date | null => {
+    if (target.status) {
+      return target.status === 'BLOCKED' && target.cooldown_ends ? new Date(target.cooldown_ends) : null;
+    }
+    return userData ? getCooldownEndDate(target.email, userData.email) : null;
+  };
+
+  // Apply cooldown ends (null = eligible) keyed by lowercased target email
+  const applyEligibility = (cooldowns: Record<string, string | null>) => {
+    const update = (target: FeedbackTarget): FeedbackTarget => {
+      const key = target.email.toLowerCase();
+      if (!(key in cooldowns)) return target;
+      const status: FeedbackTarget['status'] = cooldowns[key] ? 'BLOCKED' : 'ALLOWED';
+      return { ...target, status, cooldown_ends: cooldowns[key] };
+    };
+
+    setTargets(prev => {
+      const next: FeedbackTargets = {};
+      for (const [role, roleTargets] of Object.entries(prev)) {
+        next[role] = roleTargets.map(update);
+      }
+      return next;
+    });
+    setSelectedTarget(prev => (prev ? update(prev) : prev));
+  };
+
+  const refreshEligibility = async () => {
+    if (!userData) return;
+    const emails = Array.from(new Set(Object.values(targets).flat().map(target => target.email)));
+    const result = await fetchEligibility(userData.email, emails);
+    if (!result.success) return;
+
+    const cooldowns: Record<string, string | null> = {};
+    for (const [email, eligibility] of Object.entries(result.eligibility as Record<string, { cooldown_ends: string | null }>)) {
+      cooldowns[email.toLowerCase()] = eligibility.cooldown_ends;
+    }
+    applyEligibility(cooldowns);
+  };
+
   const handleAnswer = (questionId: string, value: string) => {
     setAnswers(prev => ({ ...prev, [questionId]: value }));
   };
@@ -2933,8 +2748,8 @@ const FeedbackPage = () => {
       return;
     }
 
-    if (!canSubmitFeedback(selectedTarget.email, userData.email)) {
-      const cooldownEnd = getCooldownEndDate(selectedTarget.email, userData.email);
+    if (!isTargetEligible(selectedTarget)) {
+      const cooldownEnd = targetCooldownEnd(selectedTarget);
       const message = cooldownEnd ?
         `You've already submitted feedback for ${selectedTarget.name} recently. You can submit again on ${cooldownEnd.toLocaleDateString()}.` :
         `You've already submitted feedback for ${selectedTarget.name} recently. Please wait 6 months before submitting again.`;
@@ -3061,15 +2876,20 @@ const FeedbackPage = () => {
       );
 
       // Submit to Google Sheets
-      const result = await submitFeedback(feedbackData);
+      if (!submissionKey.current) {
+        submissionKey.current = newIdempotencyKey();
+      }
+      const result = await submitFeedback(feedbackData, submissionKey.current);
 
       if (result.success) {
+        submissionKey.current = null;
         saveFeedbackSubmission(
           selectedTarget.email,
           userData.email,
           selectedRole,
           selectedTarget.name
         );
+        refreshEligibility();
 
         setStep('success');
         toast({
@@ -3077,6 +2897,9 @@ const FeedbackPage = () => {
           description: `Your feedback for ${selectedTarget.name} has been submitted.`,
         });
       } else {
+        if (result.cooldown_ends) {
+          applyEligibility({ [selectedTarget.email.toLowerCase()]: result.cooldown_ends });
+        }
         throw new Error(result.error || 'Submission failed');
       }
     } catch (err) {
@@ -3149,7 +2972,7 @@ const FeedbackPage = () => {
       Object.entries(targets)
         .flatMap(([role, roleTargets]) =>
           roleTargets.filter(target =>
-            canSubmitFeedback(target.email, userData.email) // Only show targets that can be submitted
+            isTargetEligible(target) // Only show targets that can be submitted
           ).map(target => ({
             ...target,
             role
@@ -3352,7 +3175,7 @@ const FeedbackPage = () => {
                 </summary>
                 <div className="mt-3 p-3 bg-muted rounded-lg">
                   <p className="text-sm text-muted-foreground mb-2">
-                    Your feedback history is stored locally in your browser. This helps track your 6-month cooldown periods.
+                    A copy of your feedback history is stored locally in your browser. Cooldown periods are enforced by the server.
                   </p>
                   <Button
                     variant="outline"
@@ -3362,7 +3185,7 @@ const FeedbackPage = () => {
                       localStorage.removeItem(STORAGE_KEY);
                       toast({
                         title: 'History Cleared',
-                        description: 'Your feedback history has been cleared locally. Cooldown timers have been reset.',
+                        description: 'Your feedback history has been cleared locally.',
                       });
                       setTimeout(() => window.location.reload(), 1000);
                     }}
@@ -3384,7 +3207,7 @@ if (step === 'select-target') {
   // Calculate statistics for each role
   const roleStats = Object.entries(targets).map(([role, roleTargets]) => {
     const submittedCount = userData ?
-      roleTargets.filter(target => !canSubmitFeedback(target.email, userData.email)).length : 0;
+      roleTargets.filter(target => !isTargetEligible(target)).length : 0;
     const availableCount = roleTargets.length - submittedCount;
 
     return {
@@ -3486,12 +3309,10 @@ if (step === 'select-target') {
 
                   {roleTargets.map((target, index) => {
                     // Check if user can submit feedback for this target
-                    const canSubmitTarget = userData ? 
-                      canSubmitFeedback(target.email, userData.email) : true;
+                    const canSubmitTarget = isTargetEligible(target);
                     
                     // Get cooldown message if applicable
-                    const cooldownEnd = userData ? 
-                      getCooldownEndDate(target.email, userData.email) : null;
+                    const cooldownEnd = targetCooldownEnd(target);
                     
                     const cooldownMessage = cooldownEnd ? 
                       formatCooldownMessage(cooldownEnd) : '';
@@ -3696,7 +3517,7 @@ if (step === 'select-target') {
           </div>
 
           {/* Cooldown Reminder */}
-          {userData && selectedTarget && !canSubmitFeedback(selectedTarget.email, userData.email) && (
+          {userData && selectedTarget && !isTargetEligible(selectedTarget) && (
             <div className="mt-4 p-3 bg-amber-50 rounded border border-amber-200">
               <div className="flex items-center gap-2">
                 <AlertCircle className="w-4 h-4 text-amber-600" />
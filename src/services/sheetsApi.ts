@@ -811,6 +811,21 @@ export const fetchManagementMapping = async (userEmail?: string) => {
   }
 };
 
+// Fetch questions, feedback targets and user details for the form in one request
+export const fetchBootstrap = async (userEmail: string) => {
+  try {
+    const response = await fetch(`${API_BASE_URL}/bootstrap?email=${encodeURIComponent(userEmail)}`);
+    if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+    return await response.json();
+  } catch (error) {
+    console.error('Error fetching bootstrap data:', error);
+    return {
+      success: false,
+      error: error instanceof Error ? error.message : 'Network error'
+    };
+  }
+};
+
 // Submit feedback
 // export const submitFeedback = async (feedbackData: Record<string, any>) => {
 //   try {
@@ -844,8 +859,18 @@ export const fetchManagementMapping = async (userEmail?: string) => {
 //   }
 // };
 
+// Key identifying one submission attempt, reused when that attempt is retried
+export const newIdempotencyKey = (): string => {
+  if (typeof crypto !== 'undefined' && typeof crypto.randomUUID === 'function') {
+    return crypto.randomUUID();
+  }
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+};
+
 // In submitFeedback function, add more detailed logging
-export const submitFeedback = async (feedbackData: Record<string, any>) => {
+// Pass the same idempotencyKey when retrying so the backend can replay the
+// original result instead of writing a duplicate row.
+export const submitFeedback = async (feedbackData: Record<string, any>, idempotencyKey?: string) => {
   try {
     console.log('🚀 Submitting feedback to backend...');
     console.log('Backend URL:', `${API_BASE_URL}/submit-feedback`);
@@ -858,17 +883,27 @@ export const submitFeedback = async (feedbackData: Record<string, any>) => {
       }
     });
     
+    const headers: Record<string, string> = {
+      'Content-Type': 'application/json',
+    };
+    if (idempotencyKey) {
+      headers['Idempotency-Key'] = idempotencyKey;
+    }
+
     const response = await fetch(`${API_BASE_URL}/submit-feedback`, {
       method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-      },
+      headers,
       body: JSON.stringify(feedbackData)
     });
     
     console.log('Response status:', response.status);
     console.log('Response status text:', response.statusText);
     
+    // Still in the cooldown for this target; the body says until when
+    if (response.status === 409) {
+      return await response.json();
+    }
+    
     // Try to get error details if response is not OK
     if (!response.ok) {
       let errorText = '';
@@ -896,18 +931,94 @@ export const submitFeedback = async (feedbackData: Record<string, any>) => {
   }
 };
 
-// Fetch feedback responses
-export const fetchFeedbackResponses = async () => {
+// Cooldown status of feedback targets for a user. Without targetEmails the
+// targets from the user's mapping row are checked.
+export const fetchEligibility = async (userEmail: string, targetEmails?: string[]) => {
   try {
-    const response = await fetch(`${API_BASE_URL}/responses`);
+    const params = new URLSearchParams({ email: userEmail });
+    if (targetEmails && targetEmails.length > 0) {
+      params.set('targets', targetEmails.join(','));
+    }
+    const response = await fetch(`${API_BASE_URL}/eligibility?${params.toString()}`);
     if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
     return await response.json();
+  } catch (error) {
+    console.error('Error fetching eligibility:', error);
+    return {
+      success: false,
+      error: error instanceof Error ? error.message : 'Network error'
+    };
+  }
+};
+
+interface ColumnarColumn {
+  name: string;
+  values?: any[];
+  dictionary?: any[];
+  codes?: number[];
+}
+
+// Turn a format=columnar payload back into one object per row
+const decodeColumnar = (columns: ColumnarColumn[], rowCount: number): Record<string, any>[] => {
+  const records: Record<string, any>[] = Array.from({ length: rowCount }, () => ({}));
+  columns.forEach(column => {
+    const values = column.values ?? (column.codes || []).map(code => column.dictionary![code]);
+    values.forEach((value, i) => {
+      records[i][column.name] = value;
+    });
+  });
+  return records;
+};
+
+// Fetch feedback responses. With a cursor from an earlier call only rows
+// appended since then are returned, unless the response sets `reset`.
+// Transferred column-wise (headers once) and decoded back into objects.
+export const fetchFeedbackResponses = async (since?: string | null) => {
+  try {
+    const params = new URLSearchParams({ format: 'columnar' });
+    if (since) {
+      params.set('since', since);
+    }
+    const response = await fetch(`${API_BASE_URL}/responses?${params.toString()}`);
+    if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+    const result = await response.json();
+    if (result.success && result.format === 'columnar') {
+      result.data = decodeColumnar(result.data, result.count);
+    }
+    return result;
   } catch (error) {
     console.error('Error fetching responses:', error);
     return { success: false, error: 'Network error', data: [] };
   }
 };
 
+// One page of responses, filtered on the backend. Filter keys are the
+// /api/responses query parameters; empty values are left out.
+export const fetchResponsesPage = async (
+  filters: Record<string, string>,
+  page: { limit: number; offset: number },
+  fields?: string[]
+) => {
+  try {
+    const params = new URLSearchParams({
+      limit: String(page.limit),
+      offset: String(page.offset)
+    });
+    Object.entries(filters).forEach(([key, value]) => {
+      if (value) params.set(key, value);
+    });
+    if (fields && fields.length > 0) {
+      params.set('fields', fields.join(','));
+    }
+    const response = await fetch(`${API_BASE_URL}/responses?${params.toString()}`);
+    if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+    return await response.json();
+  } catch (error) {
+    console.error('Error fetching responses page:', error);
+    return { success: false, error: 'Network error', data: [] };
+  }
+};
+
 // Test Google Sheets connection (optional)
 export const testSheetsConnection = async () => {
   try {